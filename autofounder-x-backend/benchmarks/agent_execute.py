@@ -0,0 +1,225 @@
+"""CPU time and allocations of every agent's execute(), per method, with simulated work disabled.
+
+Each agent is a fresh instance whose simulate_work() is a no-op, so execute() only
+builds its result. The public methods an agent defines (execute() and the generators
+it calls, e.g. LegalAgent.create_legal_documents) are wrapped to record, per run of
+execute(): wall time and calls, timed over --repeat runs with tracemalloc off; then,
+over --alloc-repeat runs under tracemalloc, the allocation peak above the memory in use
+at entry, and the memory and number of allocated blocks still alive at return (what the
+method built and handed back; CPython keeps no count of allocations freed again).
+Method figures are inclusive of the methods they call. The random module is reseeded
+before every run so each run builds the same result.
+
+Baselines are kept per agent in benchmarks/baselines/agents/<agent_type>.json. An agent
+regresses when a method's fastest wall time (in microseconds, since a whole execute()
+takes tens of them; the minimum is what scheduler noise disturbs least) or allocation
+peak grows by more than --tolerance, or when it returns more blocks. The script exits
+with status 1 on any regression, and with status 2 before profiling when an agent has
+no baseline; --save-baseline writes them, noting the machine they were measured on.
+
+Usage: python benchmarks/agent_execute.py [--only legal] [--repeat 2000] [--alloc-repeat 3]
+                                          [--save-baseline] [--tolerance 0.2]
+"""
+import argparse
+import contextlib
+import functools
+import gc
+import inspect
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from common import Check, compare, load_baseline, percentile, require_baselines, save_baseline
+
+from src.agents.agent_manager import agent_manager
+
+DEFAULT_BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'agents')
+
+PROJECT = {
+    'name': 'Benchmark project',
+    'description': 'An AI-powered scheduling assistant that helps clinics cut no-shows',
+    'business_model': 'saas',
+    'target_market': 'Small and mid-sized clinics',
+    'budget_range': '10k-25k',
+    'timeline': '3-months'
+}
+
+
+class MethodProbe:
+    """Wraps an agent's methods on the instance and records each call of the current run"""
+
+    def __init__(self, agent, measure_memory: bool):
+        self.measure_memory = measure_memory
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.wall: Dict[str, float] = defaultdict(float)
+        self.peak: Dict[str, int] = defaultdict(int)
+        self.blocks: Dict[str, int] = defaultdict(int)
+        self.retained: Dict[str, int] = defaultdict(int)
+        # One [name, memory at entry, highest peak seen before a nested call reset it] per active call
+        self._stack: List[list] = []
+
+        self.methods = [name for name, value in vars(type(agent)).items()
+                        if not name.startswith('_') and inspect.isfunction(value)]
+        for name in self.methods:
+            setattr(agent, name, self._wrap(name, getattr(agent, name)))
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            self.calls[name] += 1
+            if not self.measure_memory:
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.wall[name] += time.perf_counter() - start
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1][2] = max(self._stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            blocks = sys.getallocatedblocks()
+            frame = [name, current, 0]
+            self._stack.append(frame)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                retained_blocks = sys.getallocatedblocks() - blocks
+                current_at_exit, peak = tracemalloc.get_traced_memory()
+                peak = max(frame[2], peak)
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1][2] = max(self._stack[-1][2], peak)
+                self.peak[name] = max(self.peak[name], peak - frame[1])
+                self.blocks[name] = max(self.blocks[name], retained_blocks)
+                self.retained[name] = max(self.retained[name], current_at_exit - frame[1])
+        return wrapper
+
+    def reset(self):
+        self.calls.clear()
+        self.wall.clear()
+        self.peak.clear()
+        self.blocks.clear()
+        self.retained.clear()
+
+
+def summarize_us(samples: List[float]) -> Dict[str, Any]:
+    """Latency summary in microseconds"""
+    return {
+        'count': len(samples),
+        'min_us': round(min(samples) * 1e6, 2),
+        'p50_us': round(percentile(samples, 50) * 1e6, 2),
+        'p95_us': round(percentile(samples, 95) * 1e6, 2),
+        'p99_us': round(percentile(samples, 99) * 1e6, 2)
+    }
+
+
+def run_once(agent, probe: MethodProbe, seed: int):
+    probe.reset()
+    agent.logs = []
+    random.seed(seed)
+    if probe.measure_memory:
+        # A full collection empties the dict/list free lists, so every container the run
+        # builds is a fresh allocation whatever ran before; no collection may interrupt it
+        gc.collect()
+        gc.disable()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            agent.execute(dict(PROJECT))
+    finally:
+        gc.enable()
+
+
+def fresh_agent(agent_type: str):
+    """A new instance of the agent with simulated work switched off"""
+    agent = type(agent_manager.agents[agent_type])()
+    agent.simulate_work = lambda *args, **kwargs: None
+    return agent
+
+
+def profile_agent(agent_type: str, repeat: int, alloc_repeat: int, seed: int) -> Dict[str, Any]:
+    agent = fresh_agent(agent_type)
+    timing = MethodProbe(agent, measure_memory=False)
+    run_once(agent, timing, seed)  # warm up
+    walls: Dict[str, List[float]] = defaultdict(list)
+    calls: Dict[str, int] = {}
+    for _ in range(repeat):
+        run_once(agent, timing, seed)
+        for name, elapsed in timing.wall.items():
+            walls[name].append(elapsed)
+        calls = dict(timing.calls)
+
+    # A fresh instance, so the allocation pass does not also run the timing wrappers
+    agent = fresh_agent(agent_type)
+    memory = MethodProbe(agent, measure_memory=True)
+    peaks: Dict[str, List[int]] = defaultdict(list)
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    retained: Dict[str, List[int]] = defaultdict(list)
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_repeat):
+            run_once(agent, memory, seed)
+            for name in memory.calls:
+                peaks[name].append(memory.peak[name])
+                blocks[name].append(memory.blocks[name])
+                retained[name].append(memory.retained[name])
+    finally:
+        tracemalloc.stop()
+
+    methods = {}
+    for name in sorted(walls, key=lambda name: -percentile(walls[name], 50)):
+        methods[name] = {
+            'calls': calls.get(name, 0),
+            **summarize_us(walls[name]),
+            'alloc_peak_kib': round(percentile(peaks[name], 50) / 1024, 1),
+            'retained_kib': round(percentile(retained[name], 50) / 1024, 1),
+            'retained_blocks': percentile(blocks[name], 50)
+        }
+    return methods
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', help='run agents whose type contains this')
+    parser.add_argument('--repeat', type=int, default=2000, help='timed runs of execute() per agent')
+    parser.add_argument('--alloc-repeat', type=int, default=3, help='runs of execute() per agent under tracemalloc')
+    parser.add_argument('--seed', type=int, default=42, help='random seed set before every run')
+    parser.add_argument('--baseline-dir', default=DEFAULT_BASELINE_DIR)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baselines')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative growth of every metric')
+    parser.add_argument('--min-delta-us', type=float, default=5.0, help='ignore wall time changes smaller than this')
+    args = parser.parse_args()
+
+    agent_types = [agent_type for agent_type in agent_manager.agents if not args.only or args.only in agent_type]
+    paths = {agent_type: os.path.join(args.baseline_dir, f'{agent_type}.json') for agent_type in agent_types}
+    require_baselines(list(paths.values()), args.save_baseline)
+    checks = [Check('min_us', args.tolerance, args.min_delta_us), Check('alloc_peak_kib', args.tolerance),
+              Check('retained_blocks')]
+    results, regressions, not_in_baseline = {}, [], []
+    for agent_type in agent_types:
+        results[agent_type] = profile_agent(agent_type, args.repeat, args.alloc_repeat, args.seed)
+        execute = results[agent_type]['execute']
+        print(f"{agent_type:<16} execute p50 {execute['p50_us']:>9.2f} us  peak {execute['alloc_peak_kib']:>7.1f} KiB",
+              file=sys.stderr)
+
+        if os.path.exists(paths[agent_type]):
+            baseline = load_baseline(paths[agent_type])
+            regressions.extend(compare(results[agent_type], baseline, checks, key='method', agent=agent_type))
+            not_in_baseline.extend(f'{agent_type} {name}' for name in results[agent_type] if name not in baseline)
+        if args.save_baseline:
+            save_baseline(paths[agent_type], results[agent_type])
+
+    if not_in_baseline:
+        print(f"WARNING: not in the baseline, not compared: {', '.join(not_in_baseline)}", file=sys.stderr)
+    print(json.dumps({'results': results, 'regressions': regressions, 'not_in_baseline': not_in_baseline}, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple
+
+# Make `src` importable when run as `python benchmarks/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+
+# Benchmark settings layered over default_config() of src/app.py
+BENCHMARK_CONFIG = {
+    'SECRET_KEY': 'benchmark-secret-key',
+    'JWT_SECRET_KEY': 'benchmark-jwt-secret-key',
+    'JWT_ACCESS_TOKEN_EXPIRES': False  # tokens from auth_headers() outlive any run
+}
+
+
+def create_benchmark_app(database_uri: str, **config) -> Flask:
+    """Build the app of src/app.py pointed at a scratch database"""
+    return create_app({**BENCHMARK_CONFIG, 'SQLALCHEMY_DATABASE_URI': database_uri, **config})
+
+
+def auth_headers(app: Flask, user_id: int) -> Dict[str, str]:
+    """Mint a bearer token for a seeded user without going through /auth/login"""
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Latency summary in milliseconds"""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0
+    }
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    """Run fn once and return its wall time in seconds"""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+class Check(NamedTuple):
+    """A metric that regresses when it grows by more than tolerance (relative) and min_delta (absolute)"""
+    metric: str
+    tolerance: float = 0.0
+    min_delta: float = 0.0
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], checks: List[Check],
+            key: str = 'name', **labels) -> List[Dict[str, Any]]:
+    """Entries of results whose metrics grew past their check; labels are copied into every regression"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for check in checks:
+            growth = current[check.metric] - previous[check.metric]
+            if growth > previous[check.metric] * check.tolerance and growth > check.min_delta:
+                regressions.append({**labels, key: name, 'metric': check.metric,
+                                    'baseline': previous[check.metric], 'current': current[check.metric]})
+    return regressions
+
+
+def machine_info() -> Dict[str, Any]:
+    """Where results were measured; timings from different machines do not compare"""
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version()
+    }
+
+
+def require_baselines(paths: List[str], save_baseline: bool):
+    """Exit with status 2 before benchmarking when a baseline is missing, unless this run saves it"""
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing and not save_baseline:
+        print(f"ERROR: no baseline at {', '.join(missing)}, so there is nothing to compare with. "
+              "Run with --save-baseline on the reference machine first.", file=sys.stderr)
+        sys.exit(2)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """Results stored by save_baseline(); warns when they were measured on another machine"""
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != machine_info():
+        print(f"WARNING: {path} was measured on {baseline.get('machine')}, this is {machine_info()}; "
+              "expect timing differences that are not regressions", file=sys.stderr)
+    return baseline['results']
+
+
+def save_baseline(path: str, results: Dict[str, Any]):
+    """Store results as a baseline, noting the machine they were measured on"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'machine': machine_info(), 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
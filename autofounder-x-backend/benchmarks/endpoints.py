@@ -0,0 +1,381 @@
+"""Latency, queries and allocations of every blueprint endpoint at several database scales.
+
+Each scale gets a SQLite database seeded once by src/seed_data.py with that many
+projects and the users, agents, marketplace items and competition entries that go with
+them (kept in --db-dir and copied fresh for every run, since write endpoints change it). Every endpoint is then driven through the Flask test client: p50/p95/p99 latency
+and queries per request over --requests calls, and the allocation peak per request
+from a shorter pass under tracemalloc (kept apart so tracing does not skew latency).
+
+Results are compared with a stored baseline; an endpoint regresses when its p95 or
+allocation peak grows by more than --tolerance, or when it runs more queries. The
+script exits with status 1 on any regression, and with status 2 before benchmarking
+when there is no baseline. Save one on the reference machine with --save-baseline;
+it records the machine, and comparing on another one warns that timings differ.
+
+Usage: python benchmarks/endpoints.py [--scales 1000,100000,1000000] [--requests 200]
+                                      [--only marketplace] [--baseline PATH] [--save-baseline]
+                                      [--tolerance 0.2] [--db-dir DIR] [--reseed] [--cache]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from common import (Check, auth_headers, compare, create_benchmark_app, load_baseline, percentile,
+                    require_baselines, save_baseline, summarize)
+
+from sqlalchemy import func, insert, select
+
+from src.agents.agent_manager import agent_manager
+from src.models.user import BattleArenaCompetition, CompetitionEntry, MarketplaceItem, Project, User, db
+from src.seed_data import seed_all_data
+from src.services.query_stats import query_profiler
+from src.services.tracing import tracer
+from src.services.view_counter import view_counter
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'endpoints.json')
+
+PASSWORD = 'Benchmark1'
+OTHER_PASSWORD = 'Benchmark2'
+# Hashing cost is benchmarked by login_throughput.py; here it would hide everything else
+HASH_METHOD = 'pbkdf2:sha256:1000'
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # (ctx, i) -> (path, test client kwargs) for the i-th request
+    request: Callable[[Dict[str, Any], int], Tuple[str, Dict[str, Any]]]
+    # Creates the rows destructive requests consume; gets ctx and the number of requests
+    prepare: Optional[Callable[[Dict[str, Any], int], None]] = None
+
+
+def _new_projects(ctx: Dict[str, Any], count: int, **values) -> List[int]:
+    """Insert count projects for the owner and return their ids"""
+    with ctx['app'].app_context():
+        now = datetime.utcnow()
+        ids = db.session.execute(insert(Project).returning(Project.id), [
+            {'user_id': ctx['owner_id'], 'name': f'Prepared {i}', 'description': 'Prepared for a write benchmark',
+             'is_public': True, 'created_at': now, 'updated_at': now, **values}
+            for i in range(count)
+        ]).scalars().all()
+        db.session.commit()
+    return ids
+
+
+def _prepare_projects(key: str, **values) -> Callable[[Dict[str, Any], int], None]:
+    def prepare(ctx: Dict[str, Any], count: int):
+        ctx[key] = _new_projects(ctx, count, **values)
+    return prepare
+
+
+def _prepare_users(ctx: Dict[str, Any], count: int):
+    with ctx['app'].app_context():
+        ids = db.session.execute(insert(User).returning(User.id), [
+            {'username': f'disposable{ctx["scale"]}_{i}', 'email': f'disposable{i}@example.com', 'password_hash': 'x'}
+            for i in range(count)
+        ]).scalars().all()
+        db.session.commit()
+    ctx['disposable_users'] = ids
+
+
+def _prepare_run(ctx: Dict[str, Any], count: int):
+    with tracer.run('benchmark', owner=ctx['owner_id']) as run_id:
+        with tracer.span('prepare', 'benchmark'):
+            pass
+    ctx['run_id'] = run_id
+
+
+def _prepare_results(ctx: Dict[str, Any], count: int):
+    ideation = agent_manager.agents['ideation']
+    agent_manager.agent_results['ideation'] = {
+        'market_trends': ideation.analyze_market_trends({'business_model': 'saas'}),
+        'market_size': ideation.estimate_market_size({'business_model': 'saas'}),
+        'success': True
+    }
+
+
+def _get(path: str, headers: str = 'owner') -> Callable:
+    return lambda ctx, i: (path.format(**ctx, i=i), {'headers': ctx['headers'][headers]})
+
+
+def _send(path: str, body: Callable[[Dict[str, Any], int], Any], headers: str = 'owner') -> Callable:
+    return lambda ctx, i: (path.format(**ctx, i=i), {'headers': ctx['headers'][headers], 'json': body(ctx, i)})
+
+
+SCENARIOS = [
+    # auth
+    Scenario('auth.register', 'POST', _send('/api/auth/register', lambda ctx, i: {
+        'username': f'new{ctx["scale"]}_{i}', 'email': f'new{i}@example.org', 'password': PASSWORD}, headers='none')),
+    Scenario('auth.login', 'POST', _send('/api/auth/login', lambda ctx, i: {
+        'email': ctx['other_email'], 'password': PASSWORD}, headers='none')),
+    Scenario('auth.logout', 'POST', lambda ctx, i: ('/api/auth/logout', {'headers': auth_headers(ctx['app'], ctx['other_id'])})),
+    Scenario('auth.profile', 'GET', _get('/api/auth/profile')),
+    Scenario('auth.update_profile', 'PUT', _send('/api/auth/profile', lambda ctx, i: {'first_name': f'Bench{i}'})),
+    Scenario('auth.change_password', 'POST', _send('/api/auth/change-password', lambda ctx, i: {
+        'current_password': (PASSWORD, OTHER_PASSWORD)[i % 2], 'new_password': (OTHER_PASSWORD, PASSWORD)[i % 2]},
+        headers='other')),
+    # projects
+    Scenario('projects.list', 'GET', _get('/api/projects')),
+    Scenario('projects.list_page_total', 'GET', _get('/api/projects?page=2&include_total=true')),
+    Scenario('projects.list_fields', 'GET', _get('/api/projects?fields=id,name,status')),
+    Scenario('projects.get', 'GET', _get('/api/projects/{owner_project_id}')),
+    Scenario('projects.agents', 'GET', _get('/api/projects/{owner_project_id}/agents')),
+    Scenario('projects.create', 'POST', _send('/api/projects', lambda ctx, i: {
+        'name': f'Benchmark project {i}', 'description': 'Created by the endpoint benchmark', 'business_model': 'saas'})),
+    Scenario('projects.import', 'POST', _send('/api/projects/import', lambda ctx, i: [
+        {'name': f'Imported {i}-{j}', 'description': 'Bulk imported'} for j in range(50)])),
+    Scenario('projects.update', 'PUT', _send('/api/projects/{owner_project_id}', lambda ctx, i: {'description': f'Updated {i}'})),
+    Scenario('projects.delete', 'DELETE', lambda ctx, i: (f"/api/projects/{ctx['deletable'][i]}", {'headers': ctx['headers']['owner']}),
+             _prepare_projects('deletable')),
+    Scenario('projects.restore', 'POST', lambda ctx, i: (f"/api/projects/{ctx['restorable'][i]}/restore", {'headers': ctx['headers']['owner']}),
+             _prepare_projects('restorable', is_active=False)),
+    Scenario('projects.add_agent', 'POST', lambda ctx, i: (f"/api/projects/{ctx['agentless'][i]}/agents",
+                                                            {'headers': ctx['headers']['owner'], 'json': {'agent_type': 'ideation'}}),
+             _prepare_projects('agentless')),
+    # marketplace
+    Scenario('marketplace.items', 'GET', _get('/api/marketplace/items', headers='none')),
+    Scenario('marketplace.items_category', 'GET', _get('/api/marketplace/items?category=Finance&limit=24', headers='none')),
+    Scenario('marketplace.items_page_total', 'GET', _get('/api/marketplace/items?page=3&include_total=true', headers='none')),
+    Scenario('marketplace.search', 'GET', _get('/api/marketplace/search?q=analytics+dashboard', headers='none')),
+    Scenario('marketplace.item', 'GET', lambda ctx, i: (f"/api/marketplace/items/{ctx['item_ids'][i % len(ctx['item_ids'])]}", {})),
+    Scenario('marketplace.categories', 'GET', _get('/api/marketplace/categories', headers='none')),
+    Scenario('marketplace.my_items', 'GET', _get('/api/marketplace/my-items')),
+    Scenario('marketplace.publish', 'POST', lambda ctx, i: ('/api/marketplace/publish', {
+        'headers': ctx['headers']['owner'], 'json': {'project_id': ctx['unpublished'][i], 'category': 'Finance'}}),
+             _prepare_projects('unpublished')),
+    Scenario('marketplace.vote', 'POST', lambda ctx, i: ('/api/marketplace/vote', {
+        'headers': ctx['headers']['owner'], 'json': {'item_id': ctx['item_ids'][i % len(ctx['item_ids'])]}})),
+    # battle arena
+    Scenario('battle_arena.competitions', 'GET', _get('/api/battle-arena/competitions', headers='none')),
+    Scenario('battle_arena.create', 'POST', _send('/api/battle-arena/competitions', lambda ctx, i: {
+        'name': f'Benchmark cup {i}', 'start_date': '2025-01-01', 'end_date': '2099-12-31'})),
+    Scenario('battle_arena.enter', 'POST', lambda ctx, i: ('/api/battle-arena/enter', {
+        'headers': ctx['headers']['owner'], 'json': {'competition_id': ctx['competition_id'], 'project_id': ctx['unentered'][i]}}),
+             _prepare_projects('unentered')),
+    Scenario('battle_arena.leaderboard', 'GET', _get('/api/battle-arena/leaderboard/{competition_id}?limit=100', headers='none')),
+    Scenario('battle_arena.rank', 'GET', _get('/api/battle-arena/entries/{entry_id}/rank', headers='none')),
+    Scenario('battle_arena.vote', 'POST', _send('/api/battle-arena/vote', lambda ctx, i: {'entry_id': ctx['entry_id']},
+                                                 headers='other')),
+    Scenario('battle_arena.my_entries', 'GET', _get('/api/battle-arena/my-entries')),
+    # agents (start, start-all, stop and ideation/analyze are left out: they spawn agent threads that sleep for seconds)
+    Scenario('agents.catalog', 'GET', _get('/api/agents')),
+    Scenario('agents.get', 'GET', _get('/api/agents/ideation')),
+    Scenario('agents.configure', 'POST', _send('/api/agents/ideation/configure', lambda ctx, i: {'config': {'name': 'Ideation Agent'}})),
+    Scenario('agents.result', 'GET', _get('/api/agents/ideation/results'), _prepare_results),
+    Scenario('agents.results', 'GET', _get('/api/agents/results?fields=status,results.market_size'), _prepare_results),
+    Scenario('agents.logs', 'GET', _get('/api/agents/ideation/logs')),
+    Scenario('agents.system_status', 'GET', _get('/api/agents/system-status')),
+    Scenario('agents.runs', 'GET', _get('/api/agents/runs'), _prepare_run),
+    Scenario('agents.run_trace', 'GET', _get('/api/agents/runs/{run_id}/trace'), _prepare_run),
+    Scenario('agents.ideation_trends', 'GET', _get('/api/agents/ideation/trends')),
+    Scenario('agents.clear', 'POST', _send('/api/agents/learning/clear', lambda ctx, i: {})),
+    Scenario('agents.clear_all', 'POST', _send('/api/agents/clear-all', lambda ctx, i: {})),
+    # users
+    Scenario('users.list', 'GET', _get('/api/users', headers='none')),
+    Scenario('users.get', 'GET', _get('/api/users/{other_id}', headers='none')),
+    Scenario('users.create', 'POST', _send('/api/users', lambda ctx, i: {
+        'username': f'plain{ctx["scale"]}_{i}', 'email': f'plain{i}@example.org'}, headers='none')),
+    Scenario('users.update', 'PUT', _send('/api/users/{other_id}', lambda ctx, i: {'username': ctx['other_username']}, headers='none')),
+    Scenario('users.delete', 'DELETE', lambda ctx, i: (f"/api/users/{ctx['disposable_users'][i]}", {}), _prepare_users),
+]
+
+
+def prepare_database(db_dir: str, scale: int, reseed: bool) -> str:
+    """Path of a fresh working copy of the seeded database for a scale"""
+    seeded = os.path.join(db_dir, f'endpoints-{scale}.db')
+    if reseed or not os.path.exists(seeded):
+        if os.path.exists(seeded):
+            os.remove(seeded)
+        start = time.perf_counter()
+        app = create_benchmark_app(f'sqlite:///{seeded}', SLOW_QUERY_THRESHOLD=-1,
+                                   PASSWORD_HASH_METHOD=HASH_METHOD, PASSWORD_HASH_WORKERS=0)
+        with app.app_context():
+            # Few users with many projects each, so the owner's list endpoints page through thousands
+            seed_all_data(scale, users=max(100, scale // 100), password=PASSWORD)
+            db.engine.dispose()
+        print(f'Seeded {scale} projects in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+
+    working = os.path.join(db_dir, f'endpoints-{scale}-run.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    shutil.copyfile(seeded, working)
+    return working
+
+
+def build_context(app, scale: int) -> Dict[str, Any]:
+    with app.app_context():
+        other_email, other_username = db.session.execute(select(User.email, User.username).where(User.id == 2)).one()
+        owner_project_id = db.session.execute(select(func.min(Project.id)).where(Project.user_id == 1)).scalar()
+
+        # The running competition with the most entries; votes need one that has not ended
+        today = date.today()
+        competition_id = db.session.execute(
+            select(BattleArenaCompetition.id)
+            .outerjoin(CompetitionEntry)
+            .where(BattleArenaCompetition.start_date <= today, BattleArenaCompetition.end_date >= today)
+            .group_by(BattleArenaCompetition.id)
+            .order_by(func.count(CompetitionEntry.id).desc(), BattleArenaCompetition.id)
+        ).scalar()
+        # An entry the other user may vote for: one of the owner's, added when the competition has none
+        entry_id = db.session.execute(
+            select(func.min(CompetitionEntry.id))
+            .join(Project, Project.id == CompetitionEntry.project_id)
+            .where(CompetitionEntry.competition_id == competition_id, Project.user_id == 1)
+        ).scalar()
+        if entry_id is None:
+            entry_id = db.session.execute(insert(CompetitionEntry).returning(CompetitionEntry.id), [{
+                'competition_id': competition_id, 'project_id': owner_project_id, 'votes': 0,
+                'submitted_at': datetime.utcnow()
+            }]).scalar()
+            db.session.commit()
+
+        # Items of other users, spread over the table, for votes and detail reads
+        item_count = db.session.execute(select(func.count(MarketplaceItem.id))).scalar()
+        item_ids = db.session.execute(
+            select(MarketplaceItem.id)
+            .join(Project, Project.id == MarketplaceItem.project_id)
+            .where(Project.user_id != 1, MarketplaceItem.id % max(1, item_count // 500) == 0)
+            .order_by(MarketplaceItem.id)
+            .limit(500)
+        ).scalars().all()
+    return {
+        'app': app,
+        'scale': scale,
+        'owner_id': 1,
+        'other_id': 2,
+        'other_email': other_email,
+        'other_username': other_username,
+        'owner_project_id': owner_project_id,
+        'competition_id': competition_id,
+        'entry_id': entry_id,
+        'item_ids': item_ids,
+        'headers': {
+            'owner': auth_headers(app, 1),
+            'other': auth_headers(app, 2),
+            'none': {}
+        }
+    }
+
+
+def run_scenario(client, ctx: Dict[str, Any], scenario: Scenario, requests: int, warmup: int, alloc_requests: int) -> Dict[str, Any]:
+    if scenario.prepare:
+        scenario.prepare(ctx, warmup + requests + alloc_requests)
+
+    def send(request: Tuple[str, Dict[str, Any]]):
+        path, kwargs = request
+        return client.open(path, method=scenario.method, **kwargs)
+
+    for i in range(warmup):
+        send(scenario.request(ctx, i))
+
+    latencies, queries, statuses = [], [], Counter()
+    for i in range(warmup, warmup + requests):
+        request = scenario.request(ctx, i)  # built outside the timing (it may mint a token)
+        with query_profiler.record() as recorder:
+            start = time.perf_counter()
+            response = send(request)
+            latencies.append(time.perf_counter() - start)
+        queries.append(recorder.count)
+        statuses[response.status_code] += 1
+
+    # Allocation peak per request, in its own pass so tracemalloc does not slow the timed one
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(warmup + requests, warmup + requests + alloc_requests):
+            request = scenario.request(ctx, i)
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            send(request)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        **summarize(latencies),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'alloc_peak_kib': round(percentile(peaks, 50) / 1024, 1),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def run_scale(scale: int, scenarios: List[Scenario], args) -> Dict[str, Any]:
+    database = prepare_database(args.db_dir, scale, args.reseed)
+    config = {'PASSWORD_HASH_METHOD': HASH_METHOD, 'PASSWORD_HASH_WORKERS': 0}
+    if not args.cache:
+        config.update(RESPONSE_CACHE_ENABLED=False, USER_CACHE_TTL=0)
+    app = create_benchmark_app(f'sqlite:///{database}', **config)
+    ctx = build_context(app, scale)
+    client = app.test_client()
+
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(client, ctx, scenario, args.requests, args.warmup, args.alloc_requests)
+        print(f"{scale:>8} {scenario.name:<32} p95 {results[scenario.name]['p95_ms']:>9.3f} ms", file=sys.stderr)
+
+    # Write buffered views to this scale's database before the next app takes over the counter
+    view_counter.flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='1000,100000,1000000', help='comma separated project/item counts')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--alloc-requests', type=int, default=20, help='requests per endpoint under tracemalloc')
+    parser.add_argument('--only', help='run endpoints whose name contains this')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative growth of p95 and allocations')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='ignore p95 changes smaller than this')
+    parser.add_argument('--db-dir', default=os.path.join(tempfile.gettempdir(), 'autofounder-bench'),
+                        help='where seeded databases are kept between runs')
+    parser.add_argument('--reseed', action='store_true', help='seed the databases again')
+    parser.add_argument('--cache', action='store_true', help='keep the response and user caches on')
+    args = parser.parse_args()
+
+    require_baselines([args.baseline], args.save_baseline)
+    os.makedirs(args.db_dir, exist_ok=True)
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or args.only in scenario.name]
+    results = {str(scale): run_scale(int(scale), scenarios, args) for scale in args.scales.split(',')}
+
+    report = {'results': results}
+    # Latencies of failing endpoints measure the error path, so list them next to the numbers
+    report['server_errors'] = [
+        {'scale': scale, 'endpoint': name, 'statuses': result['statuses']}
+        for scale, endpoints in results.items() for name, result in endpoints.items()
+        if any(status.startswith('5') for status in result['statuses'])
+    ]
+    if os.path.exists(args.baseline):
+        baseline = load_baseline(args.baseline)
+        checks = [Check('p95_ms', args.tolerance, args.min_delta_ms), Check('alloc_peak_kib', args.tolerance),
+                  Check('queries_per_request')]
+        report['regressions'] = [regression for scale, endpoints in results.items()
+                                 for regression in compare(endpoints, baseline.get(scale, {}), checks,
+                                                           key='endpoint', scale=scale)]
+        # Not compared, so say so rather than pass them silently
+        report['not_in_baseline'] = [f'{scale} {name}' for scale, endpoints in results.items()
+                                     for name in endpoints if name not in baseline.get(scale, {})]
+        if report['not_in_baseline']:
+            print(f"WARNING: not in the baseline, not compared: {', '.join(report['not_in_baseline'])}", file=sys.stderr)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+    print(json.dumps(report, indent=2))
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Response encoding cost of the largest list payloads, per JSON encoder.
+
+Times GET /api/marketplace/items, GET /api/projects and GET /api/agents/results
+with JSON_ENCODER=json and JSON_ENCODER=orjson, plus the pre-serializer path
+(ORM objects, to_dict() and Flask's default provider) for the marketplace page.
+
+Usage: python benchmarks/json_encoding.py [--items 5000] [--limit 1000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from common import auth_headers, create_benchmark_app, summarize, timed
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+
+from src.agents.agent_manager import agent_manager
+from src.models.user import MarketplaceItem, Project, User, db
+
+PROJECT = {
+    'name': 'Benchmark project',
+    'description': 'A project used to fill agent results',
+    'business_model': 'B2B SaaS',
+    'target_market': 'Small businesses'
+}
+
+
+def seed(app, item_count: int) -> int:
+    """One owner with item_count public projects, each listed on the marketplace"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with app.app_context():
+        owner = User(username='owner', email='owner@example.com', password_hash='x',
+                     first_name='Bench', last_name='Owner')
+        db.session.add(owner)
+        db.session.commit()
+
+        project_ids = db.session.execute(insert(Project).returning(Project.id), [{
+            'user_id': owner.id,
+            'name': f'Project {i}',
+            'description': 'Benchmark project ' * 8,
+            'business_model': 'Subscription',
+            'target_market': 'Developers',
+            'status': 'building',
+            'is_public': True,
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now - timedelta(minutes=i)
+        } for i in range(item_count)]).scalars().all()
+        db.session.execute(insert(MarketplaceItem), [{
+            'project_id': project_id,
+            'title': f'Item {project_id}',
+            'description': 'Benchmark listing ' * 8,
+            'category': rng.choice(['SaaS Tools', 'Finance', 'Education']),
+            'price': rng.choice([None, 9.99, 49.0, 199.5]),
+            'votes': rng.randint(0, 500),
+            'views': rng.randint(0, 5000),
+            'created_at': now - timedelta(minutes=i)
+        } for i, project_id in enumerate(project_ids)])
+        db.session.commit()
+        return owner.id
+
+
+def fill_agent_results():
+    """Run every agent once with simulated work disabled so /agents/results is fully populated"""
+    for agent_type, agent in agent_manager.agents.items():
+        agent.simulate_work = lambda *args, **kwargs: None
+        agent_manager.agent_results[agent_type] = agent.execute(dict(PROJECT))
+
+
+def time_requests(client, url: str, headers, repeat: int):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)[:200]
+    samples = [timed(lambda: client.get(url, headers=headers)) for _ in range(repeat)]
+    return {'bytes': len(response.data), **summarize(samples)}
+
+
+def legacy_marketplace_page(app, limit: int, repeat: int):
+    """The marketplace page as it was built before: ORM rows, to_dict() and per-item lookups"""
+    provider = DefaultJSONProvider(app)
+
+    def build():
+        items_list = []
+        for item in MarketplaceItem.query.join(Project).filter(Project.is_public == True)\
+                                         .order_by(MarketplaceItem.created_at.desc()).limit(limit):
+            item_dict = item.to_dict()
+            project = db.session.get(Project, item.project_id)
+            item_dict['project'] = {'name': project.name, 'description': project.description,
+                                    'status': project.status}
+            user = db.session.get(User, project.user_id)
+            item_dict['creator'] = {'username': user.username, 'first_name': user.first_name,
+                                    'last_name': user.last_name}
+            items_list.append(item_dict)
+        body = provider.dumps({'success': True, 'items': items_list}).encode('utf-8')
+        db.session.remove()
+        return body
+
+    with app.test_request_context():
+        size = len(build())
+        samples = [timed(build) for _ in range(repeat)]
+    return {'bytes': size, **summarize(samples)}
+
+
+def run(encoder: str, database_uri: str, owner_id: int, limit: int, repeat: int):
+    app = create_benchmark_app(database_uri, JSON_ENCODER=encoder, RESPONSE_CACHE_ENABLED=False)
+    client = app.test_client()
+    headers = auth_headers(app, owner_id)
+    return {
+        'encoder': app.json.encoder,
+        'marketplace_items': time_requests(client, f'/api/marketplace/items?limit={limit}', headers, repeat),
+        'projects': time_requests(client, f'/api/projects?limit={limit}', headers, repeat),
+        'agents_results': time_requests(client, '/api/agents/results', headers, repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=1000, help='rows per list page')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    database_uri = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='json-encoding-'), 'bench.db')}"
+    app = create_benchmark_app(database_uri, RESPONSE_CACHE_ENABLED=False)
+    owner_id = seed(app, args.items)
+    fill_agent_results()
+
+    results = {
+        'legacy_marketplace_items': legacy_marketplace_page(app, args.limit, args.repeat),
+        'runs': [run(encoder, database_uri, owner_id, args.limit, args.repeat) for encoder in ('json', 'orjson')]
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Concurrent login throughput with password hashing inline vs on the process pool.
+
+A bystander thread polls a cheap read endpoint during the burst to show how much
+the logins slow everything else down.
+
+Usage: python benchmarks/login_throughput.py [--threads 8] [--logins 10] [--workers 0,2]
+                                             [--seed-method scrypt:32768:8:1]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from common import create_benchmark_app, summarize, timed
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from src.models.user import User, db
+from src.services.passwords import password_hasher
+
+PASSWORD = 'Benchmark1'
+
+
+def seed(app, user_count: int, method: str):
+    """Users sharing one password hash made with method (a different one exercises rehash-on-login)"""
+    pwhash = generate_password_hash(PASSWORD, method)
+    with app.app_context():
+        db.session.execute(insert(User), [{
+            'username': f'user{i}',
+            'email': f'user{i}@example.com',
+            'password_hash': pwhash
+        } for i in range(user_count)])
+        db.session.commit()
+
+
+def run(workers: int, threads: int, logins_per_thread: int, seed_method: str):
+    workdir = tempfile.mkdtemp(prefix='login-')
+    app = create_benchmark_app(f"sqlite:///{os.path.join(workdir, 'bench.db')}", RESPONSE_CACHE_ENABLED=False,
+                               PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_MAX_PENDING=threads)
+    seed(app, threads, seed_method)
+
+    # Start the pool before timing so process startup is not counted
+    password_hasher.verify(generate_password_hash('warmup', 'pbkdf2:sha256:1'), 'warmup')
+
+    logins, bystander, statuses = [], [], {}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_worker(index: int):
+        client = app.test_client()
+        body = {'email': f'user{index}@example.com', 'password': PASSWORD}
+        for _ in range(logins_per_thread):
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json=body)
+            elapsed = time.perf_counter() - start
+            with lock:
+                logins.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    def bystander_worker():
+        client = app.test_client()
+        while not done.is_set():
+            bystander.append(timed(lambda: client.get('/api/marketplace/categories')))
+            time.sleep(0.005)
+
+    workers_threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    watcher = threading.Thread(target=bystander_worker)
+    watcher.start()
+    start = time.perf_counter()
+    for thread in workers_threads:
+        thread.start()
+    for thread in workers_threads:
+        thread.join()
+    wall_time = time.perf_counter() - start
+    done.set()
+    watcher.join()
+
+    with app.app_context():
+        on_current_method = User.query.filter(User.password_hash.like(f'{password_hasher.method}$%')).count()
+    password_hasher.shutdown()
+
+    total = threads * logins_per_thread
+    return {
+        'hash_workers': workers,
+        'method': password_hasher.method,
+        'logins': total,
+        'wall_time_s': round(wall_time, 3),
+        'throughput_per_s': round(total / wall_time, 1),
+        'statuses': statuses,
+        'users_on_current_method': on_current_method,
+        'login_latency': summarize(logins),
+        'bystander_latency': summarize(bystander)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=10, help='logins per thread')
+    parser.add_argument('--workers', default='0,2', help='comma separated hash pool sizes (0 = inline)')
+    parser.add_argument('--seed-method', default='scrypt:32768:8:1', help='hash method of the seeded users')
+    args = parser.parse_args()
+
+    results = [run(int(workers), args.threads, args.logins, args.seed_method)
+               for workers in args.workers.split(',')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Mixed read/write endpoint load against each SQLite PRAGMA profile.
+
+Each thread issues 70% reads (40% listing pages, 20% item details, 10% leaderboard)
+and 30% votes (15% marketplace, 15% battle arena).
+
+Usage: python benchmarks/sqlite_profile.py [--threads 8] [--requests 300] [--items 500]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from common import auth_headers, create_benchmark_app, summarize
+
+from src.models.user import (BattleArenaCompetition, CompetitionEntry, MarketplaceItem,
+                             Project, User, db)
+from src.services.view_counter import view_counter
+
+
+def seed(app, item_count: int, voter_count: int):
+    """Create one owner with published projects entered into a competition, plus voters"""
+    with app.app_context():
+        owner = User(username='owner', email='owner@example.com', password_hash='x')
+        db.session.add(owner)
+        voters = [User(username=f'voter{i}', email=f'voter{i}@example.com', password_hash='x')
+                  for i in range(voter_count)]
+        db.session.add_all(voters)
+        db.session.flush()
+
+        competition = BattleArenaCompetition.query.first()
+        for i in range(item_count):
+            project = Project(user_id=owner.id, name=f'Project {i}', description='Benchmark project',
+                              is_public=True)
+            db.session.add(project)
+            db.session.flush()
+            db.session.add(MarketplaceItem(project_id=project.id, title=project.name,
+                                           category=random.choice(['SaaS Tools', 'Finance', 'Education'])))
+            db.session.add(CompetitionEntry(competition_id=competition.id, project_id=project.id))
+
+        db.session.commit()
+        return competition.id, [voter.id for voter in voters]
+
+
+def run_profile(profile: str, threads: int, requests_per_thread: int, item_count: int):
+    workdir = tempfile.mkdtemp(prefix=f'sqlite-{profile}-')
+    app = create_benchmark_app(f"sqlite:///{os.path.join(workdir, 'bench.db')}", SQLITE_PROFILE=profile,
+                               RESPONSE_CACHE_ENABLED=False)
+    competition_id, voter_ids = seed(app, item_count, threads)
+
+    reads, writes, errors = [], [], []
+    lock = threading.Lock()
+
+    def worker(voter_id: int, worker_seed: int):
+        rng = random.Random(worker_seed)
+        client = app.test_client()
+        headers = auth_headers(app, voter_id)
+        for _ in range(requests_per_thread):
+            roll = rng.random()
+            item_id = rng.randint(1, item_count)
+            start = time.perf_counter()
+            if roll < 0.4:
+                response = client.get(f'/api/marketplace/items?page={rng.randint(1, 20)}&sort=votes')
+                bucket = reads
+            elif roll < 0.6:
+                response = client.get(f'/api/marketplace/items/{item_id}')
+                bucket = reads
+            elif roll < 0.7:
+                response = client.get(f'/api/battle-arena/leaderboard/{competition_id}')
+                bucket = reads
+            elif roll < 0.85:
+                response = client.post('/api/marketplace/vote', json={'item_id': item_id}, headers=headers)
+                bucket = writes
+            else:
+                response = client.post('/api/battle-arena/vote', json={'entry_id': item_id}, headers=headers)
+                bucket = writes
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code >= 500:
+                    errors.append(response.get_json().get('message'))
+                else:
+                    bucket.append(elapsed)
+
+    workers = [threading.Thread(target=worker, args=(voter_id, i)) for i, voter_id in enumerate(voter_ids)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall_time = time.perf_counter() - start
+    view_counter.flush()
+
+    total = threads * requests_per_thread
+    return {
+        'profile': profile,
+        'requests': total,
+        'wall_time_s': round(wall_time, 3),
+        'throughput_rps': round(total / wall_time, 1),
+        'errors': len(errors),
+        'reads': summarize(reads),
+        'writes': summarize(writes)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=300, help='requests per thread')
+    parser.add_argument('--items', type=int, default=500)
+    args = parser.parse_args()
+
+    results = [run_profile(profile, args.threads, args.requests, args.items)
+               for profile in ('default', 'performance')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,8 @@ from .launch_agent import LaunchAgent
 from .learning_agent import LearningAgent
 from .legal_agent import LegalAgent
 from .monetization_agent import MonetizationAgent
+from src.services.metrics import RUN_BUCKETS, metrics_registry
+from src.services.tracing import tracer
 
 class AgentStatus(Enum):
     IDLE = "idle"
@@ -26,6 +28,13 @@ class AgentStatus(Enum):
     COMPLETED = "completed"
     ERROR = "error"
 
+# Agent run metrics, exported at /api/metrics
+AGENT_RUNS = metrics_registry.counter(
+    "autofounder_agent_runs_total", "Agent runs by type and outcome (started, completed, stopped, failed)",
+    ["agent_type", "outcome"])
+AGENT_RUN_DURATION = metrics_registry.histogram(
+    "autofounder_agent_run_duration_seconds", "Agent execute() wall time by type", ["agent_type"], RUN_BUCKETS)
+
 class AgentManager:
     """Manages all AI agents and their execution"""
     
@@ -36,6 +45,26 @@ class AgentManager:
         self.agent_threads = {}
         self.project_data = {}
         
+        # Read from the status map at scrape time, so the hot path pays nothing for them
+        metrics_registry.gauge(
+            "autofounder_agent_runs_in_progress", "Agent runs queued (thread started) or running (executing) by type",
+            ["agent_type", "state"], self._runs_in_progress)
+        metrics_registry.gauge(
+            "autofounder_agent_threads", "Live agent execution threads", (),
+            lambda: {(): sum(1 for thread in self.agent_threads.values() if thread.is_alive())})
+        metrics_registry.gauge(
+            "autofounder_process_threads", "Threads in this worker process", (),
+            lambda: {(): threading.active_count()})
+        
+    def _runs_in_progress(self) -> Dict[tuple, int]:
+        """Queued/running gauge values for every agent type"""
+        states = {AgentStatus.ACTIVE: "queued", AgentStatus.BUILDING: "running"}
+        values = {}
+        for agent_type, status in self.agent_status.items():
+            for agent_status, state in states.items():
+                values[(agent_type, state)] = int(status == agent_status)
+        return values
+    
     def _initialize_agents(self) -> Dict[str, Any]:
         """Initialize all available agents"""
         return {
@@ -100,22 +129,26 @@ class AgentManager:
         # Store project data for the agent
         self.project_data[agent_type] = project_data
         
-        # Start agent in a separate thread
-        thread = threading.Thread(
-            target=self._execute_agent,
-            args=(agent_type, project_data),
-            daemon=True
-        )
-        thread.start()
-        self.agent_threads[agent_type] = thread
+        # Start agent in a separate thread, traced as part of the caller's run (or a run of its own)
+        with tracer.run(f"start_agent:{agent_type}", owner=project_data.get("user_id")) as run_id:
+            thread = threading.Thread(
+                target=self._execute_agent,
+                args=(agent_type, project_data, run_id, time.perf_counter()),
+                name=f"agent-{agent_type}",
+                daemon=True
+            )
+            thread.start()
+            self.agent_threads[agent_type] = thread
         
         self.agent_status[agent_type] = AgentStatus.ACTIVE
+        AGENT_RUNS.inc(agent_type, "started")
         
         return {
             "success": True,
             "message": f"{self.agents[agent_type].name} started successfully",
             "agent_id": agent_type,
-            "status": AgentStatus.ACTIVE.value
+            "status": AgentStatus.ACTIVE.value,
+            "run_id": run_id
         }
     
     def stop_agent(self, agent_type: str) -> Dict[str, Any]:
@@ -143,19 +176,22 @@ class AgentManager:
         started_agents = []
         failed_agents = []
         
-        for agent_type in self.agents.keys():
-            if self.agent_status[agent_type] == AgentStatus.IDLE:
-                result = self.start_agent(agent_type, project_data)
-                if result["success"]:
-                    started_agents.append(agent_type)
-                else:
-                    failed_agents.append({"agent": agent_type, "error": result["error"]})
+        # One run for all agents, so their spans share a timeline
+        with tracer.run("start_all_agents", owner=project_data.get("user_id")) as run_id:
+            for agent_type in self.agents.keys():
+                if self.agent_status[agent_type] == AgentStatus.IDLE:
+                    result = self.start_agent(agent_type, project_data)
+                    if result["success"]:
+                        started_agents.append(agent_type)
+                    else:
+                        failed_agents.append({"agent": agent_type, "error": result["error"]})
         
         return {
             "success": len(failed_agents) == 0,
             "started_agents": started_agents,
             "failed_agents": failed_agents,
             "total_started": len(started_agents),
+            "run_id": run_id,
             "message": f"Started {len(started_agents)} agents successfully"
         }
     
@@ -210,8 +246,16 @@ class AgentManager:
             "results": all_results
         }
     
-    def _execute_agent(self, agent_type: str, project_data: Dict[str, Any]):
-        """Execute an agent in a separate thread"""
+    def _execute_agent(self, agent_type: str, project_data: Dict[str, Any], run_id: str = None, queued_at: float = None):
+        """Execute an agent in a separate thread, traced under the run that started it"""
+        with tracer.attach(run_id):
+            if queued_at is not None:
+                tracer.add_span("queued", "queue", queued_at, time.perf_counter(), agent=agent_type)
+            with tracer.span("AgentManager._execute_agent", "agent", agent=agent_type):
+                self._run_agent(agent_type, project_data)
+    
+    def _run_agent(self, agent_type: str, project_data: Dict[str, Any]):
+        """Run an agent and store its results and status"""
         try:
             agent = self.agents[agent_type]
             self.agent_status[agent_type] = AgentStatus.BUILDING
@@ -220,6 +264,7 @@ class AgentManager:
             start_time = time.time()
             results = agent.execute(project_data)
             execution_time = time.time() - start_time
+            AGENT_RUN_DURATION.observe(execution_time, agent_type)
             
             # Store results
             self.agent_results[agent_type] = results
@@ -228,8 +273,12 @@ class AgentManager:
             # Update status
             if self.agent_status[agent_type] != AgentStatus.IDLE:  # Check if not manually stopped
                 self.agent_status[agent_type] = AgentStatus.COMPLETED
+                AGENT_RUNS.inc(agent_type, "completed")
+            else:
+                AGENT_RUNS.inc(agent_type, "stopped")
                 
         except Exception as e:
+            AGENT_RUNS.inc(agent_type, "failed")
             self.agent_status[agent_type] = AgentStatus.ERROR
             self.agent_results[agent_type] = {
                 "error": str(e),
@@ -1,9 +1,16 @@
+import inspect
 import json
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
 
+from src.services.metrics import STEP_BUCKETS, metrics_registry
+from src.services.tracing import traced, tracer
+
+STEP_DURATION = metrics_registry.histogram(
+    "autofounder_agent_step_duration_seconds", "Duration of one agent work step by type", ["agent_type"], STEP_BUCKETS)
+
 class BaseAgent(ABC):
     """Base class for all AI agents in AutoFounder X"""
     
@@ -18,6 +25,13 @@ class BaseAgent(ABC):
         self.logs = []
         self.start_time = None
         self.end_time = None
+    
+    def __init_subclass__(cls, **kwargs):
+        """Trace the public methods each agent defines: execute() and the generators it calls"""
+        super().__init_subclass__(**kwargs)
+        for name, value in list(vars(cls).items()):
+            if not name.startswith('_') and inspect.isfunction(value) and not getattr(value, '__traced__', False):
+                setattr(cls, name, traced(value, 'agent'))
         
     def log(self, message: str, level: str = "info"):
         """Add a log entry"""
@@ -85,9 +99,13 @@ class BaseAgent(ABC):
         """Simulate work progress for demo purposes"""
         total_steps = len(steps)
         for i, step in enumerate(steps):
+            started = time.perf_counter()
             progress = int((i + 1) / total_steps * 100)
             self.update_status("running", progress, step)
             time.sleep(duration_per_step)
+            ended = time.perf_counter()
+            STEP_DURATION.observe(ended - started, self.agent_type)
+            tracer.add_span(step, "step", started, ended, agent=self.agent_type, progress=progress)
     
     def generate_mock_result(self, result_type: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate mock results for demo purposes"""
@@ -0,0 +1,249 @@
+import os
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from flask import Flask
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+from src.models.user import Agent, db
+from src.models.session import REPLICA_BIND_KEY
+from src.services.agent_catalog import agent_catalog
+from src.services.archiver import project_archiver
+from src.services.cache import response_cache
+from src.services.compression import response_compressor
+from src.services.json_provider import init_json
+from src.services.database import add_missing_columns, create_missing_indexes, fill_not_null_columns, get_engine_options, init_database, normalize_database_url
+from src.services.leaderboard import leaderboard
+from src.services.metrics import request_metrics
+from src.services.passwords import password_hasher
+from src.services.query_stats import query_profiler
+from src.services.principal import init_principal, user_cache
+from src.services.replica import replica_router
+from src.services.revocation import token_revocation
+from src.services.search import init_search_index
+from src.services.static_assets import static_assets
+from src.services.tracing import tracer
+from src.services.view_counter import view_counter
+from src.routes.user import user_bp
+from src.routes.auth import auth_bp
+from src.routes.projects import projects_bp
+from src.routes.agents import agents_bp
+from src.routes.marketplace import marketplace_bp
+from src.routes.battle_arena import battle_arena_bp
+from src.init_data import init_all_data
+
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), 'static')
+
+
+def default_config() -> Dict[str, Any]:
+    """Settings read from the environment, with the production defaults"""
+    config = {}
+
+    config['SECRET_KEY'] = 'autofounder-x-secret-key-2025'
+    config['JWT_SECRET_KEY'] = 'autofounder-x-jwt-secret-key-2025'
+    # Seconds an access token stays valid; a logout or deactivation is enforced sooner
+    config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(seconds=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 3600)))
+
+    # JSON encoder for API responses: 'orjson' (falls back when not installed) or 'json'
+    config['JSON_ENCODER'] = os.environ.get('JSON_ENCODER', 'orjson')
+
+    # Database configuration
+    default_database_url = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(os.environ.get('DATABASE_URL', default_database_url))
+    config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # Connection pool settings per worker process (ignored for SQLite)
+    config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 10))
+    config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # Optional read replica for public GET endpoints, see services/replica.py
+    if os.environ.get('DATABASE_REPLICA_URL'):
+        replica_url = normalize_database_url(os.environ['DATABASE_REPLICA_URL'])
+        config['SQLALCHEMY_BINDS'] = {
+            REPLICA_BIND_KEY: {'url': replica_url, **get_engine_options(config, replica_url)}
+        }
+    config['REPLICA_MAX_LAG'] = float(os.environ.get('REPLICA_MAX_LAG', 5.0))  # seconds
+    config['REPLICA_STICKY_SECONDS'] = float(os.environ.get('REPLICA_STICKY_SECONDS', 10.0))  # read-your-writes window
+
+    # SQLite connection tuning: 'performance' (WAL) or 'default', see services/database.py
+    config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'performance')
+    config['SQLITE_PRAGMAS'] = {}  # per-PRAGMA overrides on top of the profile
+
+    # Seconds before a worker rebuilds its in-memory leaderboards from the database
+    config['LEADERBOARD_MAX_AGE'] = float(os.environ.get('LEADERBOARD_MAX_AGE', 60.0))
+    # Seconds between writes of changed ranks to competition_entries.ranking (0 disables)
+    config['LEADERBOARD_PERSIST_INTERVAL'] = float(os.environ.get('LEADERBOARD_PERSIST_INTERVAL', 30.0))
+
+    # Marketplace view counts are buffered in memory and flushed in batches
+    config['VIEW_COUNTER_FLUSH_INTERVAL'] = float(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 5.0))
+    config['VIEW_COUNTER_FLUSH_THRESHOLD'] = int(os.environ.get('VIEW_COUNTER_FLUSH_THRESHOLD', 500))
+
+    # Response cache for public read endpoints: 'memory' (per worker LRU) or 'redis' (shared)
+    config['RESPONSE_CACHE_ENABLED'] = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    config['RESPONSE_CACHE_BACKEND'] = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    config['RESPONSE_CACHE_REDIS_URL'] = os.environ.get('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    config['RESPONSE_CACHE_TTL'] = float(os.environ.get('RESPONSE_CACHE_TTL', 60.0))  # upper bound on staleness from view counts and dates
+    # Lifetime of cached per-user project views in the memory backend, which other workers' writes cannot reach;
+    # with the redis backend they live until the next write
+    config['RESPONSE_CACHE_PRIVATE_TTL'] = float(os.environ.get('RESPONSE_CACHE_PRIVATE_TTL', 5.0))
+
+    # Agent catalog: seconds between checks of the agents table, and client cache lifetime for GET /agents
+    config['AGENT_CATALOG_REFRESH_INTERVAL'] = float(os.environ.get('AGENT_CATALOG_REFRESH_INTERVAL', 60.0))
+    config['AGENTS_CACHE_MAX_AGE'] = int(os.environ.get('AGENTS_CACHE_MAX_AGE', 3600))
+
+    # Projects inserted per transaction by the bulk import endpoint
+    config['PROJECT_IMPORT_CHUNK_SIZE'] = int(os.environ.get('PROJECT_IMPORT_CHUNK_SIZE', 1000))
+
+    # Deleted projects move to the *_archive tables after ARCHIVE_AFTER_DAYS; ARCHIVE_INTERVAL=0 disables the sweep
+    config['ARCHIVE_AFTER_DAYS'] = float(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+    config['ARCHIVE_INTERVAL'] = float(os.environ.get('ARCHIVE_INTERVAL', 3600))  # seconds between sweeps
+    config['ARCHIVE_BATCH_SIZE'] = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+
+    # Response compression (gzip, brotli when installed) for bodies of at least COMPRESSION_MIN_SIZE bytes
+    config['COMPRESSION_ENABLED'] = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    config['COMPRESSION_MIN_SIZE'] = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    config['COMPRESSION_LEVEL'] = int(os.environ.get('COMPRESSION_LEVEL', 6))  # gzip 1-9
+    config['BROTLI_QUALITY'] = int(os.environ.get('BROTLI_QUALITY', 5))  # brotli 0-11
+    config['COMPRESSION_STORE_MAX_BYTES'] = int(os.environ.get('COMPRESSION_STORE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # Built frontend: files under these static dirs have hashed names and are cached forever;
+    # files up to STATIC_MEMORY_MAX_SIZE bytes are served from memory
+    config['STATIC_IMMUTABLE_DIRS'] = os.environ.get('STATIC_IMMUTABLE_DIRS', 'assets').split(',')
+    config['STATIC_MEMORY_MAX_SIZE'] = int(os.environ.get('STATIC_MEMORY_MAX_SIZE', 64 * 1024))
+
+    # Seconds a worker trusts its copy of a user row (profile reads and the active check on every token);
+    # writes to the row drop it early (0 disables)
+    config['USER_CACHE_TTL'] = float(os.environ.get('USER_CACHE_TTL', 30.0))
+    config['USER_CACHE_MAX_ENTRIES'] = int(os.environ.get('USER_CACHE_MAX_ENTRIES', 10000))
+
+    # Password hashing cost and the per-worker process pool it runs on (0 workers hashes inline)
+    config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0))
+
+    # Seconds between each worker's pulls of tokens revoked elsewhere (logout takes effect within this)
+    config['TOKEN_REVOCATION_SYNC_INTERVAL'] = float(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 1.0))
+    # Seconds of past revocations every pull re-reads, covering slow commits and clock skew between workers
+    config['TOKEN_REVOCATION_SYNC_OVERLAP'] = float(os.environ.get('TOKEN_REVOCATION_SYNC_OVERLAP', 60.0))
+    config['TOKEN_REVOCATION_CAPACITY'] = int(os.environ.get('TOKEN_REVOCATION_CAPACITY', 100000))  # Bloom filter size hint
+
+    # Prometheus metrics for every request and agent run, served per worker process at /api/metrics
+    config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    # Bearer token scrapers must send; /api/metrics answers 404 while it is unset
+    config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
+
+    # Per-request query count and DB time headers: 'true', 'false' or unset to follow debug mode
+    config['SQL_DEBUG_HEADERS'] = {'true': True, 'false': False}.get(os.environ.get('SQL_DEBUG_HEADERS', '').lower())
+    # Queries slower than this many seconds are logged with their plan (negative disables)
+    config['SLOW_QUERY_THRESHOLD'] = float(os.environ.get('SLOW_QUERY_THRESHOLD', 0.1))
+
+    # Span tracing of agent runs, downloadable as Chrome traces; spans beyond TRACE_MAX_SPANS drop the oldest
+    config['TRACE_ENABLED'] = os.environ.get('TRACE_ENABLED', 'true').lower() == 'true'
+    config['TRACE_MAX_SPANS'] = int(os.environ.get('TRACE_MAX_SPANS', 50000))
+    config['TRACE_MAX_RUNS'] = int(os.environ.get('TRACE_MAX_RUNS', 100))
+    return config
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """Build the application with every service wired in and the database ready.
+
+    config is layered over default_config(); SQLALCHEMY_ENGINE_OPTIONS given there are
+    merged into the pool settings derived from the database URL rather than replacing them.
+    """
+    config = dict(config or {})
+    app = Flask(__name__, static_folder=STATIC_FOLDER)
+    app.config.update(default_config())
+    engine_options = config.pop('SQLALCHEMY_ENGINE_OPTIONS', {})
+    app.config.update(config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**get_engine_options(app.config), **engine_options}
+
+    # Initialize extensions
+    init_json(app)
+    db.init_app(app)
+    init_database(app)
+    query_profiler.init_app(app)
+    tracer.init_app(app)
+    replica_router.init_app(app)
+    leaderboard.init_app(app)
+    view_counter.init_app(app)
+    response_cache.init_app(app)
+    user_cache.init_app(app)
+    password_hasher.init_app(app)
+    agent_catalog.init_app(app)
+    project_archiver.init_app(app)
+    request_metrics.init_app(app)  # before compression, so response sizes are the compressed ones
+    response_compressor.init_app(app)
+    static_assets.init_app(app)
+    JWTManager(app)
+    init_principal(app)
+    token_revocation.init_app(app)
+    CORS(app, origins="*")  # Allow all origins for development
+
+    # Register blueprints
+    for blueprint in (user_bp, auth_bp, projects_bp, agents_bp, marketplace_bp, battle_arena_bp):
+        app.register_blueprint(blueprint, url_prefix='/api')
+    register_routes(app)
+
+    # Create database tables and initialize data
+    with app.app_context():
+        # Only the primary; a replica gets its schema through replication
+        db.create_all(bind_key=None)
+        add_missing_columns()
+        fill_not_null_columns()
+        create_missing_indexes()
+        init_search_index()
+
+        # The catalog is process-wide and may still hold another app's agents
+        agent_catalog.invalidate()
+        # Check if agents exist, if not initialize data
+        if Agent.query.count() == 0:
+            init_all_data()
+        agent_catalog.get()
+        # Load revoked tokens now rather than on the first authenticated request
+        token_revocation.sync()
+
+    return app
+
+
+def register_routes(app: Flask):
+    """Frontend, health and info routes outside the blueprints"""
+
+    # Serve React frontend from the manifest built at startup
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        if app.static_folder is None:
+            return "Static folder not configured", 404
+        return static_assets.serve(path)
+
+    # Health check endpoint
+    @app.route('/api/health', methods=['GET'])
+    def health_check():
+        return {
+            'status': 'healthy',
+            'message': 'AutoFounder X Backend is running',
+            'version': '1.0.0'
+        }
+
+    # API info endpoint
+    @app.route('/api/info', methods=['GET'])
+    def api_info():
+        return {
+            'name': 'AutoFounder X API',
+            'version': '1.0.0',
+            'description': 'The AI Co-Founder That Never Sleeps',
+            'endpoints': {
+                'authentication': '/api/auth/*',
+                'projects': '/api/projects/*',
+                'agents': '/api/agents/*',
+                'marketplace': '/api/marketplace/*',
+                'battle_arena': '/api/battle-arena/*',
+                'users': '/api/users/*',
+                'metrics': '/api/metrics'
+            }
+        }
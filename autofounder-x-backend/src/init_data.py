@@ -1,4 +1,5 @@
 from src.models.user import db, Agent, BattleArenaCompetition
+from src.services.agent_catalog import agent_catalog
 from datetime import date, timedelta
 
 def init_agents():
@@ -91,14 +92,15 @@ def init_agents():
         }
     ]
     
+    existing_agents = agent_catalog.get().by_type
     for agent_data in agents_data:
         # Check if agent already exists
-        existing_agent = Agent.query.filter_by(type=agent_data['type']).first()
-        if not existing_agent:
+        if agent_data['type'] not in existing_agents:
             agent = Agent(**agent_data)
             db.session.add(agent)
     
     db.session.commit()
+    agent_catalog.invalidate()
     print("✅ Agents initialized successfully")
 
 def init_sample_competitions():
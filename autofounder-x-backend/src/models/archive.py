@@ -0,0 +1,24 @@
+from src.models.user import AgentTask, Project, ProjectAgent, db
+
+
+def _archive_table(table):
+    # Same columns as the hot table without foreign keys, plus when the row was archived
+    columns = [db.Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False)
+               for column in table.columns]
+    return db.Table(f'{table.name}_archive', db.metadata, *columns, db.Column('archived_at', db.DateTime))
+
+
+projects_archive = _archive_table(Project.__table__)
+project_agents_archive = _archive_table(ProjectAgent.__table__)
+agent_tasks_archive = _archive_table(AgentTask.__table__)
+
+db.Index('ix_projects_archive_user_id', projects_archive.c.user_id)
+db.Index('ix_project_agents_archive_project_id', project_agents_archive.c.project_id)
+db.Index('ix_agent_tasks_archive_project_agent_id', agent_tasks_archive.c.project_agent_id)
+
+# (hot model, archive table) pairs, parents first
+ARCHIVE_TABLES = [
+    (Project, projects_archive),
+    (ProjectAgent, project_agents_archive),
+    (AgentTask, agent_tasks_archive)
+]
@@ -0,0 +1,16 @@
+from datetime import datetime
+from src.models.user import db
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    # Sync cursor for other workers, see TokenRevocationStore.sync()
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime)  # None for tokens that never expire
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -2,8 +2,30 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+from src.models.session import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+class utcnow(FunctionElement):
+    """Server-side datetime.utcnow(), stored the way SQLAlchemy stores the Python default"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@compiles(utcnow, 'sqlite')
+def _utcnow_sqlite(element, compiler, **kw):
+    # SQLite keeps datetimes as text, and keyset cursors compare them as text,
+    # so match SQLAlchemy's 'YYYY-MM-DD HH:MM:SS.ffffff' rather than CURRENT_TIMESTAMP
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -47,6 +69,16 @@ class User(UserMixin, db.Model):
 
 class Project(db.Model):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Keyset pagination of a user's active projects by recency
+        db.Index('ix_projects_active_user_created_id', 'user_id', 'created_at', 'id',
+                 sqlite_where=db.text('is_active = 1'), postgresql_where=db.text('is_active')),
+        # Archiver scan for long-inactive projects
+        db.Index('ix_projects_inactive_updated', 'updated_at',
+                 sqlite_where=db.text('is_active = 0'), postgresql_where=db.text('NOT is_active')),
+        # Archived rows keep their ids; AUTOINCREMENT stops SQLite from handing them out again
+        {'sqlite_autoincrement': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -57,9 +89,12 @@ class Project(db.Model):
     budget_range = db.Column(db.String(50))
     timeline = db.Column(db.String(50))
     status = db.Column(db.String(20), default='planning')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # A keyset pagination key, so never NULL: a NULL in a cursor would match no rows
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False,
+                           server_default=utcnow())
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_public = db.Column(db.Boolean, default=False)
+    is_active = db.Column(db.Boolean, default=True, nullable=False, server_default=db.true())
     marketplace_votes = db.Column(db.Integer, default=0)
     battle_arena_score = db.Column(db.Integer, default=0)
     
@@ -85,6 +120,7 @@ class Project(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'is_public': self.is_public,
+            'is_active': self.is_active,
             'marketplace_votes': self.marketplace_votes,
             'battle_arena_score': self.battle_arena_score
         }
@@ -121,6 +157,7 @@ class Agent(db.Model):
 
 class ProjectAgent(db.Model):
     __tablename__ = 'project_agents'
+    __table_args__ = {'sqlite_autoincrement': True}  # ids survive archiving, see Project
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -153,6 +190,7 @@ class ProjectAgent(db.Model):
 
 class AgentTask(db.Model):
     __tablename__ = 'agent_tasks'
+    __table_args__ = {'sqlite_autoincrement': True}  # ids survive archiving, see Project
     
     id = db.Column(db.Integer, primary_key=True)
     project_agent_id = db.Column(db.Integer, db.ForeignKey('project_agents.id'), nullable=False)
@@ -182,6 +220,12 @@ class AgentTask(db.Model):
 
 class MarketplaceItem(db.Model):
     __tablename__ = 'marketplace_items'
+    __table_args__ = (
+        # Keyset pagination for each marketplace sort order
+        db.Index('ix_marketplace_items_created_id', 'created_at', 'id'),
+        db.Index('ix_marketplace_items_votes_id', 'votes', 'id'),
+        db.Index('ix_marketplace_items_views_id', 'views', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
@@ -190,9 +234,11 @@ class MarketplaceItem(db.Model):
     category = db.Column(db.String(50))
     price = db.Column(db.Numeric(10, 2))
     is_for_sale = db.Column(db.Boolean, default=False)
-    votes = db.Column(db.Integer, default=0)
-    views = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Keyset pagination keys, so never NULL: a NULL in a cursor would match no rows
+    votes = db.Column(db.Integer, default=0, nullable=False, server_default=db.text('0'))
+    views = db.Column(db.Integer, default=0, nullable=False, server_default=db.text('0'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False,
+                           server_default=utcnow())
 
     def __repr__(self):
         return f'<MarketplaceItem {self.title}>'
@@ -243,6 +289,10 @@ class BattleArenaCompetition(db.Model):
 
 class CompetitionEntry(db.Model):
     __tablename__ = 'competition_entries'
+    __table_args__ = (
+        # Leaderboards load and repair stored rankings one competition at a time
+        db.Index('ix_competition_entries_competition_ranking', 'competition_id', 'ranking'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     competition_id = db.Column(db.Integer, db.ForeignKey('battle_arena_competitions.id'), nullable=False)
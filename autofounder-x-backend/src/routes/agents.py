@@ -1,19 +1,28 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
 from ..agents.agent_manager import agent_manager
 from ..models.user import Project, db
+from ..services.agent_catalog import agent_catalog
+from ..services.principal import current_principal
+from ..services.serializers import InvalidFields, parse_fields, select_paths
+from ..services.tracing import tracer
 
 agents_bp = Blueprint('agents', __name__)
 
 @agents_bp.route('/agents', methods=['GET'])
 @jwt_required()
 def get_agents():
-    """Get all available agents"""
-    agents = agent_manager.get_all_agents()
-    return jsonify({
+    """Get the agent catalog; it only changes with its version, so clients may cache it"""
+    catalog = agent_catalog.get()
+    response = jsonify({
         "success": True,
-        "agents": agents
+        "agents": catalog.to_list(),
+        "version": catalog.version
     })
+    response.set_etag(catalog.version)
+    response.cache_control.private = True
+    response.cache_control.max_age = current_app.config.get('AGENTS_CACHE_MAX_AGE', 3600)
+    return response.make_conditional(request)
 
 @agents_bp.route('/agents/<agent_id>', methods=['GET'])
 @jwt_required()
@@ -33,13 +42,13 @@ def get_agent(agent_id):
 @jwt_required()
 def start_agent(agent_id):
     """Start a specific agent"""
-    current_user_id = get_jwt_identity()
+    current_user_id = current_principal().id
     data = request.get_json() or {}
     project_id = data.get('project_id')
     
     # Verify project ownership if project_id is provided
     if project_id:
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         if not project:
             return jsonify({"success": False, "error": "Project not found"}), 404
         
@@ -79,37 +88,60 @@ def stop_agent(agent_id):
 @jwt_required()
 def start_all_agents():
     """Start all agents"""
-    current_user_id = get_jwt_identity()
+    current_user_id = current_principal().id
     data = request.get_json() or {}
     project_id = data.get('project_id')
     
-    # Verify project ownership if project_id is provided
-    if project_id:
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
-        if not project:
-            return jsonify({"success": False, "error": "Project not found"}), 404
-        
-        # Update project status to building
-        project.status = 'building'
-        db.session.commit()
+    # Traced from here so the project update shows up in the run's timeline
+    with tracer.run("POST /api/agents/start-all", owner=current_user_id):
+        # Verify project ownership if project_id is provided
+        if project_id:
+            project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
+            if not project:
+                return jsonify({"success": False, "error": "Project not found"}), 404
+            
+            # Update project status to building
+            project.status = 'building'
+            db.session.commit()
+            
+            # Use project data for agent execution
+            project_data = {
+                "id": project.id,
+                "name": project.name,
+                "description": project.description,
+                "business_model": project.business_model,
+                "target_market": project.target_market,
+                "current_stage": project.status,
+                "user_id": current_user_id
+            }
+        else:
+            project_data = data.get('project_data', {})
+            project_data['user_id'] = current_user_id
         
-        # Use project data for agent execution
-        project_data = {
-            "id": project.id,
-            "name": project.name,
-            "description": project.description,
-            "business_model": project.business_model,
-            "target_market": project.target_market,
-            "current_stage": project.status,
-            "user_id": current_user_id
-        }
-    else:
-        project_data = data.get('project_data', {})
-        project_data['user_id'] = current_user_id
-    
-    result = agent_manager.start_all_agents(project_data)
+        result = agent_manager.start_all_agents(project_data)
     return jsonify(result)
 
+@agents_bp.route('/agents/runs', methods=['GET'])
+@jwt_required()
+def get_agent_runs():
+    """List the current user's recent traced agent runs"""
+    return jsonify({
+        "success": True,
+        "runs": tracer.recent_runs(owner=current_principal().id)
+    })
+
+@agents_bp.route('/agents/runs/<run_id>/trace', methods=['GET'])
+@jwt_required()
+def get_agent_run_trace(run_id):
+    """Download a run's spans as Chrome trace-event JSON (chrome://tracing or ui.perfetto.dev)"""
+    run = tracer.get_run(run_id)
+    if run is None or run.owner != current_principal().id:
+        return jsonify({"success": False, "error": "Run not found"}), 404
+    
+    response = jsonify(tracer.chrome_trace(run_id))
+    response.headers['Content-Disposition'] = f'attachment; filename="trace-{run_id}.json"'
+    return response
+
 @agents_bp.route('/agents/stop-all', methods=['POST'])
 @jwt_required()
 def stop_all_agents():
@@ -134,19 +166,39 @@ def configure_agent(agent_id):
 @agents_bp.route('/agents/<agent_id>/results', methods=['GET'])
 @jwt_required()
 def get_agent_results(agent_id):
-    """Get results from a specific agent"""
+    """Get results from a specific agent, optionally narrowed with fields=results.market_size,..."""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
     result = agent_manager.get_agent_results(agent_id)
     
     if not result["success"]:
         return jsonify(result), 404
     
+    if fields is not None:
+        result = select_paths(result, ("success",) + fields)
+    
     return jsonify(result)
 
 @agents_bp.route('/agents/results', methods=['GET'])
 @jwt_required()
 def get_all_results():
-    """Get results from all agents"""
+    """Get results from all agents; fields= narrows each agent's entry (e.g. status,results.market_size)"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except InvalidFields as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
     result = agent_manager.get_all_results()
+    
+    if fields is not None:
+        result["results"] = {
+            agent_type: select_paths(entry, fields)
+            for agent_type, entry in result["results"].items()
+        }
+    
     return jsonify(result)
 
 @agents_bp.route('/agents/<agent_id>/logs', methods=['GET'])
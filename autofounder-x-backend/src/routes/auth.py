@@ -1,6 +1,11 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt, jwt_required
 from src.models.user import User, db
+from src.services.cache import LEADERBOARDS, MARKETPLACE_ITEMS, response_cache
+from src.services.passwords import PasswordHasherBusy, password_hasher
+from src.services.principal import create_user_token, current_principal, user_cache
+from src.services.revocation import token_revocation
+from datetime import datetime
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -61,13 +66,13 @@ def register():
             first_name=first_name,
             last_name=last_name
         )
-        user.set_password(password)
+        user.password_hash = password_hasher.hash(password)
         
         db.session.add(user)
         db.session.commit()
         
         # Create access token
-        access_token = create_access_token(identity=user.id)
+        access_token = create_user_token(user)
         
         return jsonify({
             'success': True,
@@ -77,6 +82,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Registration failed: {str(e)}'}), 500
@@ -96,14 +104,19 @@ def login():
         # Find user by email
         user = User.query.filter_by(email=email).first()
         
-        if not user or not user.check_password(password):
+        if not user or not password_hasher.verify(user.password_hash, password):
             return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
         
         if not user.is_active:
             return jsonify({'success': False, 'message': 'Account is deactivated'}), 401
         
+        # Upgrade hashes made with older cost parameters while the plain password is at hand
+        if password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+        
         # Create access token
-        access_token = create_access_token(identity=user.id)
+        access_token = create_user_token(user)
         
         return jsonify({
             'success': True,
@@ -111,28 +124,40 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'message': f'Login failed: {str(e)}'}), 500
 
 @auth_bp.route('/auth/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    # In a production app, you might want to blacklist the token
-    return jsonify({'success': True, 'message': 'Logged out successfully'}), 200
+    try:
+        # Revoke this token everywhere; other workers pick it up within TOKEN_REVOCATION_SYNC_INTERVAL
+        claims = get_jwt()
+        expires_at = datetime.utcfromtimestamp(claims['exp']) if 'exp' in claims else None
+        token_revocation.revoke(claims['jti'], current_principal().id, expires_at)
+        return jsonify({'success': True, 'message': 'Logged out successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Logout failed: {str(e)}'}), 500
 
 @auth_bp.route('/auth/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # Served from the user cache; profile and password writes drop the entry
+        user = user_cache.get(current_principal().id)
         
         if not user:
             return jsonify({'success': False, 'message': 'User not found'}), 404
         
         return jsonify({
             'success': True,
-            'user': user.to_dict()
+            'user': user
         }), 200
         
     except Exception as e:
@@ -142,8 +167,7 @@ def get_profile():
 @jwt_required()
 def update_profile():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = db.session.get(User, current_principal().id)
         
         if not user:
             return jsonify({'success': False, 'message': 'User not found'}), 404
@@ -168,6 +192,8 @@ def update_profile():
                 user.username = new_username
         
         db.session.commit()
+        # Marketplace listings and leaderboards embed creator names
+        response_cache.invalidate(MARKETPLACE_ITEMS, LEADERBOARDS)
         
         return jsonify({
             'success': True,
@@ -183,8 +209,7 @@ def update_profile():
 @jwt_required()
 def change_password():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = db.session.get(User, current_principal().id)
         
         if not user:
             return jsonify({'success': False, 'message': 'User not found'}), 404
@@ -195,7 +220,7 @@ def change_password():
             return jsonify({'success': False, 'message': 'Current password and new password are required'}), 400
         
         # Verify current password
-        if not user.check_password(data['current_password']):
+        if not password_hasher.verify(user.password_hash, data['current_password']):
             return jsonify({'success': False, 'message': 'Current password is incorrect'}), 400
         
         # Validate new password
@@ -204,7 +229,7 @@ def change_password():
             return jsonify({'success': False, 'message': message}), 400
         
         # Update password
-        user.set_password(data['new_password'])
+        user.password_hash = password_hasher.hash(data['new_password'])
         db.session.commit()
         
         return jsonify({
@@ -212,6 +237,9 @@ def change_password():
             'message': 'Password changed successfully'
         }), 200
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Failed to change password: {str(e)}'}), 500
@@ -1,11 +1,17 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from src.models.user import BattleArenaCompetition, CompetitionEntry, Project, User, db
+from src.services.cache import COMPETITIONS, LEADERBOARDS, leaderboard_tag, response_cache
+from src.services.leaderboard import leaderboard
+from src.services.principal import current_principal
+from src.services.replica import read_replica
 from datetime import datetime, date
 
 battle_arena_bp = Blueprint('battle_arena', __name__)
 
 @battle_arena_bp.route('/battle-arena/competitions', methods=['GET'])
+@response_cache.cached(lambda: [COMPETITIONS])
+@read_replica
 def get_competitions():
     try:
         status = request.args.get('status', 'active')  # active, upcoming, completed
@@ -60,6 +66,7 @@ def create_competition():
         
         db.session.add(competition)
         db.session.commit()
+        response_cache.invalidate(COMPETITIONS)
         
         return jsonify({
             'success': True,
@@ -74,8 +81,9 @@ def create_competition():
 @battle_arena_bp.route('/battle-arena/enter', methods=['POST'])
 @jwt_required()
 def enter_competition():
+    competition_id = None
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         data = request.get_json()
         
         competition_id = data.get('competition_id')
@@ -85,7 +93,7 @@ def enter_competition():
             return jsonify({'success': False, 'message': 'Competition ID and Project ID are required'}), 400
         
         # Verify project ownership
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
         
@@ -113,7 +121,9 @@ def enter_competition():
         )
         
         db.session.add(entry)
+        leaderboard.record_entry(entry)
         db.session.commit()
+        response_cache.invalidate(COMPETITIONS, leaderboard_tag(competition_id))
         
         return jsonify({
             'success': True,
@@ -123,27 +133,41 @@ def enter_competition():
         
     except Exception as e:
         db.session.rollback()
+        if competition_id:
+            leaderboard.invalidate(competition_id)
         return jsonify({'success': False, 'message': f'Failed to enter competition: {str(e)}'}), 500
 
 @battle_arena_bp.route('/battle-arena/leaderboard/<int:competition_id>', methods=['GET'])
+@response_cache.cached(lambda competition_id: [LEADERBOARDS, leaderboard_tag(competition_id)])
+@read_replica
 def get_leaderboard(competition_id):
     try:
         competition = BattleArenaCompetition.query.get(competition_id)
         if not competition:
             return jsonify({'success': False, 'message': 'Competition not found'}), 404
         
-        # Get entries ordered by votes
-        entries = db.session.query(CompetitionEntry, Project, User)\
-                           .join(Project, CompetitionEntry.project_id == Project.id)\
-                           .join(User, Project.user_id == User.id)\
-                           .filter(CompetitionEntry.competition_id == competition_id)\
-                           .order_by(CompetitionEntry.votes.desc())\
-                           .all()
-        
-        leaderboard = []
-        for rank, (entry, project, user) in enumerate(entries, 1):
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        
+        # Ranks come from the in-memory board; only the requested slice is joined
+        board = leaderboard.get(competition_id)
+        ranked = board.page(offset, limit)
+        
+        rows = db.session.query(CompetitionEntry, Project, User)\
+                         .join(Project, CompetitionEntry.project_id == Project.id)\
+                         .join(User, Project.user_id == User.id)\
+                         .filter(CompetitionEntry.id.in_([entry_id for _, entry_id, _ in ranked]))\
+                         .all()
+        rows_by_id = {entry.id: (entry, project, user) for entry, project, user in rows}
+        
+        leaderboard_list = []
+        for rank, entry_id, votes in ranked:
+            if entry_id not in rows_by_id:
+                continue
+            entry, project, user = rows_by_id[entry_id]
             entry_dict = entry.to_dict()
             entry_dict['ranking'] = rank
+            entry_dict['votes'] = votes
             entry_dict['project'] = {
                 'name': project.name,
                 'description': project.description,
@@ -154,22 +178,47 @@ def get_leaderboard(competition_id):
                 'first_name': user.first_name,
                 'last_name': user.last_name
             }
-            leaderboard.append(entry_dict)
+            leaderboard_list.append(entry_dict)
         
         return jsonify({
             'success': True,
             'competition': competition.to_dict(),
-            'leaderboard': leaderboard
+            'leaderboard': leaderboard_list,
+            'total_entries': len(board),
+            'offset': offset,
+            'limit': limit
         }), 200
         
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to get leaderboard: {str(e)}'}), 500
 
+@battle_arena_bp.route('/battle-arena/entries/<int:entry_id>/rank', methods=['GET'])
+def get_entry_rank(entry_id):
+    try:
+        entry = CompetitionEntry.query.get(entry_id)
+        if not entry:
+            return jsonify({'success': False, 'message': 'Entry not found'}), 404
+        
+        board = leaderboard.get(entry.competition_id)
+        
+        return jsonify({
+            'success': True,
+            'entry_id': entry_id,
+            'competition_id': entry.competition_id,
+            'ranking': board.rank(entry_id),
+            'votes': board.votes(entry_id),
+            'total_entries': len(board)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Failed to get entry rank: {str(e)}'}), 500
+
 @battle_arena_bp.route('/battle-arena/vote', methods=['POST'])
 @jwt_required()
 def vote_competition_entry():
+    entry = None
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         data = request.get_json()
         
         entry_id = data.get('entry_id')
@@ -191,30 +240,34 @@ def vote_competition_entry():
             return jsonify({'success': False, 'message': 'Competition has ended'}), 400
         
         # In a real implementation, you'd track individual votes to prevent duplicate voting
-        # For now, we'll just increment the vote count
-        entry.votes += 1
+        # For now, we'll just increment the vote count and move the entry up the leaderboard
+        ranking = leaderboard.record_vote(entry)
         
         # Also update project battle arena score
         if project:
             project.battle_arena_score += 1
         
         db.session.commit()
+        response_cache.invalidate(leaderboard_tag(entry.competition_id))
         
         return jsonify({
             'success': True,
             'message': 'Vote recorded successfully',
-            'votes': entry.votes
+            'votes': entry.votes,
+            'ranking': ranking
         }), 200
         
     except Exception as e:
         db.session.rollback()
+        if entry is not None:
+            leaderboard.invalidate(entry.competition_id)
         return jsonify({'success': False, 'message': f'Failed to vote: {str(e)}'}), 500
 
 @battle_arena_bp.route('/battle-arena/my-entries', methods=['GET'])
 @jwt_required()
 def get_my_entries():
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         
         # Get user's competition entries
         entries = db.session.query(CompetitionEntry, Project, BattleArenaCompetition)\
@@ -1,102 +1,163 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from src.models.user import MarketplaceItem, Project, User, db
+from src.services.cache import MARKETPLACE_CATEGORIES, MARKETPLACE_ITEMS, response_cache
+from src.services.pagination import InvalidCursor, keyset_paginate
+from src.services.principal import current_principal
+from src.services.query_stats import query_budget
+from src.services.replica import read_replica
+from src.services.search import search_marketplace
+from src.services.serializers import (InvalidFields, json_response, marketplace_item_detail_serializer,
+                                      marketplace_item_serializer, parse_fields, wants, without_fields)
+from src.services.view_counter import view_counter
 from datetime import datetime
 
 marketplace_bp = Blueprint('marketplace', __name__)
 
 @marketplace_bp.route('/marketplace/items', methods=['GET'])
+@query_budget(2)
+@response_cache.cached(lambda: [MARKETPLACE_ITEMS])
+@read_replica
 def get_marketplace_items():
     try:
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 12, type=int)
+        limit = min(max(request.args.get('limit', 12, type=int), 1), 100)
         category = request.args.get('category')
         sort = request.args.get('sort', 'recent')  # recent, votes, views
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
         
-        query = MarketplaceItem.query.join(Project).filter(Project.is_public == True)
+        # Sort keys, with id as the tie-breaker so the order is stable across pages
+        if sort == 'votes':
+            sort_columns = [MarketplaceItem.votes, MarketplaceItem.id]
+        elif sort == 'views':
+            sort_columns = [MarketplaceItem.views, MarketplaceItem.id]
+        else:  # recent
+            sort = 'recent'
+            sort_columns = [MarketplaceItem.created_at, MarketplaceItem.id]
+        
+        # Only the requested fields (plus the sort keys) are selected
+        serializer = marketplace_item_serializer.only(parse_fields(request.args.get('fields')),
+                                                      required=[column.key for column in sort_columns])
+        
+        # Items with their project and creator as plain rows, serialized without ORM objects
+        query = db.session.query(*serializer.columns)\
+                          .select_from(MarketplaceItem)\
+                          .join(Project, MarketplaceItem.project_id == Project.id)\
+                          .join(User, Project.user_id == User.id)\
+                          .filter(Project.is_public == True, Project.is_active == True)
         
         if category:
             query = query.filter(MarketplaceItem.category == category)
         
-        # Apply sorting
-        if sort == 'votes':
-            query = query.order_by(MarketplaceItem.votes.desc())
-        elif sort == 'views':
-            query = query.order_by(MarketplaceItem.views.desc())
-        else:  # recent
-            query = query.order_by(MarketplaceItem.created_at.desc())
+        if 'page' in request.args:
+            # Legacy numbered pages (OFFSET + COUNT)
+            page = request.args.get('page', 1, type=int)
+            items = query.order_by(*[column.desc() for column in sort_columns])\
+                         .paginate(page=page, per_page=limit, error_out=False)
+            page_items = items.items
+            pagination = {'total': items.total, 'page': page, 'pages': items.pages}
+        else:
+            # Keyset pagination on the sort columns
+            try:
+                page_items, next_cursor, total = keyset_paginate(
+                    query, sort_columns, sort, cursor, limit, include_total
+                )
+            except InvalidCursor as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            pagination = {'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+            if include_total:
+                pagination['total'] = total
+        
+        return json_response({
+            'success': True,
+            'items': serializer.to_list(page_items),
+            **pagination
+        })
+        
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Failed to get marketplace items: {str(e)}'}), 500
+
+@marketplace_bp.route('/marketplace/search', methods=['GET'])
+@query_budget(4)
+@read_replica
+def search_marketplace_items():
+    try:
+        query = request.args.get('q', '').strip()
+        category = request.args.get('category')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        if not query:
+            return jsonify({'success': False, 'message': 'Search query is required'}), 400
         
-        # Paginate results
-        items = query.paginate(page=page, per_page=limit, error_out=False)
+        fields = parse_fields(request.args.get('fields'))
+        serializer = marketplace_item_serializer.only(without_fields(fields, 'score', 'snippet'), required=('id',))
+        hits = search_marketplace(query, category=category, limit=limit, offset=offset)
+        
+        # Load the matched items with their project and creator in one query
+        rows = db.session.query(*serializer.columns)\
+                         .select_from(MarketplaceItem)\
+                         .join(Project, MarketplaceItem.project_id == Project.id)\
+                         .join(User, Project.user_id == User.id)\
+                         .filter(MarketplaceItem.id.in_([hit['id'] for hit in hits]))\
+                         .all()
+        rows_by_id = {row.id: row for row in rows}
         
-        # Format response with additional project and user info
         items_list = []
-        for item in items.items:
-            item_dict = item.to_dict()
-            
-            # Add project info
-            project = Project.query.get(item.project_id)
-            if project:
-                item_dict['project'] = {
-                    'name': project.name,
-                    'description': project.description,
-                    'status': project.status
-                }
-                
-                # Add user info
-                user = User.query.get(project.user_id)
-                if user:
-                    item_dict['creator'] = {
-                        'username': user.username,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name
-                    }
-            
+        for hit in hits:
+            if hit['id'] not in rows_by_id:
+                continue
+            item_dict = serializer.to_dict(rows_by_id[hit['id']])
+            if wants(fields, 'score'):
+                item_dict['score'] = hit['score']
+            if wants(fields, 'snippet'):
+                item_dict['snippet'] = hit['snippet']
             items_list.append(item_dict)
         
-        return jsonify({
+        return json_response({
             'success': True,
+            'query': query,
             'items': items_list,
-            'total': items.total,
-            'page': page,
-            'pages': items.pages
-        }), 200
+            'offset': offset,
+            'limit': limit
+        })
         
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'success': False, 'message': f'Failed to get marketplace items: {str(e)}'}), 500
+        return jsonify({'success': False, 'message': f'Failed to search marketplace: {str(e)}'}), 500
 
 @marketplace_bp.route('/marketplace/items/<int:item_id>', methods=['GET'])
+@query_budget(1)
 def get_marketplace_item(item_id):
     try:
-        item = MarketplaceItem.query.get(item_id)
+        # The item with its project and creator in one query, narrowed to the requested fields
+        serializer = marketplace_item_detail_serializer.only(parse_fields(request.args.get('fields')))
+        item = db.session.query(*serializer.columns)\
+                         .select_from(MarketplaceItem)\
+                         .join(Project, MarketplaceItem.project_id == Project.id)\
+                         .join(User, Project.user_id == User.id)\
+                         .filter(MarketplaceItem.id == item_id)\
+                         .first()
         if not item:
             return jsonify({'success': False, 'message': 'Item not found'}), 404
         
-        # Increment view count
-        item.views += 1
-        db.session.commit()
+        # Record the view; counts are coalesced and flushed in batches
+        pending_views = view_counter.increment(item_id)
         
-        item_dict = item.to_dict()
+        item_dict = serializer.to_dict(item)
+        if 'views' in item_dict:
+            item_dict['views'] = (item_dict['views'] or 0) + pending_views
         
-        # Add project info
-        project = Project.query.get(item.project_id)
-        if project:
-            item_dict['project'] = project.to_dict()
-            
-            # Add user info
-            user = User.query.get(project.user_id)
-            if user:
-                item_dict['creator'] = {
-                    'username': user.username,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name
-                }
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'item': item_dict
-        }), 200
+        })
         
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to get marketplace item: {str(e)}'}), 500
 
@@ -104,7 +165,7 @@ def get_marketplace_item(item_id):
 @jwt_required()
 def publish_to_marketplace():
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         data = request.get_json()
         
         project_id = data.get('project_id')
@@ -112,7 +173,7 @@ def publish_to_marketplace():
             return jsonify({'success': False, 'message': 'Project ID is required'}), 400
         
         # Verify project ownership
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
         
@@ -137,6 +198,7 @@ def publish_to_marketplace():
         
         db.session.add(marketplace_item)
         db.session.commit()
+        response_cache.invalidate(MARKETPLACE_ITEMS, MARKETPLACE_CATEGORIES)
         
         return jsonify({
             'success': True,
@@ -152,7 +214,7 @@ def publish_to_marketplace():
 @jwt_required()
 def vote_marketplace_item():
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         data = request.get_json()
         
         item_id = data.get('item_id')
@@ -177,6 +239,7 @@ def vote_marketplace_item():
             project.marketplace_votes += 1
         
         db.session.commit()
+        response_cache.invalidate(MARKETPLACE_ITEMS)
         
         return jsonify({
             'success': True,
@@ -189,6 +252,8 @@ def vote_marketplace_item():
         return jsonify({'success': False, 'message': f'Failed to vote: {str(e)}'}), 500
 
 @marketplace_bp.route('/marketplace/categories', methods=['GET'])
+@query_budget(1)
+@response_cache.cached(lambda: [MARKETPLACE_CATEGORIES])
 def get_categories():
     try:
         # Get distinct categories from marketplace items
@@ -219,27 +284,23 @@ def get_categories():
         return jsonify({'success': False, 'message': f'Failed to get categories: {str(e)}'}), 500
 
 @marketplace_bp.route('/marketplace/my-items', methods=['GET'])
+@query_budget(2)
 @jwt_required()
 def get_my_marketplace_items():
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         
-        # Get user's published items
-        items = db.session.query(MarketplaceItem).join(Project)\
+        # Get user's published items with their project info from the same join
+        items = db.session.query(MarketplaceItem, Project.name, Project.status).join(Project)\
                           .filter(Project.user_id == current_user_id).all()
         
         items_list = []
-        for item in items:
+        for item, project_name, project_status in items:
             item_dict = item.to_dict()
-            
-            # Add project info
-            project = Project.query.get(item.project_id)
-            if project:
-                item_dict['project'] = {
-                    'name': project.name,
-                    'status': project.status
-                }
-            
+            item_dict['project'] = {
+                'name': project_name,
+                'status': project_status
+            }
             items_list.append(item_dict)
         
         return jsonify({
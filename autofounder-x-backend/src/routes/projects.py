@@ -1,53 +1,120 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.models.user import Project, ProjectAgent, Agent, User, db
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required
+from src.models.user import Project, ProjectAgent, User, db
+from src.services.agent_catalog import agent_catalog
+from src.services.archiver import project_archiver
+from src.services.cache import AGENT_CATALOG, LEADERBOARDS, MARKETPLACE_ITEMS, response_cache, user_projects_tag
+from src.services.pagination import InvalidCursor, keyset_paginate
+from src.services.principal import current_principal
+from src.services.project_import import import_projects, parse_ndjson
+from src.services.query_stats import query_budget
+from src.services.replica import replica_router
+from src.services.serializers import (InvalidFields, json_response, nested_fields, parse_fields, project_agent_serializer,
+                                      project_serializer, select_paths, wants, without_fields)
 from datetime import datetime
+import io
+import json
 
 projects_bp = Blueprint('projects', __name__)
 
+def _project_view_tags(**kwargs):
+    """Cache tags of the owner's project views; refreshes a due agent catalog first so its bump lands in the key"""
+    agent_catalog.get()
+    return [user_projects_tag(current_principal().id), AGENT_CATALOG]
+
+def _project_agents(project_id, fields=None):
+    """A project's agents with their catalog entries, narrowed to fields under 'agent' and 'project_agent'"""
+    unknown = without_fields(fields, 'agent', 'project_agent')
+    if unknown:
+        raise InvalidFields(f"Unknown field 'agents.{unknown[0]}'")
+    
+    serializer = project_agent_serializer.only(nested_fields(fields, 'project_agent'), required=('agent_id',))
+    rows = db.session.query(*serializer.columns)\
+                     .filter(ProjectAgent.project_id == project_id)\
+                     .order_by(ProjectAgent.id)\
+                     .all()
+    
+    agents_info = []
+    for row in rows:
+        agent = agent_catalog.by_id(row.agent_id)
+        if agent:
+            agent_info = {}
+            if wants(fields, 'agent'):
+                agent_info['agent'] = select_paths(agent.to_dict(), nested_fields(fields, 'agent'))
+            if wants(fields, 'project_agent'):
+                agent_info['project_agent'] = serializer.to_dict(row)
+            agents_info.append(agent_info)
+    return agents_info
+
 @projects_bp.route('/projects', methods=['GET'])
+@query_budget(4)
 @jwt_required()
+@response_cache.versioned(_project_view_tags)
 def get_projects():
     try:
-        current_user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 10, type=int)
+        current_user_id = current_principal().id
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
         
-        query = Project.query.filter_by(user_id=current_user_id)
+        # Sparse fieldsets: only the requested columns are selected; the sort keys always are
+        fields = parse_fields(request.args.get('fields'))
+        serializer = project_serializer.only(without_fields(fields, 'agents_status'), required=('created_at', 'id'))
         
-        if status:
-            query = query.filter_by(status=status)
+        query = db.session.query(*serializer.columns)\
+                          .filter(Project.user_id == current_user_id, Project.is_active == True)
         
-        # Paginate results
-        projects = query.order_by(Project.created_at.desc()).paginate(
-            page=page, per_page=limit, error_out=False
-        )
+        if status:
+            query = query.filter(Project.status == status)
+        
+        if 'page' in request.args:
+            # Legacy numbered pages (OFFSET + COUNT)
+            page = request.args.get('page', 1, type=int)
+            projects = query.order_by(Project.created_at.desc(), Project.id.desc()).paginate(
+                page=page, per_page=limit, error_out=False
+            )
+            page_items = projects.items
+            pagination = {'total': projects.total, 'page': page, 'pages': projects.pages}
+        else:
+            # Keyset pagination on (created_at, id)
+            try:
+                page_items, next_cursor, total = keyset_paginate(
+                    query, [Project.created_at, Project.id], 'recent', cursor, limit, include_total
+                )
+            except InvalidCursor as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            pagination = {'next_cursor': next_cursor, 'has_more': next_cursor is not None}
+            if include_total:
+                pagination['total'] = total
+        
+        # Get agent status for every project on the page in one query
+        agents_status = {row.id: {} for row in page_items}
+        if agents_status and wants(fields, 'agents_status'):
+            project_agents = db.session.query(ProjectAgent.project_id, ProjectAgent.agent_id, ProjectAgent.status)\
+                                       .filter(ProjectAgent.project_id.in_(list(agents_status)))\
+                                       .order_by(ProjectAgent.id)\
+                                       .all()
+            for project_id, agent_id, agent_status in project_agents:
+                agent = agent_catalog.by_id(agent_id)
+                if agent:
+                    agents_status[project_id][agent.type] = agent_status
         
-        # Get agent status for each project
         project_list = []
-        for project in projects.items:
-            project_dict = project.to_dict()
-            
-            # Get agent status
-            agent_status = {}
-            project_agents = ProjectAgent.query.filter_by(project_id=project.id).all()
-            for pa in project_agents:
-                agent = Agent.query.get(pa.agent_id)
-                if agent:
-                    agent_status[agent.type] = pa.status
-            
-            project_dict['agents_status'] = agent_status
+        for row in page_items:
+            project_dict = serializer.to_dict(row)
+            if wants(fields, 'agents_status'):
+                project_dict['agents_status'] = agents_status[row.id]
             project_list.append(project_dict)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'projects': project_list,
-            'total': projects.total,
-            'page': page,
-            'pages': projects.pages
-        }), 200
+            **pagination
+        })
         
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to get projects: {str(e)}'}), 500
 
@@ -55,7 +122,7 @@ def get_projects():
 @jwt_required()
 def create_project():
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = current_principal().id
         data = request.get_json()
         
         # Validate required fields
@@ -80,7 +147,7 @@ def create_project():
         # Add selected agents to the project
         selected_agents = data.get('selected_agents', [])
         for agent_type in selected_agents:
-            agent = Agent.query.filter_by(type=agent_type).first()
+            agent = agent_catalog.by_type(agent_type)
             if agent:
                 project_agent = ProjectAgent(
                     project_id=project.id,
@@ -101,37 +168,75 @@ def create_project():
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Failed to create project: {str(e)}'}), 500
 
+@projects_bp.route('/projects/import', methods=['POST'])
+@jwt_required()
+def import_projects_bulk():
+    """Create many projects from NDJSON or a JSON array, streaming one NDJSON result line per row"""
+    current_user_id = current_principal().id
+    chunk_size = min(max(request.args.get('chunk_size', current_app.config.get('PROJECT_IMPORT_CHUNK_SIZE', 1000), type=int), 1), 10000)
+    
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        # The raw input stream reads byte by byte when iterated; buffer it for readline()
+        rows = parse_ndjson(io.BufferedReader(request.stream, 1 << 16))
+    elif request.mimetype == 'application/json':
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('projects')
+        if not isinstance(data, list):
+            return jsonify({'success': False, 'message': 'Expected a JSON array of projects'}), 400
+        rows = data
+    else:
+        return jsonify({'success': False, 'message': 'Send application/x-ndjson or a JSON array'}), 415
+    
+    def generate():
+        imported = failed = 0
+        try:
+            for result in import_projects(current_user_id, rows, chunk_size):
+                if result['success']:
+                    imported += 1
+                else:
+                    failed += 1
+                yield json.dumps(result, separators=(',', ':')) + '\n'
+        except Exception as e:
+            yield json.dumps({'success': False, 'message': f'Import aborted: {str(e)}'}) + '\n'
+        finally:
+            if imported:
+                # Core inserts bypass the session hooks that normally do this
+                response_cache.invalidate_user(current_user_id)
+                replica_router.mark_write(current_user_id)
+        yield json.dumps({'summary': {'imported': imported, 'failed': failed}}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @projects_bp.route('/projects/<int:project_id>', methods=['GET'])
+@query_budget(3)
 @jwt_required()
+@response_cache.versioned(_project_view_tags)
 def get_project(project_id):
     try:
-        current_user_id = get_jwt_identity()
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        current_user_id = current_principal().id
+        fields = parse_fields(request.args.get('fields'))
+        serializer = project_serializer.only(without_fields(fields, 'agents'), required=('id',))
+        project = db.session.query(*serializer.columns)\
+                            .filter(Project.id == project_id, Project.user_id == current_user_id, Project.is_active == True)\
+                            .first()
         
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
         
-        project_dict = project.to_dict()
+        project_dict = serializer.to_dict(project)
         
         # Get detailed agent information
-        agents_info = []
-        project_agents = ProjectAgent.query.filter_by(project_id=project.id).all()
-        for pa in project_agents:
-            agent = Agent.query.get(pa.agent_id)
-            if agent:
-                agent_info = {
-                    'agent': agent.to_dict(),
-                    'project_agent': pa.to_dict()
-                }
-                agents_info.append(agent_info)
-        
-        project_dict['agents'] = agents_info
+        if wants(fields, 'agents'):
+            project_dict['agents'] = _project_agents(project.id, nested_fields(fields, 'agents'))
         
-        return jsonify({
+        return json_response({
             'success': True,
             'project': project_dict
-        }), 200
+        })
         
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to get project: {str(e)}'}), 500
 
@@ -139,8 +244,8 @@ def get_project(project_id):
 @jwt_required()
 def update_project(project_id):
     try:
-        current_user_id = get_jwt_identity()
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        current_user_id = current_principal().id
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
@@ -167,6 +272,8 @@ def update_project(project_id):
         
         project.updated_at = datetime.utcnow()
         db.session.commit()
+        # Marketplace listings and leaderboards embed project details
+        response_cache.invalidate(MARKETPLACE_ITEMS, LEADERBOARDS)
         
         return jsonify({
             'success': True,
@@ -182,16 +289,17 @@ def update_project(project_id):
 @jwt_required()
 def delete_project(project_id):
     try:
-        current_user_id = get_jwt_identity()
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        current_user_id = current_principal().id
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
         
-        # Soft delete - mark as inactive instead of actual deletion
+        # Soft delete - mark as inactive instead of actual deletion; the archiver moves it out later
         project.is_active = False
         project.updated_at = datetime.utcnow()
         db.session.commit()
+        response_cache.invalidate(MARKETPLACE_ITEMS)
         
         return jsonify({
             'success': True,
@@ -202,33 +310,49 @@ def delete_project(project_id):
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Failed to delete project: {str(e)}'}), 500
 
+@projects_bp.route('/projects/<int:project_id>/restore', methods=['POST'])
+@jwt_required()
+def restore_project(project_id):
+    try:
+        current_user_id = current_principal().id
+        project = project_archiver.restore(project_id, current_user_id)
+        
+        if not project:
+            return jsonify({'success': False, 'message': 'Project not found'}), 404
+        
+        response_cache.invalidate(MARKETPLACE_ITEMS)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Project restored successfully',
+            'project': project.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Failed to restore project: {str(e)}'}), 500
+
 @projects_bp.route('/projects/<int:project_id>/agents', methods=['GET'])
+@query_budget(3)
 @jwt_required()
+@response_cache.versioned(_project_view_tags)
 def get_project_agents(project_id):
     try:
-        current_user_id = get_jwt_identity()
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        current_user_id = current_principal().id
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
         
-        project_agents = ProjectAgent.query.filter_by(project_id=project_id).all()
-        agents_data = []
+        agents_data = _project_agents(project_id, parse_fields(request.args.get('fields')))
         
-        for pa in project_agents:
-            agent = Agent.query.get(pa.agent_id)
-            if agent:
-                agent_data = {
-                    'agent': agent.to_dict(),
-                    'project_agent': pa.to_dict()
-                }
-                agents_data.append(agent_data)
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'agents': agents_data
-        }), 200
+        })
         
+    except InvalidFields as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': f'Failed to get project agents: {str(e)}'}), 500
 
@@ -236,8 +360,8 @@ def get_project_agents(project_id):
 @jwt_required()
 def add_project_agent(project_id):
     try:
-        current_user_id = get_jwt_identity()
-        project = Project.query.filter_by(id=project_id, user_id=current_user_id).first()
+        current_user_id = current_principal().id
+        project = Project.query.filter_by(id=project_id, user_id=current_user_id, is_active=True).first()
         
         if not project:
             return jsonify({'success': False, 'message': 'Project not found'}), 404
@@ -248,7 +372,7 @@ def add_project_agent(project_id):
         if not agent_type:
             return jsonify({'success': False, 'message': 'Agent type is required'}), 400
         
-        agent = Agent.query.filter_by(type=agent_type).first()
+        agent = agent_catalog.by_type(agent_type)
         if not agent:
             return jsonify({'success': False, 'message': 'Agent not found'}), 404
         
@@ -0,0 +1,104 @@
+# Shared application services
+from .agent_catalog import AgentCatalog, AgentCatalogService, AgentRecord, agent_catalog
+from .cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache, response_cache
+from .compression import ResponseCompressor, content_etag, response_compressor
+from .archiver import ProjectArchiver, project_archiver
+from .database import SQLITE_PROFILES, add_missing_columns, create_missing_indexes, fill_not_null_columns, get_engine_options, init_database, normalize_database_url
+from .json_provider import FastJSONProvider, init_json
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry, RequestMetrics, metrics_registry, request_metrics
+from .leaderboard import CompetitionLeaderboard, LeaderboardService, leaderboard
+from .pagination import InvalidCursor, keyset_paginate
+from .project_import import ImportRowError, import_projects, parse_ndjson, validate_project_row
+from .passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+from .query_stats import QueryBudgetExceeded, QueryProfiler, QueryRecorder, check_query_budget, query_budget, query_profiler, record_queries
+from .principal import Principal, UserCache, create_user_token, current_principal, init_principal, load_principal, user_cache
+from .replica import ReplicaRouter, read_replica, replica_router
+from .revocation import BloomFilter, TokenRevocationStore, token_revocation
+from .search import init_search_index, rebuild_search_index, search_marketplace
+from .static_assets import StaticAsset, StaticAssetManifest, StaticAssets, static_assets
+from .serializers import InvalidFields, RowSerializer, json_response, model_fields, parse_fields, select_paths
+from .tracing import TraceRun, Tracer, traced, tracer
+from .view_counter import ViewCounter, view_counter
+
+__all__ = [
+    'AgentCatalog',
+    'AgentCatalogService',
+    'AgentRecord',
+    'agent_catalog',
+    'MemoryCacheBackend',
+    'RedisCacheBackend',
+    'ResponseCache',
+    'response_cache',
+    'ResponseCompressor',
+    'content_etag',
+    'response_compressor',
+    'ProjectArchiver',
+    'project_archiver',
+    'SQLITE_PROFILES',
+    'add_missing_columns',
+    'create_missing_indexes',
+    'fill_not_null_columns',
+    'get_engine_options',
+    'init_database',
+    'normalize_database_url',
+    'FastJSONProvider',
+    'init_json',
+    'CompetitionLeaderboard',
+    'LeaderboardService',
+    'leaderboard',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+    'RequestMetrics',
+    'metrics_registry',
+    'request_metrics',
+    'InvalidCursor',
+    'keyset_paginate',
+    'ImportRowError',
+    'import_projects',
+    'parse_ndjson',
+    'validate_project_row',
+    'PasswordHasher',
+    'PasswordHasherBusy',
+    'password_hasher',
+    'QueryBudgetExceeded',
+    'QueryProfiler',
+    'QueryRecorder',
+    'check_query_budget',
+    'query_budget',
+    'query_profiler',
+    'record_queries',
+    'Principal',
+    'UserCache',
+    'create_user_token',
+    'current_principal',
+    'init_principal',
+    'load_principal',
+    'user_cache',
+    'ReplicaRouter',
+    'read_replica',
+    'replica_router',
+    'BloomFilter',
+    'TokenRevocationStore',
+    'token_revocation',
+    'init_search_index',
+    'rebuild_search_index',
+    'search_marketplace',
+    'InvalidFields',
+    'RowSerializer',
+    'json_response',
+    'model_fields',
+    'parse_fields',
+    'select_paths',
+    'StaticAsset',
+    'StaticAssetManifest',
+    'StaticAssets',
+    'static_assets',
+    'TraceRun',
+    'Tracer',
+    'traced',
+    'tracer',
+    'ViewCounter',
+    'view_counter'
+]
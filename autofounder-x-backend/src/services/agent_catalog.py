@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from src.models.user import Agent, db
+from src.services.cache import AGENT_CATALOG, response_cache
+
+
+class AgentRecord(NamedTuple):
+    """Immutable snapshot of one row of the agents table"""
+    id: int
+    name: str
+    type: str
+    description: Optional[str]
+    capabilities: Optional[str]
+    is_active: Optional[bool]
+    version: Optional[str]
+    created_at: Optional[datetime]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'type': self.type,
+            'description': self.description,
+            'capabilities': self.capabilities,
+            'is_active': self.is_active,
+            'version': self.version,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class AgentCatalog:
+    """Read-only view of every agent, indexed by type and by id"""
+
+    def __init__(self, records: List[AgentRecord]):
+        self.records = tuple(sorted(records, key=lambda record: record.id))
+        self.by_id: Mapping[int, AgentRecord] = MappingProxyType({record.id: record for record in self.records})
+        # Like Agent.query.filter_by(type=...).first(), the lowest id wins on duplicates
+        by_type: Dict[str, AgentRecord] = {}
+        for record in self.records:
+            by_type.setdefault(record.type, record)
+        self.by_type: Mapping[str, AgentRecord] = MappingProxyType(by_type)
+        self.version = hashlib.sha1(repr(self.records).encode('utf-8')).hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.records]
+
+
+class AgentCatalogService:
+    """Per-process agent catalog, re-read at most once per refresh interval and swapped only when it changed"""
+
+    def __init__(self, refresh_interval: float = 60.0):
+        self.refresh_interval = refresh_interval
+        self._catalog: Optional[AgentCatalog] = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.refresh_interval = app.config.get('AGENT_CATALOG_REFRESH_INTERVAL', self.refresh_interval)
+        app.extensions['agent_catalog'] = self
+
+    def get(self) -> AgentCatalog:
+        """The current catalog; needs an app context the first time and when a refresh is due"""
+        catalog = self._catalog
+        if catalog is None:
+            with self._refresh_lock:
+                if self._catalog is None:
+                    self._refresh()
+                return self._catalog
+
+        # Only one thread re-reads the table; the rest keep using the current snapshot
+        if time.monotonic() - self._checked_at > self.refresh_interval and self._refresh_lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"[AgentCatalog] WARNING: Refresh failed, keeping version {catalog.version}: {str(e)}")
+                self._checked_at = time.monotonic()
+            finally:
+                self._refresh_lock.release()
+        return self._catalog
+
+    def by_type(self, agent_type: str) -> Optional[AgentRecord]:
+        return self.get().by_type.get(agent_type)
+
+    def by_id(self, agent_id: int) -> Optional[AgentRecord]:
+        return self.get().by_id.get(agent_id)
+
+    @property
+    def version(self) -> str:
+        return self.get().version
+
+    def invalidate(self):
+        """Force a re-read on next use, e.g. after seeding or editing agents"""
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(
+                Agent.id, Agent.name, Agent.type, Agent.description, Agent.capabilities,
+                Agent.is_active, Agent.version, Agent.created_at
+            )).all()
+        catalog = AgentCatalog([AgentRecord(*row) for row in rows])
+        self._checked_at = time.monotonic()
+
+        if self._catalog is None or catalog.version != self._catalog.version:
+            previous = self._catalog
+            self._catalog = catalog
+            if previous is not None:
+                # Cached project views embed agent rows
+                response_cache.invalidate(AGENT_CATALOG)
+
+
+# Global agent catalog instance
+agent_catalog = AgentCatalogService()
@@ -0,0 +1,169 @@
+import atexit
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, exists, insert, literal, select, update
+
+from src.models.archive import ARCHIVE_TABLES, agent_tasks_archive, project_agents_archive, projects_archive
+from src.models.user import AgentTask, CompetitionEntry, MarketplaceItem, Project, ProjectAgent, db
+from src.services.cache import response_cache
+
+
+class ProjectArchiver:
+    """Moves long-inactive projects and their agent rows out of the hot tables"""
+
+    def __init__(self, archive_after_days: float = 30.0, interval: float = 3600.0, batch_size: int = 500):
+        self.archive_after_days = archive_after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.app = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app):
+        """Bind the archiver to an app and start the background sweep when enabled"""
+        self.app = app
+        self.archive_after_days = app.config.get('ARCHIVE_AFTER_DAYS', self.archive_after_days)
+        self.interval = app.config.get('ARCHIVE_INTERVAL', self.interval)
+        self.batch_size = app.config.get('ARCHIVE_BATCH_SIZE', self.batch_size)
+        app.extensions['project_archiver'] = self
+
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='project-archiver', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def archive_inactive(self, older_than: datetime = None) -> int:
+        """Archive every eligible project in batches, returning how many were moved"""
+        if older_than is None:
+            older_than = datetime.utcnow() - timedelta(days=self.archive_after_days)
+
+        archived = 0
+        with self._lock:
+            while True:
+                moved = self._archive_batch(older_than)
+                if not moved:
+                    return archived
+                archived += moved
+
+    def restore(self, project_id: int, user_id: int) -> Optional[Project]:
+        """Bring a deleted or archived project owned by user_id back into the hot tables"""
+        with self._lock:
+            with db.engine.begin() as connection:
+                archived = connection.execute(
+                    select(projects_archive.c.id)
+                    .where(projects_archive.c.id == project_id, projects_archive.c.user_id == user_id)
+                ).first()
+                if archived:
+                    project_id = self._unarchive(connection, project_id)
+
+                restored = connection.execute(
+                    update(Project)
+                    .where(Project.id == project_id, Project.user_id == user_id)
+                    .values(is_active=True, updated_at=datetime.utcnow())
+                ).rowcount
+
+        if not restored:
+            return None
+        response_cache.invalidate_user(user_id)
+        db.session.expire_all()
+        return db.session.get(Project, project_id)
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    archived = self.archive_inactive()
+                if archived:
+                    print(f"[ProjectArchiver] INFO: Archived {archived} inactive projects")
+            except Exception as e:
+                print(f"[ProjectArchiver] ERROR: Archive sweep failed: {str(e)}")
+
+    def _eligible_ids(self, connection, older_than: datetime) -> List[int]:
+        # Projects still referenced by the marketplace or a competition stay hot
+        return connection.execute(
+            select(Project.id)
+            .where(Project.is_active == False, Project.updated_at < older_than,
+                   ~exists().where(MarketplaceItem.project_id == Project.id),
+                   ~exists().where(CompetitionEntry.project_id == Project.id))
+            .order_by(Project.updated_at)
+            .limit(self.batch_size)
+        ).scalars().all()
+
+    def _archive_batch(self, older_than: datetime) -> int:
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            project_ids = self._eligible_ids(connection, older_than)
+            if not project_ids:
+                return 0
+
+            agent_ids = select(ProjectAgent.id).where(ProjectAgent.project_id.in_(project_ids))
+            filters = {
+                Project: Project.id.in_(project_ids),
+                ProjectAgent: ProjectAgent.project_id.in_(project_ids),
+                AgentTask: AgentTask.project_agent_id.in_(agent_ids)
+            }
+
+            for model, archive in ARCHIVE_TABLES:
+                hot = model.__table__
+                connection.execute(insert(archive).from_select(
+                    [column.name for column in hot.columns] + ['archived_at'],
+                    select(*hot.columns, literal(now, archive.c.archived_at.type)).where(filters[model])
+                ))
+            # Children first so foreign keys hold throughout
+            for model, _ in reversed(ARCHIVE_TABLES):
+                connection.execute(delete(model.__table__).where(filters[model]))
+        return len(project_ids)
+
+    def _unarchive(self, connection, project_id: int) -> int:
+        """Move a project's rows back into the hot tables, returning the project's id there.
+
+        Rows keep their ids unless the id was handed out again, which SQLite does for
+        tables created before they were declared AUTOINCREMENT; such rows get a new id
+        and the rows referencing them follow it.
+        """
+        # Archive table -> (column referencing the parent, parent archive table)
+        parents = {
+            project_agents_archive: ('project_id', projects_archive),
+            agent_tasks_archive: ('project_agent_id', project_agents_archive)
+        }
+        hot_ids: Dict[object, Dict[int, int]] = {}
+
+        for model, archive in ARCHIVE_TABLES:
+            hot = model.__table__
+            if archive in parents:
+                column, parent = parents[archive]
+                rows = connection.execute(
+                    select(archive).where(archive.c[column].in_(list(hot_ids[parent])))
+                ).all()
+            else:
+                column, parent = None, None
+                rows = connection.execute(select(archive).where(archive.c.id == project_id)).all()
+
+            ids = [row.id for row in rows]
+            taken = set(connection.execute(select(hot.c.id).where(hot.c.id.in_(ids))).scalars()) if ids else set()
+            hot_ids[archive], kept = {}, []
+            for row in rows:
+                values = {name: row._mapping[name] for name in hot.columns.keys()}
+                if column:
+                    values[column] = hot_ids[parent][values[column]]
+                if row.id in taken:
+                    del values['id']
+                    hot_ids[archive][row.id] = connection.execute(insert(hot).values(values)).inserted_primary_key[0]
+                else:
+                    kept.append(values)
+                    hot_ids[archive][row.id] = row.id
+            if kept:
+                connection.execute(insert(hot), kept)
+            connection.execute(delete(archive).where(archive.c.id.in_(ids)))
+
+        return hot_ids[projects_archive][project_id]
+
+
+# Global project archiver instance
+project_archiver = ProjectArchiver()
@@ -0,0 +1,309 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from flask import current_app, g, make_response, request
+from sqlalchemy import event, select
+
+from src.models.user import Project, ProjectAgent, db
+
+# Invalidation tags shared by the cached views and the writers that change them
+MARKETPLACE_ITEMS = 'marketplace:items'
+MARKETPLACE_CATEGORIES = 'marketplace:categories'
+COMPETITIONS = 'battle_arena:competitions'
+LEADERBOARDS = 'battle_arena:leaderboards'
+AGENT_CATALOG = 'agents:catalog'
+
+
+# Versioned entries in a shared backend never go stale; this only lets orphaned generations expire
+VERSIONED_TTL = 24 * 3600.0
+
+# View headers that belong to one response only and are never replayed from the cache
+UNCACHED_HEADERS = {'Set-Cookie', 'X-Cache'}
+
+
+def leaderboard_tag(competition_id: int) -> str:
+    return f'battle_arena:leaderboard:{competition_id}'
+
+
+def user_projects_tag(user_id: Any) -> str:
+    return f'user:{user_id}:projects'
+
+
+class MemoryCacheBackend:
+    """Thread-safe in-process LRU with per-entry expiry.
+
+    Counters live outside the LRU: evicting a generation counter would reset it to 0
+    and make entries cached under an old generation current again.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if absent; returns whether the value was stored"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] >= time.monotonic()):
+                return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters[key] = self._counters.get(key, 0) + 1
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend for multi-worker deployments; needs the optional `redis` package"""
+
+    def __init__(self, url: str, prefix: str = 'afx:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND='redis' requires the 'redis' package (pip install redis)") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        if not keys:
+            return []
+        return [int(raw or 0) for raw in self.client.mget([self.prefix + key for key in keys])]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.client.set(self.prefix + key, pickle.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), nx=True,
+                                    px=int(ttl * 1000) if ttl else None))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        # Counters are plain Redis integers so INCR stays atomic across workers
+        return self.client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """Caches GET responses keyed by endpoint, query string and the generation of their tags.
+
+    Writers call invalidate(tag) after committing; bumping a tag's generation changes the
+    key of every response that depends on it, so stale entries are never read again and
+    simply age out of the LRU (or expire by TTL in a shared backend). Responses read from
+    the replica are served but not stored, since they may predate the latest bump.
+    """
+
+    def __init__(self):
+        self.backend = MemoryCacheBackend()
+        self.default_ttl = 60.0
+        self.private_ttl = 5.0
+        self.lock_timeout = 5.0
+        self.enabled = True
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', self.default_ttl)
+        self.private_ttl = app.config.get('RESPONSE_CACHE_PRIVATE_TTL', self.private_ttl)
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        if backend == 'redis':
+            self.backend = RedisCacheBackend(app.config['RESPONSE_CACHE_REDIS_URL'])
+        elif backend == 'memory':
+            self.backend = MemoryCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+        else:
+            raise ValueError(f"Unknown response cache backend: {backend}")
+        app.extensions['response_cache'] = self
+
+        if not event.contains(db.session, 'after_flush', _record_project_writes):
+            event.listen(db.session, 'after_flush', _record_project_writes)
+            event.listen(db.session, 'after_commit', _bump_user_generations)
+            event.listen(db.session, 'after_rollback', _discard_project_writes)
+
+    def invalidate(self, *tags: str):
+        """Bump the generation of each tag, orphaning every response cached under it"""
+        for tag in tags:
+            self.backend.incr(f'gen:{tag}')
+
+    def invalidate_user(self, *user_ids: Any):
+        """Bump the project generation of each user after writes the session cannot see"""
+        self.invalidate(*(user_projects_tag(user_id) for user_id in user_ids))
+
+    def clear(self):
+        self.backend.clear()
+
+    @property
+    def shared(self) -> bool:
+        """Whether every worker reads and bumps the same entries and generations"""
+        return not isinstance(self.backend, MemoryCacheBackend)
+
+    def make_key(self, tags: List[str]) -> str:
+        generations = self.backend.get_counters([f'gen:{tag}' for tag in tags])
+        args = sorted((name, value) for name, value in request.args.items(multi=True) if value != '')
+        raw = repr((request.path, args, tags, generations))
+        return 'resp:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def cached(self, tags: Callable[..., Iterable[str]], ttl: Union[float, Callable[[], float]] = None):
+        """Decorator for GET views; tags receives the view's URL arguments, ttl may be a callable"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != 'GET':
+                    return view(*args, **kwargs)
+
+                key = self.make_key(list(tags(**kwargs)))
+                cached = self.backend.get(key)
+                if cached is not None:
+                    return self._build_response(cached, 'HIT')
+
+                # Single-flight: one request per key recomputes, the rest wait for its result
+                with self._key_lock(key):
+                    cached = self.backend.get(key)
+                    if cached is not None:
+                        return self._build_response(cached, 'HIT')
+
+                    have_lock = self._acquire_shared_lock(key)
+                    if not have_lock:
+                        cached = self._wait_for(key)
+                        if cached is not None:
+                            return self._build_response(cached, 'HIT')
+                    try:
+                        response = make_response(view(*args, **kwargs))
+                        # A replica may not have replayed the write that bumped the generation yet;
+                        # storing its answer would serve that lag under the new key for the whole TTL
+                        if response.status_code == 200 and not response.direct_passthrough \
+                                and not g.get('db_use_replica'):
+                            self.backend.set(key, {
+                                'body': response.get_data(),
+                                'status': response.status_code,
+                                'headers': [(name, value) for name, value in response.headers.items()
+                                            if name not in UNCACHED_HEADERS]
+                            }, (ttl() if callable(ttl) else ttl) or self.default_ttl)
+                    finally:
+                        if have_lock:
+                            self.backend.delete(f'lock:{key}')
+
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def versioned(self, tags: Callable[..., Iterable[str]]):
+        """Decorator for views whose tags are bumped on every change.
+
+        Only a shared backend sees the bumps of every worker, so only there do entries
+        live until their generation moves on; per-worker memory keeps them private_ttl.
+        """
+        return self.cached(tags, ttl=lambda: VERSIONED_TTL if self.shared else self.private_ttl)
+
+    def _build_response(self, cached: Dict[str, Any], state: str):
+        response = current_app.response_class(cached['body'], status=cached['status'], headers=cached['headers'])
+        response.headers['X-Cache'] = state
+        return response
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                if len(self._key_locks) > 10000:
+                    self._key_locks = {k: v for k, v in self._key_locks.items() if v.locked()}
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _acquire_shared_lock(self, key: str) -> bool:
+        # Only matters for shared backends, where other processes may be filling the same key
+        if isinstance(self.backend, MemoryCacheBackend):
+            return False
+        return self.backend.add(f'lock:{key}', 1, self.lock_timeout)
+
+    def _wait_for(self, key: str) -> Any:
+        if isinstance(self.backend, MemoryCacheBackend):
+            return None
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            cached = self.backend.get(key)
+            if cached is not None:
+                return cached
+            time.sleep(0.02)
+        return None
+
+
+def _record_project_writes(session, flush_context):
+    # Collect the owners of every project and project agent row this flush wrote
+    user_ids = session.info.setdefault('project_writers', set())
+    project_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Project):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, ProjectAgent):
+            project_ids.add(obj.project_id)
+
+    project_ids.discard(None)
+    if project_ids:
+        user_ids.update(session.connection().execute(
+            select(Project.user_id).where(Project.id.in_(project_ids))
+        ).scalars())
+
+
+def _bump_user_generations(session):
+    user_ids = session.info.pop('project_writers', None)
+    if user_ids:
+        response_cache.invalidate_user(*(user_id for user_id in user_ids if user_id is not None))
+
+
+def _discard_project_writes(session):
+    session.info.pop('project_writers', None)
+
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,128 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency, only gzip is offered without it
+    brotli = None
+
+# Text-like bodies worth compressing; images, archives and fonts are already compressed
+COMPRESSIBLE_MIMETYPES = frozenset([
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+    'text/xml'
+])
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag value derived from the uncompressed body"""
+    return hashlib.sha1(body).hexdigest()[:20]
+
+
+class ResponseCompressor:
+    """Compresses responses per Accept-Encoding and tags them with content-hash ETags.
+
+    Compressed bodies are kept in a bounded store keyed by content hash, so a payload
+    that has not changed (agent results, cached marketplace pages) is encoded once and
+    its stored bytes are served on every later request.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 max_stored_bytes: int = 32 * 1024 * 1024):
+        self.enabled = True
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.max_stored_bytes = max_stored_bytes
+        self._stored: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read settings from app.config and compress every response on the way out"""
+        self.enabled = app.config.get('COMPRESSION_ENABLED', self.enabled)
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', self.min_size)
+        self.gzip_level = app.config.get('COMPRESSION_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('BROTLI_QUALITY', self.brotli_quality)
+        self.max_stored_bytes = app.config.get('COMPRESSION_STORE_MAX_BYTES', self.max_stored_bytes)
+        app.extensions['response_compressor'] = self
+        app.after_request(self.process)
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Encodings offered, most preferred first"""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def negotiate(self) -> Optional[str]:
+        """The best encoding the client accepts, or None for identity"""
+        return request.accept_encodings.best_match(self.encodings)
+
+    def compress(self, body: bytes, encoding: str, digest: str = None) -> bytes:
+        """Encode body, reusing the stored bytes when this content was encoded before"""
+        key = (digest or content_etag(body), encoding)
+        with self._lock:
+            stored = self._stored.get(key)
+            if stored is not None:
+                self._stored.move_to_end(key)
+                return stored
+
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+        if len(compressed) <= self.max_stored_bytes:
+            with self._lock:
+                if key not in self._stored:
+                    self._stored[key] = compressed
+                    self._stored_bytes += len(compressed)
+                while self._stored_bytes > self.max_stored_bytes:
+                    _, evicted = self._stored.popitem(last=False)
+                    self._stored_bytes -= len(evicted)
+        return compressed
+
+    def process(self, response):
+        """after_request hook: conditional GETs by content hash, then compression"""
+        if (not self.enabled or response.direct_passthrough or not response.is_sequence
+                or response.status_code != 200 or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        body = response.get_data()
+        digest = None
+        if request.method in ('GET', 'HEAD') and 'ETag' not in response.headers:
+            digest = content_etag(body)
+            response.set_etag(digest)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        encoding = self.negotiate() if len(body) >= self.min_size else None
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+
+        response.set_data(self.compress(body, encoding, digest))
+        response.headers['Content-Encoding'] = encoding
+        # The same content in another encoding still matches If-None-Match
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+# Global response compressor instance
+response_compressor = ResponseCompressor()
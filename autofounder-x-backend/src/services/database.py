@@ -0,0 +1,159 @@
+from typing import Any, Dict
+
+from sqlalchemy import Index, event, inspect, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn, DropIndex, ExecutableDDLElement
+
+from src.models.user import db
+
+# Named PRAGMA profiles applied to every new SQLite connection
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, full fsync, readers blocked by writers
+    'default': {},
+    # WAL lets readers proceed while a writer holds the lock and trades
+    # fsync-per-commit durability for fsync-per-checkpoint
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # negative values are KiB, so 64 MB
+        'mmap_size': 268435456,  # 256 MB
+        'busy_timeout': 5000,  # ms to wait on a locked database before failing
+        'temp_store': 'MEMORY'
+    }
+}
+
+
+def normalize_database_url(database_url: str) -> str:
+    """Accept the legacy postgres:// scheme that hosting providers still hand out"""
+    if database_url.startswith('postgres://'):
+        return 'postgresql://' + database_url[len('postgres://'):]
+    return database_url
+
+
+def get_engine_options(config: Dict[str, Any], database_url: str = None) -> Dict[str, Any]:
+    """Connection pool settings for server databases; SQLite keeps SQLAlchemy's defaults"""
+    url = make_url(database_url or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        return {}
+
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True)
+    }
+
+
+def get_sqlite_pragmas(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve the PRAGMAs for the configured profile plus any overrides"""
+    profile_name = config.get('SQLITE_PROFILE', 'performance')
+    if profile_name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {profile_name}")
+
+    pragmas = dict(SQLITE_PROFILES[profile_name])
+    pragmas.update(config.get('SQLITE_PRAGMAS') or {})
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]):
+    """Run the given PRAGMAs on a raw DB-API connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+# Indexes replaced by newer declarations, dropped from existing databases
+OBSOLETE_INDEXES = {
+    'projects': ['ix_projects_user_created_id']
+}
+
+
+class AddColumn(ExecutableDDLElement):
+    """ALTER TABLE ... ADD COLUMN for a column declared on a table that already exists"""
+
+    inherit_cache = False  # the column is not part of a cache key, so never reuse compiled SQL
+
+    def __init__(self, column):
+        self.column = column
+
+
+@compiles(AddColumn)
+def _compile_add_column(element, compiler, **kw):
+    # CreateColumn renders the name, type, server default and NOT NULL for the dialect
+    return 'ALTER TABLE %s ADD COLUMN %s' % (
+        compiler.preparer.format_table(element.column.table),
+        compiler.process(CreateColumn(element.column), **kw)
+    )
+
+
+def add_missing_columns():
+    """Add model columns to tables that already existed before the column was declared.
+
+    Only nullable columns or columns with a server default can be added this way.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.execute(AddColumn(column))
+
+
+def fill_not_null_columns():
+    """Fill NULLs left in columns declared NOT NULL with a server default after their table existed.
+
+    The NULLs get the server default. PostgreSQL then gets the NOT NULL constraint too;
+    SQLite cannot add one to an existing column, so there the model defaults keep new
+    rows filled.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    with db.engine.begin() as connection:
+        preparer = connection.dialect.identifier_preparer
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            nullable = {column['name'] for column in inspector.get_columns(table.name) if column['nullable']}
+            for column in table.columns:
+                if column.nullable or column.server_default is None or column.name not in nullable:
+                    continue
+                connection.execute(update(table).where(column.is_(None)).values({column: column.server_default.arg}))
+                if connection.dialect.name == 'postgresql':
+                    connection.execute(text(f'ALTER TABLE {preparer.format_table(table)} '
+                                            f'ALTER COLUMN {preparer.format_column(column)} SET NOT NULL'))
+
+
+def create_missing_indexes():
+    """Create model indexes on tables that already existed before the index was declared"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    with db.engine.begin() as connection:
+        for table_name, index_names in OBSOLETE_INDEXES.items():
+            for index_name in index_names:
+                connection.execute(DropIndex(Index(index_name), if_exists=True))
+
+
+def init_database(app):
+    """Attach connection-level tuning to every engine used by the app"""
+    pragmas = get_sqlite_pragmas(app.config)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name != 'sqlite' or not pragmas:
+                continue
+
+            def on_connect(dbapi_connection, connection_record, pragmas=pragmas):
+                apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+            event.listen(engine, 'connect', on_connect)
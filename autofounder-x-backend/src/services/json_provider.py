@@ -0,0 +1,90 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, time
+from typing import Any
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency, the stdlib encoder is used instead
+    orjson = None
+
+
+def _default(o: Any) -> Any:
+    """Types neither encoder handles natively"""
+    if isinstance(o, decimal.Decimal):
+        # Money columns are Numeric; the API has always returned them as numbers
+        return float(o)
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """JSON provider that encodes with orjson when available and the stdlib otherwise.
+
+    Both encoders write datetimes and dates as ISO 8601 (what Model.to_dict() produces)
+    and Decimals as numbers, so views can hand over raw column values.
+    """
+
+    # Keys keep insertion order; sorting them only costs time
+    sort_keys = False
+    # None pretty-prints in debug mode like Flask's default provider
+    compact = None
+    mimetype = 'application/json'
+
+    def __init__(self, app, encoder: str = 'orjson'):
+        super().__init__(app)
+        self.encoder = 'orjson' if encoder == 'orjson' and orjson is not None else 'json'
+
+    def _indent(self) -> bool:
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """Serialize to UTF-8 bytes without an intermediate str"""
+        if self.encoder == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if self._indent():
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+        return self.dumps(obj).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.encoder == 'orjson' and not kwargs:
+            return self.dumps_bytes(obj).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        if self._indent():
+            kwargs.setdefault('indent', 2)
+        else:
+            kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if self.encoder == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install FastJSONProvider as app.json using the JSON_ENCODER setting"""
+    app.json = FastJSONProvider(app, app.config.get('JSON_ENCODER', 'orjson'))
+    app.extensions['json_provider'] = app.json
@@ -0,0 +1,248 @@
+import atexit
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.models.user import CompetitionEntry, db
+
+# Ranking rows written per UPDATE batch when stored rankings are repaired
+PERSIST_BATCH_SIZE = 1000
+
+
+class CompetitionLeaderboard:
+    """Entries of one competition ordered by votes (descending), ties broken by entry id"""
+
+    def __init__(self, entries: Iterable[Tuple[int, int]]):
+        self._votes: Dict[int, int] = {entry_id: votes or 0 for entry_id, votes in entries}
+        # Balanced sorted list: adding, removing and finding the position of a key are O(log n)
+        self._keys = SortedList((-votes, entry_id) for entry_id, votes in self._votes.items())
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, entry_id: int) -> bool:
+        return entry_id in self._votes
+
+    def votes(self, entry_id: int) -> Optional[int]:
+        return self._votes.get(entry_id)
+
+    def rank(self, entry_id: int) -> Optional[int]:
+        """1-based rank of an entry, found by binary search"""
+        votes = self._votes.get(entry_id)
+        if votes is None:
+            return None
+        return self._keys.bisect_left((-votes, entry_id)) + 1
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, int, int]]:
+        """(rank, entry_id, votes) for a slice of the leaderboard"""
+        return [
+            (offset + index + 1, entry_id, -negative_votes)
+            for index, (negative_votes, entry_id) in enumerate(self._keys.islice(offset, offset + limit))
+        ]
+
+    def rankings(self) -> Dict[int, int]:
+        return {entry_id: index + 1 for index, (_, entry_id) in enumerate(self._keys)}
+
+    def add(self, entry_id: int, votes: int = 0) -> int:
+        self._votes[entry_id] = votes
+        self._keys.add((-votes, entry_id))
+        return self.rank(entry_id)
+
+    def set_votes(self, entry_id: int, votes: int) -> Tuple[int, int]:
+        """Move an entry to its new vote count, returning its (old_rank, new_rank)"""
+        old_rank = self.rank(entry_id)
+        self._keys.remove((-self._votes[entry_id], entry_id))
+        self._votes[entry_id] = votes
+        self._keys.add((-votes, entry_id))
+        return old_rank, self.rank(entry_id)
+
+
+class LeaderboardService:
+    """Per-process leaderboards derived from CompetitionEntry.votes.
+
+    Votes are the only thing a request writes; ranks are read from the in-memory board.
+    Each worker holds its own copy. A board is reloaded from the database when it is
+    older than max_age or when a vote reveals that another worker changed it. The stored
+    CompetitionEntry.ranking column is brought up to date by a background job every
+    persist_interval seconds, never by a request.
+
+    The service lock only guards the board map and board updates. Loading a board reads
+    the database under a lock of its own competition, so a large competition loading
+    never holds up votes and reads of the others.
+    """
+
+    def __init__(self, max_age: float = 60.0, persist_interval: float = 30.0):
+        self.max_age = max_age
+        self.persist_interval = persist_interval
+        self.app = None
+        self._boards: Dict[int, CompetitionLeaderboard] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[int, threading.Lock] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app):
+        """Bind to an app and start the ranking persistence job when enabled"""
+        self.app = app
+        self.max_age = app.config.get('LEADERBOARD_MAX_AGE', self.max_age)
+        self.persist_interval = app.config.get('LEADERBOARD_PERSIST_INTERVAL', self.persist_interval)
+        app.extensions['leaderboard'] = self
+
+        if self.persist_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='leaderboard-persister', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def get(self, competition_id: int) -> CompetitionLeaderboard:
+        """The board for a competition, loading it on first use or once it is stale"""
+        return self._get(competition_id)[0]
+
+    def _get(self, competition_id: int) -> Tuple[CompetitionLeaderboard, bool]:
+        """The board and whether this call loaded it"""
+        board = self._current(competition_id)
+        if board is not None:
+            return board, False
+        with self._load_lock(competition_id):
+            # Another request may have loaded it while this one waited
+            board = self._current(competition_id)
+            if board is not None:
+                return board, False
+            return self._load(competition_id), True
+
+    def _current(self, competition_id: int) -> Optional[CompetitionLeaderboard]:
+        with self._lock:
+            board = self._boards.get(competition_id)
+        if board is None or time.monotonic() - board.loaded_at > self.max_age:
+            return None
+        return board
+
+    def _load_lock(self, competition_id: int) -> threading.Lock:
+        with self._lock:
+            lock = self._load_locks.get(competition_id)
+            if lock is None:
+                lock = self._load_locks[competition_id] = threading.Lock()
+            return lock
+
+    def invalidate(self, competition_id: int = None):
+        """Drop one board (or all of them) so it is rebuilt on next use"""
+        with self._lock:
+            if competition_id is None:
+                self._boards.clear()
+                self._dirty.clear()
+            else:
+                self._boards.pop(competition_id, None)
+
+    def record_entry(self, entry: CompetitionEntry) -> int:
+        """Place a new entry on its competition's board and set its ranking"""
+        db.session.flush()
+        board = self.get(entry.competition_id)
+        with self._lock:
+            if entry.id not in board:
+                board.add(entry.id, entry.votes or 0)
+            entry.ranking = board.rank(entry.id)
+            if entry.ranking < len(board):
+                # Entries below it moved down; only the job rewrites their stored rankings
+                self._dirty.add(entry.competition_id)
+            return entry.ranking
+
+    def record_vote(self, entry: CompetitionEntry) -> int:
+        """Add one vote to an entry and return its new rank; stored rankings follow later"""
+        # One atomic increment: concurrent votes queue on the row instead of overwriting each other
+        votes = db.session.execute(
+            update(CompetitionEntry)
+            .where(CompetitionEntry.id == entry.id)
+            .values(votes=func.coalesce(CompetitionEntry.votes, 0) + 1)
+            .returning(CompetitionEntry.votes)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        set_committed_value(entry, 'votes', votes)
+
+        board, fresh = self._get(entry.competition_id)
+        if not fresh and board.votes(entry.id) != votes - 1:
+            # Another worker has voted since this board was loaded
+            with self._load_lock(entry.competition_id):
+                board = self._load(entry.competition_id)
+
+        with self._lock:
+            _, new_rank = board.set_votes(entry.id, votes)
+            self._dirty.add(entry.competition_id)
+        return new_rank
+
+    def persist_rankings(self) -> int:
+        """Store the current rank of every entry in competitions with changed standings.
+
+        Each board is reloaded first so the ranks follow the committed votes of every
+        worker. Returns the number of ranking values rewritten.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+
+        written = 0
+        for competition_id in dirty:
+            try:
+                written += self._persist(competition_id)
+            except Exception:
+                with self._lock:
+                    self._dirty.add(competition_id)
+                raise
+        return written
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.persist_interval):
+            try:
+                with self.app.app_context():
+                    self.persist_rankings()
+            except Exception as e:
+                print(f"[Leaderboard] ERROR: Failed to persist rankings: {str(e)}")
+
+    def _persist(self, competition_id: int) -> int:
+        with self._load_lock(competition_id):
+            _, stale = self._read_board(competition_id)
+
+        with db.engine.begin() as connection:
+            for offset in range(0, len(stale), PERSIST_BATCH_SIZE):
+                connection.execute(
+                    update(CompetitionEntry.__table__)
+                    .where(CompetitionEntry.__table__.c.id == bindparam('entry_id'))
+                    .values(ranking=bindparam('new_ranking')),
+                    stale[offset:offset + PERSIST_BATCH_SIZE]
+                )
+        return len(stale)
+
+    def _load(self, competition_id: int) -> CompetitionLeaderboard:
+        # Callers hold the competition's load lock
+        board, stale = self._read_board(competition_id)
+        if stale:
+            with self._lock:
+                self._dirty.add(competition_id)
+        return board
+
+    def _read_board(self, competition_id: int) -> Tuple[CompetitionLeaderboard, List[Dict[str, int]]]:
+        # Read-only, on a separate primary connection so the request's session is untouched;
+        # also returns the entries whose stored ranking disagrees with the board
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(CompetitionEntry.id, CompetitionEntry.votes, CompetitionEntry.ranking)
+                .where(CompetitionEntry.competition_id == competition_id)
+            ).all()
+        board = CompetitionLeaderboard((row.id, row.votes) for row in rows)
+        with self._lock:
+            self._boards[competition_id] = board
+
+        rankings = board.rankings()
+        stale = [{'entry_id': row.id, 'new_ranking': rankings[row.id]}
+                 for row in rows if row.ranking != rankings[row.id]]
+        return board, stale
+
+
+# Global leaderboard instance
+leaderboard = LeaderboardService()
@@ -0,0 +1,238 @@
+import bisect
+import hmac
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, abort, g, request
+
+# Seconds; covers cached reads (sub-millisecond) through password hashing and bulk imports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+STEP_BUCKETS = (0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+RUN_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """A named family of samples keyed by label values"""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return lines
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """The family's sample lines in the exposition format"""
+        pass
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}' for labels, value in values]
+
+
+class Gauge(Metric):
+    """A settable gauge, or one read from function() at scrape time ({label values: value})"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Callable[[], Dict[LabelValues, float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.function = function
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            values = list(self.function().items())
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        return [f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}' for labels, value in values]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+
+        lines = []
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            # Re-registering (e.g. a second app in the same process) returns the existing family
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), function=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    """Per-route latency, status, size and in-flight metrics for every request, served at /api/metrics"""
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry):
+        self.registry = registry
+        self.enabled = True
+        self.token: Optional[str] = None
+        self.requests = registry.counter(
+            'autofounder_http_requests_total', 'HTTP requests by route, method and status',
+            ['method', 'route', 'status'])
+        self.latency = registry.histogram(
+            'autofounder_http_request_duration_seconds', 'HTTP request latency by route',
+            ['method', 'route'])
+        self.response_size = registry.histogram(
+            'autofounder_http_response_size_bytes', 'HTTP response body size by route (as sent)',
+            ['method', 'route'], SIZE_BUCKETS)
+        self.in_flight = registry.gauge('autofounder_http_requests_in_flight', 'HTTP requests being served')
+
+    def init_app(self, app):
+        """Instrument the app; register before response compression so sizes are measured as sent"""
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        self.token = app.config.get('METRICS_TOKEN') or None
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/api/metrics'), 'metrics', self.export)
+
+    def export(self):
+        """Metrics for scrapers sending METRICS_TOKEN as a bearer token; hidden while no token is set"""
+        if self.token is None:
+            abort(404)
+        sent = request.headers.get('Authorization', '').encode('utf-8')
+        if not hmac.compare_digest(sent, f'Bearer {self.token}'.encode('utf-8')):
+            return Response('Unauthorized\n', status=401, content_type=CONTENT_TYPE,
+                            headers={'WWW-Authenticate': 'Bearer'})
+        return Response(self.registry.render(), content_type=CONTENT_TYPE)
+
+    def _before(self):
+        g.metrics_started = time.perf_counter()
+        self.in_flight.inc()
+
+    def _after(self, response):
+        started = g.get('metrics_started')
+        if started is not None:
+            # The rule template keeps label cardinality bounded (no ids or unmatched paths)
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            self.latency.observe(time.perf_counter() - started, request.method, route)
+            self.requests.inc(request.method, route, str(response.status_code))
+            size = response.calculate_content_length()
+            if size is not None:
+                self.response_size.observe(size, request.method, route)
+        return response
+
+    def _teardown(self, exc: Optional[BaseException]):
+        if g.pop('metrics_started', None) is not None:
+            self.in_flight.dec()
+
+
+# Global request metrics instance
+request_metrics = RequestMetrics()
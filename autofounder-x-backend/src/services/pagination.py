@@ -0,0 +1,76 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import DateTime, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded for the requested sort"""
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """Pack the sort key values of the last row into an opaque URL-safe token"""
+    payload = {
+        's': sort,
+        'v': [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, columns: List[Any]) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor for the same sort and columns"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload['v']
+        if payload['s'] != sort or len(values) != len(columns):
+            raise InvalidCursor('Cursor does not match the requested sort order')
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Invalid pagination cursor') from e
+
+
+def _decode_value(column, value: Any) -> Any:
+    # Values must have the column's type, so a forged cursor cannot reach the database as anything else
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    python_type = column.type.python_type
+    allowed = (int, float) if python_type is float else python_type
+    if isinstance(value, bool) or not isinstance(value, allowed):
+        raise InvalidCursor('Invalid pagination cursor')
+    return value
+
+
+def keyset_paginate(query, columns: List[Any], sort: str, cursor: Optional[str], limit: int,
+                    include_total: bool = False) -> Tuple[List[Any], Optional[str], Optional[int]]:
+    """Page through a query in descending (columns...) order without OFFSET.
+
+    The last column must be unique (normally the primary key) so the order is total.
+    Returns (rows, next_cursor, total); total is only counted when asked for.
+    """
+    total = None
+    if include_total:
+        total = query.order_by(None).count()
+
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+
+    return rows, next_cursor, total
@@ -0,0 +1,97 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when every hashing slot stays taken for longer than the queue timeout"""
+
+
+def normalize_method(method: str) -> str:
+    """Spell out werkzeug's default cost parameters, as they appear in stored hashes"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        return method if args else 'scrypt:32768:8:1'
+    if name == 'pbkdf2':
+        if len(args) == 2:
+            return method
+        hash_name = args[0] if args else 'sha256'
+        return f'pbkdf2:{hash_name}:{DEFAULT_PBKDF2_ITERATIONS}'
+    raise ValueError(f"Unsupported password hash method '{method}'")
+
+
+class PasswordHasher:
+    """Password hashing on a bounded process pool, off the request worker's CPU.
+
+    At most workers hashes run at once and at most max_pending are in flight; a burst
+    of logins beyond that fails with PasswordHasherBusy after queue_timeout instead of
+    taking the CPU from every other request. workers=0 hashes inline.
+    """
+
+    def __init__(self, method: str = 'scrypt:32768:8:1', salt_length: int = 16, workers: int = 2,
+                 max_pending: int = 32, queue_timeout: float = 5.0):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', self.method))
+        self.salt_length = app.config.get('PASSWORD_HASH_SALT_LENGTH', self.salt_length)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', self.queue_timeout)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method and cost"""
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """Check a password against a stored hash of any supported method"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Whether a stored hash was made with other parameters than the configured ones"""
+        return pwhash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy('Too many password checks in progress, try again shortly')
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Created on first use so every forked server worker gets its own pool
+        pool = self._pool
+        if pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+                pool = self._pool
+        return pool
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,118 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+from flask import g, jsonify
+from flask_jwt_extended import create_access_token, get_jwt
+from sqlalchemy import event
+
+from src.models.user import User, db
+from src.services.cache import MemoryCacheBackend
+
+
+class Principal(NamedTuple):
+    """The authenticated caller, as their user row stood at most USER_CACHE_TTL seconds ago"""
+    id: int
+    tier: str
+    is_active: bool
+
+
+def create_user_token(user: User) -> str:
+    """Access token for user; tier and active state are read from the user cache, not claims"""
+    # PyJWT requires a string subject
+    return create_access_token(identity=str(user.id))
+
+
+def load_principal(user_id: int) -> Optional[Principal]:
+    """The principal for a user id, or None when the user no longer exists"""
+    profile = user_cache.get(user_id)
+    if profile is None:
+        return None
+    return Principal(
+        id=user_id,
+        tier=profile.get('subscription_tier') or 'free',
+        is_active=profile.get('is_active') is not False
+    )
+
+
+def current_principal() -> Principal:
+    """The principal of the verified JWT in the current request, built once per request"""
+    principal = g.get('principal')
+    if principal is None:
+        principal = g.principal = load_principal(int(get_jwt()['sub']))
+    return principal
+
+
+def _verify_principal(jwt_header: Dict[str, Any], jwt_data: Dict[str, Any]) -> bool:
+    # Tokens of deactivated or deleted users stop working once the cached row is refreshed
+    principal = load_principal(int(jwt_data['sub']))
+    if principal is None or not principal.is_active:
+        return False
+    g.principal = principal
+    return True
+
+
+def init_principal(app):
+    """Reject tokens whose user is inactive or gone; needs the app's JWTManager"""
+    jwt = app.extensions['flask-jwt-extended']
+    jwt.token_verification_loader(_verify_principal)
+    jwt.token_verification_failed_loader(
+        lambda jwt_header, jwt_data: (jsonify({'msg': 'Account is inactive or no longer exists'}), 401)
+    )
+
+
+class UserCache:
+    """Short-lived per-process cache of User.to_dict() snapshots, dropped when the row is written"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.enabled = True
+        self.backend = MemoryCacheBackend(max_entries)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.enabled = self.ttl > 0
+        self.backend = MemoryCacheBackend(app.config.get('USER_CACHE_MAX_ENTRIES', self.backend.max_entries))
+        app.extensions['user_cache'] = self
+
+        if not event.contains(db.session, 'after_flush', _record_user_writes):
+            event.listen(db.session, 'after_flush', _record_user_writes)
+            event.listen(db.session, 'after_commit', _invalidate_user_writes)
+            event.listen(db.session, 'after_rollback', _discard_user_writes)
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """The user's profile dict, from the cache when fresh and the database otherwise"""
+        key = f'user:{user_id}'
+        profile = self.backend.get(key) if self.enabled else None
+        if profile is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            profile = user.to_dict()
+            if self.enabled:
+                self.backend.set(key, profile, self.ttl)
+        return dict(profile)
+
+    def invalidate(self, *user_ids: Any):
+        for user_id in user_ids:
+            self.backend.delete(f'user:{user_id}')
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _record_user_writes(session, flush_context):
+    user_ids = session.info.setdefault('user_writes', set())
+    user_ids.update(obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User))
+
+
+def _invalidate_user_writes(session):
+    user_ids = session.info.pop('user_writes', None)
+    if user_ids:
+        user_cache.invalidate(*user_ids)
+
+
+def _discard_user_writes(session):
+    session.info.pop('user_writes', None)
+
+
+# Global user cache instance
+user_cache = UserCache()
@@ -0,0 +1,154 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from src.models.user import Project, ProjectAgent, db
+from src.services.agent_catalog import agent_catalog
+
+# Optional text fields accepted per project, with their column length (None = unbounded)
+PROJECT_FIELDS = {
+    'description': None,
+    'business_model': 50,
+    'target_market': None,
+    'budget_range': 50,
+    'timeline': 50
+}
+
+NAME_MAX_LENGTH = 200
+
+
+class ImportRowError(ValueError):
+    """Raised for an import row that cannot be parsed or validated"""
+
+
+def parse_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    """Decode one JSON document per non-blank line, yielding ImportRowError for bad lines"""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except (ValueError, UnicodeDecodeError) as e:
+            yield ImportRowError(f'Invalid JSON on line {line_number}: {str(e)}')
+
+
+def validate_project_row(row: Any, agents_by_type) -> Tuple[Dict[str, Any], List[int]]:
+    """Check one import row and return (project column values, agent ids)"""
+    if isinstance(row, ImportRowError):
+        raise row
+    if not isinstance(row, dict):
+        raise ImportRowError('Each project must be a JSON object')
+
+    name = row.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ImportRowError('Project name is required')
+    if len(name.strip()) > NAME_MAX_LENGTH:
+        raise ImportRowError(f'Project name must be at most {NAME_MAX_LENGTH} characters')
+
+    values = {'name': name.strip()}
+    for field, max_length in PROJECT_FIELDS.items():
+        value = row.get(field, '')
+        if value is None:
+            value = ''
+        if not isinstance(value, str):
+            raise ImportRowError(f'{field} must be a string')
+        if max_length is not None and len(value) > max_length:
+            raise ImportRowError(f'{field} must be at most {max_length} characters')
+        values[field] = value.strip() if field == 'description' else value
+
+    selected_agents = row.get('selected_agents', [])
+    if not isinstance(selected_agents, list):
+        raise ImportRowError('selected_agents must be a list of agent types')
+    agent_ids = []
+    for agent_type in selected_agents:
+        agent = agents_by_type.get(agent_type) if isinstance(agent_type, str) else None
+        if agent is None:
+            raise ImportRowError(f'Unknown agent type: {agent_type}')
+        if agent.id not in agent_ids:
+            agent_ids.append(agent.id)
+
+    return values, agent_ids
+
+
+def import_projects(user_id: int, rows: Iterable[Any], chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Validate and insert projects chunk by chunk, yielding one result per input row.
+
+    Each chunk is inserted with multi-row INSERTs in its own transaction, so a failing
+    chunk is reported row by row without undoing the chunks before it.
+    """
+    agents_by_type = agent_catalog.get().by_type
+    chunk: List[Tuple[int, Any]] = []
+    for index, row in enumerate(rows):
+        chunk.append((index, row))
+        if len(chunk) >= chunk_size:
+            yield from _import_chunk(user_id, chunk, agents_by_type)
+            chunk = []
+    if chunk:
+        yield from _import_chunk(user_id, chunk, agents_by_type)
+
+
+def _import_chunk(user_id: int, chunk: List[Tuple[int, Any]], agents_by_type) -> Iterator[Dict[str, Any]]:
+    results: List[Optional[Dict[str, Any]]] = [None] * len(chunk)
+    valid = []
+    for position, (index, row) in enumerate(chunk):
+        try:
+            values, agent_ids = validate_project_row(row, agents_by_type)
+            valid.append((position, values, agent_ids))
+        except ImportRowError as e:
+            results[position] = {'index': index, 'success': False, 'message': str(e)}
+
+    if valid:
+        now = datetime.utcnow()
+        project_rows = [{
+            **values,
+            'user_id': user_id,
+            'status': 'planning',
+            'created_at': now,
+            'updated_at': now,
+            'is_public': False,
+            'marketplace_votes': 0,
+            'battle_arena_score': 0
+        } for _, values, _ in valid]
+
+        try:
+            with db.engine.begin() as connection:
+                if connection.dialect.name == 'sqlite':
+                    # SQLite has no insert sentinel, so ordered RETURNING would fall back to
+                    # one INSERT per row. Rowids are handed out in ascending VALUES order
+                    # while this transaction holds the write lock, so sorting restores it.
+                    project_ids = sorted(connection.execute(
+                        insert(Project).returning(Project.id), project_rows
+                    ).scalars().all())
+                else:
+                    project_ids = connection.execute(
+                        insert(Project).returning(Project.id, sort_by_parameter_order=True),
+                        project_rows
+                    ).scalars().all()
+
+                agent_rows = [
+                    {'project_id': project_id, 'agent_id': agent_id, 'status': 'idle', 'progress_percentage': 0}
+                    for project_id, (_, _, agent_ids) in zip(project_ids, valid)
+                    for agent_id in agent_ids
+                ]
+                if agent_rows:
+                    connection.execute(insert(ProjectAgent), agent_rows)
+
+            for project_id, (position, _, agent_ids) in zip(project_ids, valid):
+                results[position] = {
+                    'index': chunk[position][0],
+                    'success': True,
+                    'id': project_id,
+                    'agents': len(agent_ids)
+                }
+        except Exception as e:
+            for position, _, _ in valid:
+                results[position] = {
+                    'index': chunk[position][0],
+                    'success': False,
+                    'message': f'Failed to import project: {str(e)}'
+                }
+
+    yield from results
@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from flask import current_app, g
+from sqlalchemy import event
+
+from src.models.user import db
+
+# Prefix that asks each dialect for a plan without running the statement
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN '
+}
+EXPLAIN_SAVEPOINT = 'query_profiler_explain'
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by check_query_budget when a request runs more queries than allowed"""
+
+
+class QueryRecorder:
+    """Queries and database time seen while the recorder is active on this thread"""
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[List[Tuple[str, float]]] = [] if keep_statements else None
+
+    def add(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        if self.statements is not None:
+            self.statements.append((statement, elapsed))
+
+
+class QueryProfiler:
+    """Counts queries and database time per request and logs slow queries with their plan.
+
+    Engine events feed every recorder active on the executing thread: one per request,
+    plus any opened by record_queries(). With SQL_DEBUG_HEADERS on, responses carry
+    X-DB-Query-Count, X-DB-Query-Time (ms) and a Server-Timing entry.
+    """
+
+    def __init__(self, slow_query_threshold: float = 0.1, explain_cache_size: int = 256):
+        self.slow_query_threshold = slow_query_threshold
+        self.explain_cache_size = explain_cache_size
+        self.debug_headers: Optional[bool] = None  # None follows the app's debug mode
+        self._local = threading.local()
+        self._explained: OrderedDict = OrderedDict()
+        self._explained_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.slow_query_threshold = app.config.get('SLOW_QUERY_THRESHOLD', self.slow_query_threshold)
+        self.debug_headers = app.config.get('SQL_DEBUG_HEADERS', self.debug_headers)
+        app.extensions['query_profiler'] = self
+
+        with app.app_context():
+            for engine in db.engines.values():
+                if event.contains(engine, 'before_cursor_execute', self._before_execute):
+                    continue
+                event.listen(engine, 'before_cursor_execute', self._before_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    @property
+    def recorders(self) -> List[QueryRecorder]:
+        recorders = getattr(self._local, 'recorders', None)
+        if recorders is None:
+            recorders = self._local.recorders = []
+        return recorders
+
+    @contextmanager
+    def record(self, keep_statements: bool = False) -> Iterator[QueryRecorder]:
+        """Record the queries run on this thread inside the block"""
+        recorder = QueryRecorder(keep_statements)
+        self.recorders.append(recorder)
+        try:
+            yield recorder
+        finally:
+            self.recorders.remove(recorder)
+
+    def _start_request(self):
+        recorder = QueryRecorder()
+        self.recorders.append(recorder)
+        g.query_recorder = recorder
+
+    def _finish_request(self, response):
+        recorder = g.get('query_recorder')
+        debug_headers = self.debug_headers if self.debug_headers is not None else current_app.debug
+        if recorder is not None and debug_headers:
+            milliseconds = recorder.duration * 1000
+            response.headers['X-DB-Query-Count'] = str(recorder.count)
+            response.headers['X-DB-Query-Time'] = f'{milliseconds:.2f}'
+            response.headers.add('Server-Timing', f'db;desc="{recorder.count} queries";dur={milliseconds:.2f}')
+        return response
+
+    def _teardown_request(self, exc):
+        recorder = g.pop('query_recorder', None)
+        if recorder is not None and recorder in self.recorders:
+            self.recorders.remove(recorder)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # On the execution context rather than conn.info: a statement that fails never
+        # reaches _after_execute, and the context is dropped with it
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        for recorder in self.recorders:
+            recorder.add(statement, elapsed)
+
+        threshold = self.slow_query_threshold
+        if threshold is not None and threshold >= 0 and elapsed >= threshold:
+            self._log_slow_query(conn, cursor, statement, parameters, executemany, elapsed)
+
+    def _log_slow_query(self, conn, cursor, statement, parameters, executemany, elapsed):
+        shown = ' '.join(statement.split())
+        print(f"[QueryProfiler] WARNING: Slow query ({elapsed * 1000:.1f} ms): {shown[:2000]}")
+        if executemany:
+            return
+        plan = self._explain(conn, cursor, statement, parameters)
+        if plan:
+            print(f"[QueryProfiler] INFO: Query plan:\n{plan}")
+
+    def _explain(self, conn, cursor, statement, parameters) -> Optional[str]:
+        """Plan of a slow read, captured once per distinct statement"""
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        with self._explained_lock:
+            if statement in self._explained:
+                self._explained.move_to_end(statement)
+                return None
+            self._explained[statement] = True
+            if len(self._explained) > self.explain_cache_size:
+                self._explained.popitem(last=False)
+
+        # A second cursor on the same DB-API connection bypasses the engine events; the
+        # savepoint keeps a failing EXPLAIN from aborting the transaction the query is in
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(f'SAVEPOINT {EXPLAIN_SAVEPOINT}')
+            try:
+                explain_cursor.execute(prefix + statement, parameters)
+                rows = explain_cursor.fetchall()
+            except Exception:
+                explain_cursor.execute(f'ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}')
+                raise
+            finally:
+                explain_cursor.execute(f'RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}')
+        except Exception as e:
+            return f"(EXPLAIN failed: {str(e)})"
+        finally:
+            explain_cursor.close()
+        if conn.dialect.name == 'sqlite':
+            # (id, parent, notused, detail)
+            return '\n'.join(f"  {row[0]:>4} {row[1]:>4}  {row[-1]}" for row in rows)
+        return '\n'.join(f"  {row[0]}" for row in rows)
+
+
+# Global query profiler instance
+query_profiler = QueryProfiler()
+
+
+def query_budget(limit: int) -> Callable:
+    """Declare the most queries a view may run; place it directly below the route decorator.
+
+    Budgets of JWT-protected views include the user row lookup a cold user cache makes.
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Record queries (with their SQL) run on this thread inside the block"""
+    with query_profiler.record(keep_statements=True) as recorder:
+        yield recorder
+
+
+def declared_query_budget(app, method: str, path: str) -> Optional[int]:
+    """The budget declared with @query_budget on the view that serves method and path"""
+    adapter = app.url_map.bind('localhost')
+    endpoint, _ = adapter.match(path.split('?', 1)[0], method=method)
+    return getattr(app.view_functions[endpoint], 'query_budget', None)
+
+
+def check_query_budget(client, method: str, path: str, max_queries: int = None, **kwargs) -> Any:
+    """Send a request with a Flask test client and fail if it exceeds its query budget.
+
+    The budget is max_queries or, when omitted, the view's @query_budget declaration.
+    Returns the response so callers can make their own assertions on it.
+    """
+    app = client.application
+    limit = max_queries if max_queries is not None else declared_query_budget(app, method, path)
+    if limit is None:
+        raise ValueError(f"No query budget declared for {method} {path}")
+
+    with record_queries() as recorder:
+        response = client.open(path, method=method, **kwargs)
+
+    if recorder.count > limit:
+        statements = '\n'.join(f"  {i + 1}. ({elapsed * 1000:.1f} ms) {' '.join(sql.split())}"
+                               for i, (sql, elapsed) in enumerate(recorder.statements))
+        raise QueryBudgetExceeded(
+            f"{method} {path} ran {recorder.count} queries, budget is {limit}:\n{statements}")
+    return response
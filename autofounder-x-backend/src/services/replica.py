@@ -0,0 +1,141 @@
+import threading
+import time
+from functools import wraps
+from typing import Any, Optional
+
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event, text
+
+from src.models.session import REPLICA_BIND_KEY
+from src.models.user import db
+from src.services.cache import MemoryCacheBackend, RedisCacheBackend
+from src.services.principal import current_principal
+
+# Replication lag in seconds, per dialect. Dialects without a query report no lag.
+LAG_QUERIES = {
+    'postgresql': text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+}
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may be served by the read replica.
+
+    A user who writes reads from the primary for sticky_seconds afterwards. That window
+    is kept in the Redis response cache backend when one is configured, so a read
+    landing on another worker honours it too; with the memory backend it only holds
+    on the worker that handled the write.
+    """
+
+    def __init__(self, max_lag: float = 5.0, sticky_seconds: float = 10.0, lag_check_interval: float = 1.0):
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.lag_check_interval = lag_check_interval
+        self.app = None
+        self._last_lag: Optional[float] = None
+        self._last_check = 0.0
+        self._check_lock = threading.Lock()
+        self.backend = MemoryCacheBackend(max_entries=10000)
+
+    def init_app(self, app):
+        """Read replica settings from the app config and track writes for read-your-writes"""
+        self.app = app
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', self.max_lag)
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        self.lag_check_interval = app.config.get('REPLICA_LAG_CHECK_INTERVAL', self.lag_check_interval)
+        self._last_lag = None
+        self._last_check = 0.0
+        if app.config.get('RESPONSE_CACHE_BACKEND', 'memory') == 'redis':
+            self.backend = RedisCacheBackend(app.config['RESPONSE_CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryCacheBackend(max_entries=10000)
+        app.extensions['replica_router'] = self
+
+        if not event.contains(db.session, 'after_flush', _record_flush):
+            event.listen(db.session, 'after_flush', _record_flush)
+            event.listen(db.session, 'after_commit', _record_commit)
+
+    @property
+    def enabled(self) -> bool:
+        return self.app is not None and REPLICA_BIND_KEY in self.app.config.get('SQLALCHEMY_BINDS', {})
+
+    def mark_write(self, identity: Any):
+        """Pin an identity's reads to the primary for the sticky window"""
+        if identity is None:
+            return
+        self.backend.set(f'sticky:{identity}', 1, self.sticky_seconds)
+
+    def is_sticky(self, identity: Any) -> bool:
+        if identity is None:
+            return False
+        return self.backend.get(f'sticky:{identity}') is not None
+
+    def replication_lag(self) -> float:
+        """Replica lag in seconds, re-measured at most once per check interval"""
+        now = time.monotonic()
+        if self._last_lag is not None and now - self._last_check < self.lag_check_interval:
+            return self._last_lag
+
+        # Only one request measures; the rest use the previous reading
+        if not self._check_lock.acquire(blocking=False):
+            return self._last_lag if self._last_lag is not None else float('inf')
+        try:
+            self._last_lag = self._measure_lag()
+        except Exception as e:
+            print(f"[ReplicaRouter] WARNING: Replica lag check failed: {str(e)}")
+            self._last_lag = float('inf')
+        finally:
+            self._last_check = now
+            self._check_lock.release()
+
+        return self._last_lag
+
+    def _measure_lag(self) -> float:
+        engine = db.engines[REPLICA_BIND_KEY]
+        query = LAG_QUERIES.get(engine.dialect.name)
+        if query is None:
+            return 0.0
+        with engine.connect() as connection:
+            return float(connection.execute(query).scalar() or 0)
+
+    def should_use_replica(self) -> bool:
+        """Whether the current request may read from the replica"""
+        if not self.enabled or request.method not in ('GET', 'HEAD'):
+            return False
+        if self.is_sticky(current_identity()):
+            return False
+        return self.replication_lag() <= self.max_lag
+
+
+def current_identity() -> Any:
+    """JWT identity of the current request, or None for anonymous or invalid tokens"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return current_principal().id if get_jwt() else None
+    except Exception:
+        return None
+
+
+def _record_flush(session, flush_context):
+    session.info['has_writes'] = True
+
+
+def _record_commit(session):
+    if session.info.pop('has_writes', False) and has_request_context():
+        replica_router.mark_write(current_identity())
+
+
+def read_replica(view):
+    """Serve a read-only view from the replica when it is configured, healthy and caught up"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_use_replica = replica_router.should_use_replica()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# Global replica router instance
+replica_router = ReplicaRouter()
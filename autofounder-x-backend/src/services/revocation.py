@@ -0,0 +1,173 @@
+import atexit
+import hashlib
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from src.models.token import RevokedToken
+from src.models.user import db
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives, false positives at about error_rate"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocationStore:
+    """Revoked JWT ids, persisted in the revoked_tokens table and mirrored in memory.
+
+    Each worker keeps a Bloom filter and an exact set of revoked jtis. A check is a few
+    bit probes (confirmed against the set on a hit) and never touches the database after
+    the first load; a background thread pulls rows written by other workers every sync
+    interval, so revocations reach every worker within that interval. Each sync also
+    forgets revocations whose token has expired, rebuilding the filter without them, and
+    deletes their rows, so memory and the table stay bounded by the live revocations.
+    """
+
+    def __init__(self, sync_interval: float = 1.0, sync_overlap: float = 60.0, capacity: int = 100000,
+                 error_rate: float = 0.001):
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.app = None
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._revoked: Dict[str, Optional[datetime]] = {}  # jti -> token expiry
+        self._synced_at: Optional[datetime] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app):
+        """Bind to an app whose JWTManager is already set up and check every token against the store"""
+        self.app = app
+        self.sync_interval = app.config.get('TOKEN_REVOCATION_SYNC_INTERVAL', self.sync_interval)
+        self.sync_overlap = app.config.get('TOKEN_REVOCATION_SYNC_OVERLAP', self.sync_overlap)
+        self.capacity = app.config.get('TOKEN_REVOCATION_CAPACITY', self.capacity)
+        self._reset()
+        app.extensions['token_revocation'] = self
+
+        jwt = app.extensions['flask-jwt-extended']
+        jwt.token_in_blocklist_loader(lambda jwt_header, jwt_payload: self.is_revoked(jwt_payload['jti']))
+
+        if self.sync_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='token-revocation-sync', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def revoke(self, jti: str, user_id: int = None, expires_at: Optional[datetime] = None):
+        """Persist a revocation and apply it to this worker immediately"""
+        if jti not in self._revoked:
+            try:
+                db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()  # already revoked by another request
+        with self._lock:
+            self._remember(jti, expires_at)
+
+    def is_revoked(self, jti: str) -> bool:
+        """Whether a token id was revoked; reads the database only if nothing was loaded yet"""
+        if not self._loaded:
+            self.sync()
+        return jti in self._bloom and jti in self._revoked
+
+    def sync(self):
+        """Pull revocations recorded since the last sync, re-reading the trailing overlap window.
+
+        The cursor is revoked_at rather than the id: a row can commit after rows with
+        higher ids were read, but its revoked_at still falls inside the window as long
+        as the commit delay plus the skew between worker clocks stays below sync_overlap.
+        Expired revocations are dropped from memory and from the table.
+        """
+        with self._lock:
+            now = datetime.utcnow()
+            query = select(RevokedToken.jti, RevokedToken.expires_at).where(
+                or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at > now)
+            )
+            if self._synced_at is not None:
+                query = query.where(RevokedToken.revoked_at > self._synced_at - timedelta(seconds=self.sync_overlap))
+            with db.engine.begin() as connection:
+                rows = connection.execute(query).all()
+                # Every worker runs this; the statement is a no-op once one of them has
+                connection.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            self._forget_expired(now)
+            for jti, expires_at in rows:
+                self._remember(jti, expires_at)
+            self._synced_at = now
+            self._loaded = True
+
+    def shutdown(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                with self.app.app_context():
+                    self.sync()
+            except Exception as e:
+                print(f"[TokenRevocation] ERROR: Sync failed: {str(e)}")
+
+    def _remember(self, jti: str, expires_at: Optional[datetime] = None):
+        if jti in self._revoked:
+            return
+        self._revoked[jti] = expires_at
+        if self._bloom.count >= self._bloom.capacity:
+            # Grow before the false positive rate degrades
+            self._rebuild(self._bloom.capacity * 2)
+        else:
+            self._bloom.add(jti)
+
+    def _forget_expired(self, now: datetime):
+        expired = [jti for jti, expires_at in self._revoked.items() if expires_at is not None and expires_at <= now]
+        if not expired:
+            return
+        for jti in expired:
+            del self._revoked[jti]
+        # Bits can't be cleared, so start a filter from what is left
+        self._rebuild(self._bloom.capacity)
+
+    def _rebuild(self, capacity: int):
+        bloom = BloomFilter(max(capacity, self.capacity), self.error_rate)
+        for known in self._revoked:
+            bloom.add(known)
+        self._bloom = bloom
+
+    def _reset(self):
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._revoked = {}
+            self._synced_at = None
+            self._loaded = False
+
+
+# Global token revocation store instance
+token_revocation = TokenRevocationStore()
@@ -0,0 +1,226 @@
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, or_, text
+
+from src.models.user import MarketplaceItem, Project, db
+
+SEARCH_TABLE = 'marketplace_search'
+
+# BM25 column weights: title, description, category, project name, target market
+BM25_WEIGHTS = (10.0, 2.0, 4.0, 6.0, 1.5)
+
+# The FTS table keeps its own copy of the indexed text, keyed by marketplace item id,
+# so snippet() works and rows can be replaced without an external content table.
+SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, description, category, project_name, target_market,
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS marketplace_search_item_insert
+    AFTER INSERT ON marketplace_items BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description, category, project_name, target_market)
+        SELECT new.id, new.title, new.description, new.category, p.name, p.target_market
+        FROM projects p WHERE p.id = new.project_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS marketplace_search_item_update
+    AFTER UPDATE OF title, description, category, project_id ON marketplace_items BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description, category, project_name, target_market)
+        SELECT new.id, new.title, new.description, new.category, p.name, p.target_market
+        FROM projects p WHERE p.id = new.project_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS marketplace_search_item_delete
+    AFTER DELETE ON marketplace_items BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS marketplace_search_project_update
+    AFTER UPDATE OF name, target_market ON projects BEGIN
+        DELETE FROM {SEARCH_TABLE}
+        WHERE rowid IN (SELECT id FROM marketplace_items WHERE project_id = new.id);
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description, category, project_name, target_market)
+        SELECT m.id, m.title, m.description, m.category, new.name, new.target_market
+        FROM marketplace_items m WHERE m.project_id = new.id;
+    END
+    """
+]
+
+REBUILD_SQL = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, title, description, category, project_name, target_market)
+    SELECT m.id, m.title, m.description, m.category, p.name, p.target_market
+    FROM marketplace_items m JOIN projects p ON p.id = m.project_id
+    """
+]
+
+BM25 = f"bm25({SEARCH_TABLE}, {', '.join(str(weight) for weight in BM25_WEIGHTS)})"
+
+# Phase 1: rank inside the FTS index alone; joins here would double the cost on big catalogs
+RANK_SQL = text(f"""
+    SELECT rowid AS id, {BM25} AS score
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH :query
+    ORDER BY score
+    LIMIT :window
+""")
+
+# Fallback when the ranked window holds too few visible items: filter while ranking
+RANK_FILTERED_SQL = text(f"""
+    SELECT m.id AS id, {BM25} AS score
+    FROM {SEARCH_TABLE}
+    JOIN marketplace_items m ON m.id = {SEARCH_TABLE}.rowid
+    JOIN projects p ON p.id = m.project_id
+    WHERE {SEARCH_TABLE} MATCH :query
+      AND p.is_public = 1 AND p.is_active = 1
+      AND (:category IS NULL OR m.category = :category)
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""")
+
+# snippet() brackets matches with control characters that HTML escaping leaves alone;
+# they become <mark> tags only after the indexed text has been escaped
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+SNIPPET_SQL = text(f"""
+    SELECT rowid AS id, snippet({SEARCH_TABLE}, -1, '{MATCH_START}', '{MATCH_END}', '…', 12) AS snippet
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH :query AND rowid IN :ids
+""").bindparams(bindparam('ids', expanding=True))
+
+# How many ranked candidates to fetch per requested result before filtering
+CANDIDATE_FACTOR = 4
+
+# Shorter terms only match whole tokens; expanding them touches too much of the index
+MIN_PREFIX_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Set once init_search_index() has the FTS5 table in place
+_fts5_ready = False
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every term must match, longer ones as prefixes.
+
+    Terms are quoted so user input can never be parsed as FTS5 operators.
+    """
+    terms = TOKEN_PATTERN.findall(query.lower())
+    if not terms:
+        return None
+    return ' '.join(
+        f'"{term}"*' if len(term) >= MIN_PREFIX_LENGTH else f'"{term}"'
+        for term in terms[:16]
+    )
+
+
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a raw snippet and turn its match markers into <mark> tags"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def init_search_index():
+    """Create the FTS5 table and sync triggers, backfilling the index when it is new"""
+    global _fts5_ready
+    _fts5_ready = False
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    with db.engine.begin() as connection:
+        exists = db.engine.dialect.has_table(connection, SEARCH_TABLE)
+        try:
+            for statement in SQLITE_SCHEMA:
+                connection.execute(text(statement))
+        except Exception as e:
+            print(f"[Search] WARNING: FTS5 unavailable, falling back to LIKE search: {str(e)}")
+            return
+
+        if not exists:
+            for statement in REBUILD_SQL:
+                connection.execute(text(statement))
+
+    _fts5_ready = True
+
+
+def rebuild_search_index():
+    """Re-index every marketplace item from scratch"""
+    with db.engine.begin() as connection:
+        for statement in REBUILD_SQL:
+            connection.execute(text(statement))
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+
+
+def search_marketplace(query: str, category: str = None, limit: int = 20,
+                       offset: int = 0) -> List[Dict[str, Any]]:
+    """Ranked search over public marketplace items: [{'id', 'score', 'snippet'}, ...]"""
+    match_query = build_match_query(query)
+    if match_query is None:
+        return []
+
+    if _fts5_ready:
+        return _search_fts5(match_query, category, limit, offset)
+
+    # Other databases: unranked substring match on every term
+    search = MarketplaceItem.query.join(Project).filter(Project.is_public == True, Project.is_active == True)
+    for term in TOKEN_PATTERN.findall(query.lower())[:16]:
+        pattern = f'%{term}%'
+        search = search.filter(or_(
+            MarketplaceItem.title.ilike(pattern),
+            MarketplaceItem.description.ilike(pattern),
+            MarketplaceItem.category.ilike(pattern),
+            Project.name.ilike(pattern),
+            Project.target_market.ilike(pattern)
+        ))
+    if category:
+        search = search.filter(MarketplaceItem.category == category)
+    items = search.order_by(MarketplaceItem.votes.desc(), MarketplaceItem.id.desc())\
+                  .offset(offset).limit(limit).all()
+    return [{'id': item.id, 'score': None, 'snippet': None} for item in items]
+
+
+def _search_fts5(match_query: str, category: Optional[str], limit: int, offset: int) -> List[Dict[str, Any]]:
+    wanted = offset + limit
+    window = wanted * CANDIDATE_FACTOR
+    candidates = db.session.execute(RANK_SQL, {'query': match_query, 'window': window}).all()
+
+    # Keep only public items (and the requested category) from the ranked window
+    visible = MarketplaceItem.query.with_entities(MarketplaceItem.id).join(Project)\
+                             .filter(MarketplaceItem.id.in_([row.id for row in candidates]),
+                                     Project.is_public == True, Project.is_active == True)
+    if category:
+        visible = visible.filter(MarketplaceItem.category == category)
+    visible_ids = {row.id for row in visible.all()}
+    ranked = [row for row in candidates if row.id in visible_ids]
+
+    if len(ranked) < wanted and len(candidates) == window:
+        # The window ran out before filling the page; rank with the filters applied
+        ranked = db.session.execute(RANK_FILTERED_SQL, {
+            'query': match_query,
+            'category': category,
+            'limit': limit,
+            'offset': offset
+        }).all()
+    else:
+        ranked = ranked[offset:wanted]
+
+    if not ranked:
+        return []
+
+    snippets = dict(db.session.execute(SNIPPET_SQL, {
+        'query': match_query,
+        'ids': [row.id for row in ranked]
+    }).all())
+    return [{'id': row.id, 'score': -row.score, 'snippet': highlight_snippet(snippets.get(row.id))} for row in ranked]
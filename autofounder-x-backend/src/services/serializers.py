@@ -0,0 +1,183 @@
+import functools
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from flask import current_app
+
+from src.models.user import MarketplaceItem, Project, ProjectAgent, User
+
+# An output field is a column, or a nested mapping of output names to columns
+FieldSpec = Mapping[str, Union[Any, Mapping[str, Any]]]
+
+
+class InvalidFields(ValueError):
+    """Raised when a fields= parameter names something the endpoint does not return"""
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Split a comma separated fields= parameter into dotted paths (None selects everything)"""
+    if not raw:
+        return None
+    paths = tuple(dict.fromkeys(path.strip() for path in raw.split(',') if path.strip()))
+    for path in paths:
+        if '' in path.split('.'):
+            raise InvalidFields(f"Invalid field '{path}'")
+    return paths or None
+
+
+def wants(fields: Optional[Sequence[str]], key: str) -> bool:
+    """Whether key, or anything under it, was selected"""
+    return fields is None or any(path.split('.', 1)[0] == key for path in fields)
+
+
+def nested_fields(fields: Optional[Sequence[str]], key: str) -> Optional[Tuple[str, ...]]:
+    """The paths under key with the prefix removed; None when key is selected as a whole"""
+    if fields is None or key in fields:
+        return None
+    prefix = f'{key}.'
+    return tuple(path[len(prefix):] for path in fields if path.startswith(prefix))
+
+
+def without_fields(fields: Optional[Sequence[str]], *keys: str) -> Optional[Tuple[str, ...]]:
+    """fields minus any path rooted at one of keys"""
+    if fields is None:
+        return None
+    return tuple(path for path in fields if path.split('.', 1)[0] not in keys)
+
+
+def select_paths(data: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Prune nested dicts (and lists of them) down to the dotted paths in fields.
+
+    For free-form payloads such as agent results; paths that are not present are skipped.
+    """
+    if fields is None:
+        return data
+    tree: Dict[str, Any] = {}
+    for path in fields:
+        node = tree
+        *parents, leaf = path.split('.')
+        for part in parents:
+            if node.get(part, {}) is None:
+                break  # an ancestor is already selected as a whole
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = None
+    return _prune(data, tree)
+
+
+def _prune(value: Any, tree: Dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_prune(item, tree) for item in value]
+    if not isinstance(value, Mapping):
+        return value
+    return {key: item if tree[key] is None else _prune(item, tree[key])
+            for key, item in value.items() if key in tree}
+
+
+class RowSerializer:
+    """Turns flat result rows into JSON-ready dicts shaped by a field spec.
+
+    The spec's columns are selected directly, so list endpoints skip ORM objects and
+    to_dict(); datetimes and Decimals are left for the JSON provider to encode.
+    Hidden columns are selected (for pagination cursors and follow-up queries) but
+    left out of the output.
+    """
+
+    def __init__(self, fields: FieldSpec, hidden: Mapping[str, Any] = None):
+        self.fields = fields
+        self.hidden = dict(hidden or {})
+        self.top_keys: Tuple[str, ...] = tuple(key for key, value in fields.items() if not isinstance(value, Mapping))
+        self.groups: List[Tuple[str, Tuple[str, ...], int, int]] = []
+
+        columns = [fields[key].label(key) for key in self.top_keys]
+        for key, value in fields.items():
+            if isinstance(value, Mapping):
+                start = len(columns)
+                columns.extend(column.label(f'{key}__{name}') for name, column in value.items())
+                self.groups.append((key, tuple(value), start, len(columns)))
+        columns.extend(column.label(key) for key, column in self.hidden.items())
+        self.columns = columns
+        self._top_count = len(self.top_keys)
+
+    def to_dict(self, row: Sequence[Any]) -> Dict[str, Any]:
+        result = dict(zip(self.top_keys, row[:self._top_count]))
+        for key, names, start, end in self.groups:
+            result[key] = dict(zip(names, row[start:end]))
+        return result
+
+    def to_list(self, rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+        return [self.to_dict(row) for row in rows]
+
+    def only(self, fields: Optional[Iterable[str]], required: Sequence[str] = ()) -> 'RowSerializer':
+        """A serializer selecting just fields (dotted paths reach into nested groups).
+
+        required names top-level columns the caller reads from each row; they are
+        selected even when not asked for. Raises InvalidFields for unknown paths.
+        """
+        if fields is None:
+            return self
+        return self._narrow(frozenset(fields), tuple(required))
+
+    @functools.lru_cache(maxsize=256)
+    def _narrow(self, fields: frozenset, required: Tuple[str, ...]) -> 'RowSerializer':
+        selected: Dict[str, Any] = {}
+        for path in fields:
+            key, _, name = path.partition('.')
+            value = self.fields.get(key)
+            if value is None:
+                raise InvalidFields(f"Unknown field '{path}'")
+            if not name:
+                selected[key] = None
+            elif not isinstance(value, Mapping) or name not in value:
+                raise InvalidFields(f"Unknown field '{path}'")
+            elif selected.get(key, ()) is not None:
+                selected.setdefault(key, set()).add(name)
+
+        # Keep the spec's order so narrowed output reads like the full one
+        spec = {}
+        for key, value in self.fields.items():
+            if key not in selected:
+                continue
+            names = selected[key]
+            spec[key] = value if names is None else {name: column for name, column in value.items() if name in names}
+        hidden = {key: self.fields[key] for key in required if key not in spec}
+        return RowSerializer(spec, hidden)
+
+
+def json_response(payload: Any, status: int = 200):
+    """Encode a payload straight to a bytes response with the app's JSON provider"""
+    provider = current_app.json
+    body = provider.dumps_bytes(payload) if hasattr(provider, 'dumps_bytes') else provider.dumps(payload)
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+def model_fields(model, exclude: Sequence[str] = ()) -> Dict[str, Any]:
+    """Every column of a model, keyed by attribute name"""
+    return {column.key: getattr(model, column.key)
+            for column in model.__table__.columns if column.key not in exclude}
+
+
+# Marketplace listings: the item plus its project and creator, as the list endpoints return them
+MARKETPLACE_ITEM_FIELDS = {
+    **model_fields(MarketplaceItem),
+    'project': {
+        'name': Project.name,
+        'description': Project.description,
+        'status': Project.status
+    },
+    'creator': {
+        'username': User.username,
+        'first_name': User.first_name,
+        'last_name': User.last_name
+    }
+}
+
+# A single listing carries the whole project
+MARKETPLACE_ITEM_DETAIL_FIELDS = {
+    **MARKETPLACE_ITEM_FIELDS,
+    'project': model_fields(Project)
+}
+
+marketplace_item_serializer = RowSerializer(MARKETPLACE_ITEM_FIELDS)
+marketplace_item_detail_serializer = RowSerializer(MARKETPLACE_ITEM_DETAIL_FIELDS)
+project_serializer = RowSerializer(model_fields(Project))
+project_agent_serializer = RowSerializer(model_fields(ProjectAgent))
@@ -0,0 +1,141 @@
+import hashlib
+import mimetypes
+import os
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from flask import current_app, request, send_file
+
+# Pre-built variants looked for next to each file, most preferred first
+PRECOMPRESSED_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+class StaticAsset(NamedTuple):
+    """One file of the built frontend, as found at startup"""
+    path: str
+    filename: str
+    mimetype: str
+    size: int
+    etag: str
+    last_modified: datetime
+    immutable: bool
+    # encoding -> pre-built compressed file next to the original
+    variants: Mapping[str, str]
+    # Small files are held in memory, keyed by encoding ('identity' for the original)
+    bodies: Optional[Mapping[str, bytes]]
+
+
+class StaticAssetManifest:
+    """Every file under the static folder, indexed by URL path"""
+
+    def __init__(self, root: Optional[str], immutable_dirs: Tuple[str, ...] = ('assets',),
+                 memory_max_size: int = 64 * 1024):
+        assets: Dict[str, StaticAsset] = {}
+        if root and os.path.isdir(root):
+            for directory, _, files in os.walk(root):
+                names = set(files)
+                for name in files:
+                    if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in PRECOMPRESSED_SUFFIXES):
+                        continue  # served as a variant of the original
+                    filename = os.path.join(directory, name)
+                    path = os.path.relpath(filename, root).replace(os.sep, '/')
+                    assets[path] = self._load(path, filename, names, immutable_dirs, memory_max_size)
+        self.assets: Mapping[str, StaticAsset] = MappingProxyType(assets)
+
+    @staticmethod
+    def _load(path: str, filename: str, siblings, immutable_dirs, memory_max_size: int) -> StaticAsset:
+        with open(filename, 'rb') as f:
+            data = f.read()
+        stat = os.stat(filename)
+        name = os.path.basename(filename)
+        variants = {encoding: f'{filename}{suffix}' for encoding, suffix in PRECOMPRESSED_SUFFIXES
+                    if f'{name}{suffix}' in siblings}
+
+        bodies = None
+        if len(data) <= memory_max_size:
+            bodies = {'identity': data}
+            for encoding, variant in variants.items():
+                with open(variant, 'rb') as f:
+                    bodies[encoding] = f.read()
+
+        return StaticAsset(
+            path=path,
+            filename=filename,
+            mimetype=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+            size=len(data),
+            etag=hashlib.sha1(data).hexdigest()[:20],
+            last_modified=datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            # Files in the bundler's output dirs carry a content hash in their names
+            immutable=path.split('/', 1)[0] in immutable_dirs,
+            variants=MappingProxyType(variants),
+            bodies=MappingProxyType(bodies) if bodies is not None else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path)
+
+
+class StaticAssets:
+    """Serves the built React frontend from a manifest read once at startup.
+
+    Fingerprinted files are cacheable forever, everything else revalidates by ETag,
+    pre-built .br/.gz files are sent when the client accepts them, and small files
+    such as index.html never touch the disk after startup.
+    """
+
+    def __init__(self, immutable_dirs: Tuple[str, ...] = ('assets',), memory_max_size: int = 64 * 1024):
+        self.immutable_dirs = immutable_dirs
+        self.memory_max_size = memory_max_size
+        self.root: Optional[str] = None
+        self.manifest = StaticAssetManifest(None)
+
+    def init_app(self, app):
+        self.root = app.static_folder
+        self.immutable_dirs = tuple(app.config.get('STATIC_IMMUTABLE_DIRS', self.immutable_dirs))
+        self.memory_max_size = app.config.get('STATIC_MEMORY_MAX_SIZE', self.memory_max_size)
+        app.extensions['static_assets'] = self
+        self.reload()
+
+    def reload(self):
+        """Re-scan the static folder, e.g. after deploying a new frontend build"""
+        self.manifest = StaticAssetManifest(self.root, self.immutable_dirs, self.memory_max_size)
+
+    def serve(self, path: str):
+        """Response for a frontend URL; unknown paths get index.html so client-side routes work"""
+        asset = self.manifest.get(path) if path else None
+        if asset is None:
+            asset = self.manifest.get('index.html')
+            if asset is None:
+                return "Frontend not built yet. Please build the React frontend and place it in the static folder.", 404
+
+        encoding = request.accept_encodings.best_match(tuple(asset.variants)) if asset.variants else None
+        if asset.bodies is not None:
+            response = current_app.response_class(asset.bodies[encoding or 'identity'], mimetype=asset.mimetype)
+            response.last_modified = asset.last_modified
+            # The same content in another encoding still matches If-None-Match
+            response.set_etag(asset.etag, weak=encoding is not None)
+            response.make_conditional(request)
+        else:
+            # Large files stream from disk with Range support; the manifest supplies the ETag
+            response = send_file(asset.variants[encoding] if encoding else asset.filename, mimetype=asset.mimetype,
+                                 etag=asset.etag, last_modified=asset.last_modified, max_age=None)
+            if encoding:
+                response.set_etag(asset.etag, weak=True)
+
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if asset.immutable else REVALIDATE_CACHE_CONTROL
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+
+# Global static assets instance
+static_assets = StaticAssets()
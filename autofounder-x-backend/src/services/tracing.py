@@ -0,0 +1,191 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from src.models.user import db
+
+# Run the current thread is working for; agent threads set it explicitly since threads don't inherit it
+_current_run: contextvars.ContextVar = contextvars.ContextVar('trace_run', default=None)
+
+
+class TraceRun:
+    """One traced run (e.g. a start-all) and the threads that took part in it"""
+
+    def __init__(self, run_id: str, name: str, owner: Any = None):
+        self.id = run_id
+        self.name = name
+        self.owner = owner
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.threads: Dict[int, str] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'run_id': self.id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'threads': list(self.threads.values())
+        }
+
+
+class Tracer:
+    """Span recorder for agent runs, exported as Chrome trace-event JSON.
+
+    Spans are only kept while a run is active on the thread, so code called outside a
+    run pays one context variable lookup. Spans of all runs share one bounded buffer;
+    the oldest fall off first, and only the last max_runs runs can be exported.
+    """
+
+    def __init__(self, max_spans: int = 50000, max_runs: int = 100):
+        self.enabled = True
+        self.max_runs = max_runs
+        self._spans: deque = deque(maxlen=max_spans)
+        self._runs: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('TRACE_ENABLED', self.enabled)
+        self.max_runs = app.config.get('TRACE_MAX_RUNS', self.max_runs)
+        self._spans = deque(maxlen=app.config.get('TRACE_MAX_SPANS', self._spans.maxlen))
+        app.extensions['tracer'] = self
+
+        # SQL spans show database time inside runs next to the agent work
+        with app.app_context():
+            for engine in db.engines.values():
+                # Engines of disposed apps can leave their id() to a new engine, so ask the engine itself
+                if event.contains(engine, 'before_cursor_execute', self._before_execute):
+                    continue
+                event.listen(engine, 'before_cursor_execute', self._before_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def current_run_id(self) -> Optional[str]:
+        run = _current_run.get()
+        return run.id if run is not None else None
+
+    def get_run(self, run_id: str) -> Optional[TraceRun]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def recent_runs(self, owner: Any = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            runs = list(self._runs.values())
+        return [run.to_dict() for run in reversed(runs) if owner is None or run.owner == owner]
+
+    @contextmanager
+    def run(self, name: str, owner: Any = None) -> Iterator[Optional[str]]:
+        """Start a run on this thread, or join the one already active; yields its id"""
+        if not self.enabled:
+            yield None
+            return
+        if _current_run.get() is not None:
+            with self.span(name, 'run'):
+                yield _current_run.get().id
+            return
+
+        run = TraceRun(uuid.uuid4().hex, name, owner)
+        with self._lock:
+            self._runs[run.id] = run
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        token = _current_run.set(run)
+        try:
+            with self.span(name, 'run'):
+                yield run.id
+        finally:
+            _current_run.reset(token)
+
+    @contextmanager
+    def attach(self, run_id: Optional[str]) -> Iterator[None]:
+        """Make a run started on another thread the current one on this thread"""
+        run = self.get_run(run_id) if run_id else None
+        token = _current_run.set(run)
+        try:
+            yield
+        finally:
+            _current_run.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str = 'function', **args) -> Iterator[None]:
+        """Time the block as one span of the current run"""
+        if _current_run.get() is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, started, time.perf_counter(), **args)
+
+    def add_span(self, name: str, category: str, started: float, ended: float, **args):
+        """Record a span from perf_counter() timestamps taken by the caller"""
+        run = _current_run.get()
+        if run is None:
+            return
+        thread = threading.current_thread()
+        if thread.ident not in run.threads:
+            run.threads[thread.ident] = thread.name
+        self._spans.append((run.id, {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((started - run.origin) * 1e6, 1),
+            'dur': round((ended - started) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'args': args
+        }))
+
+    def chrome_trace(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """The run's spans in Chrome trace-event format, one track per thread"""
+        run = self.get_run(run_id)
+        if run is None:
+            return None
+        spans = [span for span_run_id, span in list(self._spans) if span_run_id == run_id]
+
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': run.name}}]
+        for index, (tid, thread_name) in enumerate(list(run.threads.items())):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}})
+            events.append({'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'sort_index': index}})
+        events.extend(sorted(spans, key=lambda span: span['ts']))
+
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'run_id': run.id, 'name': run.name, 'started_at': run.started_at}
+        }
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context so a failed statement doesn't leave it on the connection
+        if context is not None and _current_run.get() is not None:
+            context._trace_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_trace_started', None)
+        if started is not None and _current_run.get() is not None:
+            self.add_span(statement.split(None, 1)[0].upper(), 'sql', started, time.perf_counter(),
+                          statement=statement[:500])
+
+
+# Global tracer instance
+tracer = Tracer()
+
+
+def traced(method, category: str = 'function'):
+    """Wrap a method so each call inside a run becomes a span named Class.method"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _current_run.get() is None:
+            return method(self, *args, **kwargs)
+        with tracer.span(f"{type(self).__name__}.{method.__name__}", category):
+            return method(self, *args, **kwargs)
+    wrapper.__traced__ = True
+    return wrapper
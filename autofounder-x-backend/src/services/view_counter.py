@@ -0,0 +1,111 @@
+import atexit
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, update
+
+from src.models.user import MarketplaceItem, db
+
+
+class ViewCounter:
+    """Coalesces marketplace item view increments and flushes them in batches"""
+
+    def __init__(self, flush_interval: float = 5.0, flush_threshold: int = 500):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.app = None
+        self._pending: Dict[int, int] = {}
+        self._pending_events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def init_app(self, app):
+        """Bind the counter to an app and start the background flusher"""
+        self.app = app
+        self.flush_interval = app.config.get('VIEW_COUNTER_FLUSH_INTERVAL', self.flush_interval)
+        self.flush_threshold = app.config.get('VIEW_COUNTER_FLUSH_THRESHOLD', self.flush_threshold)
+        app.extensions['view_counter'] = self
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='view-counter-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def increment(self, item_id: int) -> int:
+        """Record a view and return the number of views not yet flushed for the item"""
+        with self._lock:
+            pending = self._pending.get(item_id, 0) + 1
+            self._pending[item_id] = pending
+            self._pending_events += 1
+            should_flush = self._pending_events >= self.flush_threshold
+
+        if should_flush:
+            self._wakeup.set()
+        return pending
+
+    def pending(self, item_id: int) -> int:
+        """Get the number of views recorded for an item but not yet flushed"""
+        with self._lock:
+            return self._pending.get(item_id, 0)
+
+    def flush(self) -> int:
+        """Write all pending view counts in a single UPDATE, returning the rows touched"""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+                self._pending_events = 0
+
+            if not batch:
+                return 0
+
+            statement = (
+                update(MarketplaceItem)
+                .where(MarketplaceItem.id.in_(list(batch.keys())))
+                .values(views=func.coalesce(MarketplaceItem.views, 0) + case(batch, value=MarketplaceItem.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(statement)
+            except Exception:
+                # Put the counts back so they are retried on the next flush
+                with self._lock:
+                    for item_id, count in batch.items():
+                        self._pending[item_id] = self._pending.get(item_id, 0) + count
+                        self._pending_events += count
+                raise
+
+            return len(batch)
+
+    def shutdown(self):
+        """Stop the background flusher and write out anything still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval)
+        if self.app is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ViewCounter] ERROR: Failed to flush views on shutdown: {str(e)}")
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ViewCounter] ERROR: Failed to flush views: {str(e)}")
+
+
+# Global view counter instance
+view_counter = ViewCounter()
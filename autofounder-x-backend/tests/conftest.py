@@ -0,0 +1,138 @@
+import os
+import sys
+import uuid
+
+import pytest
+
+# Make `src` importable when run as `python -m pytest tests/`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from src.app import create_app
+from src.models.user import db
+from src.services.agent_catalog import agent_catalog
+from src.services.database import normalize_database_url
+from src.services.leaderboard import leaderboard
+from src.services.view_counter import view_counter
+
+PASSWORD = 'Password1'
+
+# Point DATABASE_URL at a PostgreSQL server (e.g. docker-compose.postgres.yml) to run the
+# tests using postgres_app against it too; each test gets a throwaway schema there
+POSTGRES_URL = normalize_database_url(os.environ.get('DATABASE_URL', ''))
+
+# Test settings layered over default_config() of src/app.py
+TEST_CONFIG = {
+    'SECRET_KEY': 'test-secret-key',
+    'JWT_SECRET_KEY': 'test-jwt-secret-key',
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',  # fast hashes, inline
+    'PASSWORD_HASH_WORKERS': 0,
+    'ARCHIVE_INTERVAL': 0,  # tests run sweeps themselves
+    'LEADERBOARD_PERSIST_INTERVAL': 0,
+    'VIEW_COUNTER_FLUSH_INTERVAL': 3600.0,  # tests flush themselves
+    'TOKEN_REVOCATION_SYNC_INTERVAL': 0,  # tests sync themselves
+    'SLOW_QUERY_THRESHOLD': -1
+}
+
+
+def create_test_app(database_uri: str, engine_options: dict = None, **config) -> Flask:
+    """Build the app of src/app.py pointed at a scratch database"""
+    return create_app({**TEST_CONFIG, 'SQLALCHEMY_DATABASE_URI': database_uri,
+                       'SQLALCHEMY_ENGINE_OPTIONS': engine_options or {}, **config})
+
+
+def dispose_test_app(app: Flask):
+    """Drop everything the process-wide services still hold for an app"""
+    with app.app_context():
+        view_counter.flush()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    leaderboard.invalidate()
+    agent_catalog.invalidate()
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Factory for apps on their own SQLite file, torn down after the test"""
+    apps = []
+
+    def make(**config) -> Flask:
+        app = create_test_app(f"sqlite:///{tmp_path / f'app{len(apps)}.db'}", **config)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        dispose_test_app(app)
+
+
+@pytest.fixture
+def postgres_app():
+    """An app on the PostgreSQL server in DATABASE_URL, in a schema dropped afterwards"""
+    if not POSTGRES_URL.startswith('postgresql'):
+        pytest.skip('DATABASE_URL does not point at a PostgreSQL server')
+
+    schema = f'test_{uuid.uuid4().hex[:12]}'
+    engine = create_engine(POSTGRES_URL)
+    with engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA {schema}'))
+    try:
+        app = create_test_app(POSTGRES_URL, engine_options={'connect_args': {'options': f'-csearch_path={schema}'}})
+        yield app
+        dispose_test_app(app)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA {schema} CASCADE'))
+        engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user through the API and return its id, token and auth headers"""
+    def register_user(username: str, password: str = PASSWORD):
+        response = client.post('/api/auth/register', json={
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': password
+        })
+        assert response.status_code == 201, response.get_json()
+        data = response.get_json()
+        return {
+            'id': data['user_id'],
+            'token': data['token'],
+            'headers': {'Authorization': f"Bearer {data['token']}"}
+        }
+    return register_user
+
+
+@pytest.fixture
+def create_project(client):
+    """Create a project through the API and return its dict"""
+    def create(headers, name: str = 'Test project', **fields):
+        response = client.post('/api/projects', json={'name': name, **fields}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['project']
+    return create
+
+
+@pytest.fixture
+def publish(client):
+    """Publish a project to the marketplace and return the item dict"""
+    def publish_project(headers, project_id: int, **fields):
+        response = client.post('/api/marketplace/publish', json={'project_id': project_id, **fields},
+                               headers=headers)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['item']
+    return publish_project
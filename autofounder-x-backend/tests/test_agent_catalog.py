@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import update
+
+from src.models.user import Agent, db
+from src.services.agent_catalog import agent_catalog
+
+
+@pytest.fixture
+def user(register):
+    return register('user')
+
+
+def rename_agent(app, agent_type, name):
+    with app.app_context():
+        db.session.execute(update(Agent).where(Agent.type == agent_type).values(name=name))
+        db.session.commit()
+
+
+def test_lookups_by_type_and_id(app):
+    with app.app_context():
+        catalog = agent_catalog.get()
+        assert len(catalog) == 14
+        ideation = agent_catalog.by_type('ideation')
+        assert ideation.name == 'Ideation Agent'
+        assert agent_catalog.by_id(ideation.id) == ideation
+        assert agent_catalog.by_type('nope') is None
+
+
+def test_agents_endpoint_revalidates_by_version(client, user):
+    response = client.get('/api/agents', headers=user['headers'])
+    assert response.status_code == 200
+    assert len(response.get_json()['agents']) == 14
+    assert response.headers['ETag'] == f'"{response.get_json()["version"]}"'
+    assert 'max-age=3600' in response.headers['Cache-Control']
+
+    headers = {**user['headers'], 'If-None-Match': response.headers['ETag']}
+    assert client.get('/api/agents', headers=headers).status_code == 304
+
+
+def test_catalog_refreshes_after_the_interval(make_app, register):
+    app = make_app(AGENT_CATALOG_REFRESH_INTERVAL=3600)
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'user', 'email': 'user@example.com', 'password': 'Password1'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+    version = client.get('/api/agents', headers=headers).get_json()['version']
+
+    rename_agent(app, 'legal', 'Counsel Agent')
+    # Within the interval the snapshot is kept
+    assert client.get('/api/agents', headers=headers).get_json()['version'] == version
+
+    agent_catalog.invalidate()
+    refreshed = client.get('/api/agents', headers=headers).get_json()
+    assert refreshed['version'] != version
+    assert 'Counsel Agent' in [agent['name'] for agent in refreshed['agents']]
+
+
+def test_catalog_changes_invalidate_project_views(app, client, user, create_project):
+    project = create_project(user['headers'], selected_agents=['legal'])
+    url = f"/api/projects/{project['id']}"
+    assert client.get(url, headers=user['headers']).headers['X-Cache'] == 'MISS'
+    assert client.get(url, headers=user['headers']).headers['X-Cache'] == 'HIT'
+
+    rename_agent(app, 'legal', 'Counsel Agent')
+    agent_catalog.invalidate()
+    response = client.get(url, headers=user['headers'])
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['project']['agents'][0]['agent']['name'] == 'Counsel Agent'
+
+
+def test_failed_refresh_keeps_the_current_snapshot(app, monkeypatch):
+    with app.app_context():
+        version = agent_catalog.version
+
+        def broken_refresh():
+            raise RuntimeError('database is gone')
+
+        monkeypatch.setattr(agent_catalog, '_refresh', broken_refresh)
+        agent_catalog.invalidate()
+        assert agent_catalog.version == version
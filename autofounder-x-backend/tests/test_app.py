@@ -0,0 +1,44 @@
+import os
+
+from src.app import STATIC_FOLDER, default_config
+from src.models.user import User, db
+
+SERVICES = ('agent_catalog', 'json_provider', 'leaderboard', 'password_hasher', 'project_archiver',
+            'query_profiler', 'replica_router', 'request_metrics', 'response_cache', 'response_compressor',
+            'static_assets', 'token_revocation', 'tracer', 'user_cache', 'view_counter')
+
+
+def test_every_service_is_wired(app):
+    assert set(SERVICES) <= set(app.extensions)
+    assert app.static_folder == STATIC_FOLDER
+    # Settings not overridden keep the production defaults
+    assert app.config['COMPRESSION_MIN_SIZE'] == default_config()['COMPRESSION_MIN_SIZE']
+
+
+def test_scratch_database_leaves_the_app_database_alone(make_app, tmp_path):
+    app_db = default_config()['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '', 1)
+    before = os.stat(app_db).st_mtime_ns if os.path.exists(app_db) else None
+
+    app = make_app()
+    with app.app_context():
+        assert os.path.dirname(db.engine.url.database) == str(tmp_path)
+    assert app.test_client().get('/api/health').status_code == 200
+    assert (os.stat(app_db).st_mtime_ns if os.path.exists(app_db) else None) == before
+
+
+def test_routes_outside_the_blueprints(client):
+    assert client.get('/api/health').get_json()['status'] == 'healthy'
+    assert '/api/metrics' in client.get('/api/info').get_json()['endpoints'].values()
+    response = client.get('/dashboard/projects')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+
+
+def test_tokens_of_inactive_users_are_rejected(app, client, register):
+    user = register('alice')
+    with app.app_context():
+        db.session.get(User, user['id']).is_active = False
+        db.session.commit()
+    response = client.get('/api/auth/profile', headers=user['headers'])
+    assert response.status_code == 401
+    assert response.get_json()['msg'] == 'Account is inactive or no longer exists'
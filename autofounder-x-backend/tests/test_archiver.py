@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, insert, select, text
+
+from src.models.archive import agent_tasks_archive, project_agents_archive, projects_archive
+from src.models.user import AgentTask, Project, ProjectAgent, db
+from src.services.archiver import project_archiver
+from src.services.database import add_missing_columns, create_missing_indexes
+
+
+def later():
+    return datetime.utcnow() + timedelta(days=1)
+
+
+def add_task(app, project_id, name):
+    with app.app_context():
+        agent_id = db.session.execute(select(ProjectAgent.id).where(ProjectAgent.project_id == project_id)).scalars().first()
+        task = AgentTask(project_agent_id=agent_id, task_name=name)
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+
+def count(app, table, **filters):
+    with app.app_context():
+        query = select(table.c.id).where(*[table.c[name] == value for name, value in filters.items()])
+        return len(db.session.execute(query).all())
+
+
+def test_archive_and_restore_round_trip(app, client, register, create_project):
+    user = register('alice')
+    headers = user['headers']
+    projects = [create_project(headers, f'Project {i}', selected_agents=['ideation', 'legal']) for i in range(2)]
+    # The newest project owns the newest row of every table and is archived all the same
+    tasks = [add_task(app, project['id'], f'Task {i}') for i, project in enumerate(projects)]
+    for project in projects:
+        assert client.delete(f"/api/projects/{project['id']}", headers=headers).status_code == 200
+
+    with app.app_context():
+        assert project_archiver.archive_inactive(older_than=later()) == 2
+    assert count(app, Project.__table__) == 0
+    assert count(app, ProjectAgent.__table__) == 0
+    assert count(app, AgentTask.__table__) == 0
+    assert count(app, projects_archive) == 2
+    assert count(app, project_agents_archive) == 4
+    assert count(app, agent_tasks_archive) == 2
+
+    # Archived ids are not handed out again
+    fresh = create_project(headers, 'Fresh', selected_agents=['design'])
+    assert fresh['id'] > projects[-1]['id']
+
+    project_id = projects[-1]['id']
+    response = client.post(f'/api/projects/{project_id}/restore', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['project']['id'] == project_id
+    project = client.get(f'/api/projects/{project_id}', headers=headers).get_json()['project']
+    assert [agent['agent']['type'] for agent in project['agents']] == ['ideation', 'legal']
+    with app.app_context():
+        assert db.session.get(AgentTask, tasks[-1]).task_name == 'Task 1'
+    assert count(app, projects_archive) == 1
+    assert count(app, project_agents_archive) == 2
+    assert count(app, agent_tasks_archive) == 1
+
+
+def test_restore_is_limited_to_the_owner(app, client, register, create_project):
+    owner = register('bob')
+    other = register('carol')
+    project = create_project(owner['headers'])
+    client.delete(f"/api/projects/{project['id']}", headers=owner['headers'])
+    with app.app_context():
+        project_archiver.archive_inactive(older_than=later())
+
+    assert client.post(f"/api/projects/{project['id']}/restore", headers=other['headers']).status_code == 404
+    assert count(app, projects_archive) == 1
+
+
+def test_referenced_projects_stay_hot(app, client, register, create_project, publish):
+    user = register('dave')
+    headers = user['headers']
+    listed = create_project(headers, 'Listed')
+    publish(headers, listed['id'])
+    entered = create_project(headers, 'Entered')
+    competition = client.get('/api/battle-arena/competitions').get_json()['competitions'][0]
+    client.post('/api/battle-arena/enter', json={'competition_id': competition['id'], 'project_id': entered['id']},
+                headers=headers)
+    deleted = create_project(headers, 'Deleted')
+    for project in (listed, entered, deleted):
+        client.delete(f"/api/projects/{project['id']}", headers=headers)
+
+    with app.app_context():
+        assert project_archiver.archive_inactive(older_than=later()) == 1
+        assert project_archiver.archive_inactive(older_than=datetime.utcnow() - timedelta(days=1)) == 0
+    assert count(app, projects_archive, id=deleted['id']) == 1
+
+
+def test_restore_assigns_new_ids_when_taken(app, client, register, create_project):
+    user = register('erin')
+    headers = user['headers']
+    project = create_project(headers, 'Archived', selected_agents=['ideation', 'legal'])
+    task_id = add_task(app, project['id'], 'Kept task')
+    client.delete(f"/api/projects/{project['id']}", headers=headers)
+
+    with app.app_context():
+        project_archiver.archive_inactive(older_than=later())
+        agent_ids = db.session.execute(select(project_agents_archive.c.id)).scalars().all()
+        # What a table created before AUTOINCREMENT does: the archived ids are handed out again
+        db.session.execute(insert(Project).values(id=project['id'], user_id=user['id'], name='Squatter'))
+        db.session.execute(insert(ProjectAgent).values(id=agent_ids[0], project_id=project['id'], agent_id=1))
+        db.session.execute(insert(AgentTask).values(id=task_id, project_agent_id=agent_ids[0], task_name='Other'))
+        db.session.commit()
+
+    response = client.post(f"/api/projects/{project['id']}/restore", headers=headers)
+    assert response.status_code == 200
+    restored = response.get_json()['project']
+    assert restored['id'] != project['id']
+    assert restored['name'] == 'Archived'
+
+    with app.app_context():
+        agents = db.session.execute(select(ProjectAgent).where(ProjectAgent.project_id == restored['id'])).scalars().all()
+        assert len(agents) == 2
+        assert agent_ids[0] not in [agent.id for agent in agents]
+        assert agent_ids[1] in [agent.id for agent in agents]
+        task = db.session.execute(select(AgentTask).where(AgentTask.task_name == 'Kept task')).scalar_one()
+        assert task.id != task_id
+        assert task.project_agent_id in [agent.id for agent in agents]
+        # The rows that took the ids are untouched
+        assert db.session.get(Project, project['id']).name == 'Squatter'
+        assert db.session.get(AgentTask, task_id).task_name == 'Other'
+    assert count(app, projects_archive) == 0
+    assert count(app, project_agents_archive) == 0
+    assert count(app, agent_tasks_archive) == 0
+
+
+def test_add_missing_columns(app, register, create_project):
+    user = register('frank')
+    project = create_project(user['headers'])
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text('DROP INDEX ix_projects_active_user_created_id'))
+            connection.execute(text('DROP INDEX ix_projects_inactive_updated'))
+            connection.execute(text('ALTER TABLE projects DROP COLUMN is_active'))
+            connection.execute(text('ALTER TABLE projects DROP COLUMN battle_arena_score'))
+
+        # As on the next start, with no connection holding the old schema
+        db.engine.dispose()
+        add_missing_columns()
+        create_missing_indexes()
+
+        columns = {column['name']: column for column in inspect(db.engine).get_columns('projects')}
+        assert not columns['is_active']['nullable']
+        assert columns['battle_arena_score']['nullable']
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('projects')}
+        assert {'ix_projects_active_user_created_id', 'ix_projects_inactive_updated'} <= indexes
+        # Existing rows take the server default
+        assert db.session.get(Project, project['id']).is_active is True
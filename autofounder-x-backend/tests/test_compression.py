@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import pytest
+
+from src.services.compression import ResponseCompressor, content_etag, response_compressor
+
+GZIP = {'Accept-Encoding': 'gzip'}
+IDENTITY = {'Accept-Encoding': 'identity'}
+
+
+@pytest.fixture
+def listing(register, create_project, publish):
+    owner = register('alice')
+    voter = register('bob')
+    for i in range(4):
+        project = create_project(owner['headers'], f'Project {i}', description='A fairly long description ' * 4)
+        item = publish(owner['headers'], project['id'])
+    return voter, item
+
+
+def test_gzip_by_accept_encoding(client, listing):
+    plain = client.get('/api/marketplace/items', headers=IDENTITY)
+    packed = client.get('/api/marketplace/items', headers=GZIP)
+    assert len(plain.data) >= response_compressor.min_size
+
+    assert 'Content-Encoding' not in plain.headers
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in plain.vary and 'Accept-Encoding' in packed.vary
+    assert json.loads(gzip.decompress(packed.data)) == plain.get_json()
+
+    # Both carry the content hash of the uncompressed body; the encoded one is weak
+    assert plain.get_etag() == (content_etag(plain.data), False)
+    assert packed.get_etag() == (content_etag(plain.data), True)
+
+
+def test_if_none_match_across_encodings(client, listing):
+    voter, item = listing
+    etag = client.get('/api/marketplace/items', headers=GZIP).headers['ETag']
+
+    for headers in (GZIP, IDENTITY):
+        response = client.get('/api/marketplace/items', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    # A write changes the body and so the ETag
+    client.post('/api/marketplace/vote', json={'item_id': item['id']}, headers=voter['headers'])
+    response = client.get('/api/marketplace/items', headers={**GZIP, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_cached_responses_are_conditional(client, listing):
+    first = client.get('/api/marketplace/items', headers=GZIP)
+    response = client.get('/api/marketplace/items', headers={**GZIP, 'If-None-Match': first.headers['ETag']})
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.status_code == 304
+
+
+def test_small_and_unsafe_responses(client, listing):
+    voter, item = listing
+    small = client.get('/api/marketplace/categories', headers=GZIP)
+    assert len(small.data) < response_compressor.min_size
+    assert 'Content-Encoding' not in small.headers
+    assert small.headers['ETag']
+
+    vote = client.post('/api/marketplace/vote', json={'item_id': item['id']}, headers={**voter['headers'], **GZIP})
+    assert 'ETag' not in vote.headers
+
+    missing = client.get('/api/marketplace/items/999', headers=GZIP)
+    assert missing.status_code == 404
+    assert 'ETag' not in missing.headers
+
+
+def test_disabled(client, listing, monkeypatch):
+    monkeypatch.setattr(response_compressor, 'enabled', False)
+    response = client.get('/api/marketplace/items', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+    assert 'ETag' not in response.headers
+
+
+def test_store_reuses_and_bounds_encoded_bodies():
+    compressor = ResponseCompressor(max_stored_bytes=200)
+    body = b'{"items": []}' * 100
+    first = compressor.compress(body, 'gzip')
+    assert compressor.compress(body, 'gzip') is first
+    assert gzip.decompress(first) == body
+
+    for i in range(20):
+        compressor.compress(str(i).encode() * 500, 'gzip')
+    assert compressor._stored_bytes <= 200
+    assert compressor.compress(body, 'gzip') is not first
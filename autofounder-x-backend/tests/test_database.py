@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+
+from src.models.user import db
+from src.services.database import get_engine_options, get_sqlite_pragmas, normalize_database_url
+
+
+def pragma(app, name):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            return connection.execute(text(f'PRAGMA {name}')).scalar()
+
+
+def test_performance_profile_is_applied_to_every_connection(app):
+    assert pragma(app, 'journal_mode') == 'wal'
+    assert pragma(app, 'synchronous') == 1  # NORMAL
+    assert pragma(app, 'busy_timeout') == 5000
+    assert pragma(app, 'temp_store') == 2  # MEMORY
+
+
+def test_default_profile_with_overrides(make_app):
+    app = make_app(SQLITE_PROFILE='default', SQLITE_PRAGMAS={'busy_timeout': 1234})
+    assert pragma(app, 'journal_mode') == 'delete'
+    assert pragma(app, 'busy_timeout') == 1234
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        get_sqlite_pragmas({'SQLITE_PROFILE': 'turbo'})
+
+
+def test_pool_options_only_for_server_databases():
+    config = {'DB_POOL_SIZE': 5}
+    assert get_engine_options(config, 'sqlite:///app.db') == {}
+    options = get_engine_options(config, 'postgresql://user@localhost/app')
+    assert options['pool_size'] == 5
+    assert options['pool_pre_ping'] is True
+
+
+def test_legacy_postgres_scheme_is_normalized():
+    assert normalize_database_url('postgres://u:p@host/db') == 'postgresql://u:p@host/db'
+    assert normalize_database_url('sqlite:///app.db') == 'sqlite:///app.db'
@@ -0,0 +1,85 @@
+import pytest
+
+from src.agents.agent_manager import agent_manager
+from src.services.serializers import InvalidFields, parse_fields, select_paths
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(' , ') is None
+    assert parse_fields('name, project.name,name') == ('name', 'project.name')
+    with pytest.raises(InvalidFields):
+        parse_fields('project.')
+
+
+def test_select_paths():
+    data = {'a': 1, 'b': {'c': 2, 'd': [{'e': 3, 'f': 4}]}, 'g': 5}
+    assert select_paths(data, None) is data
+    assert select_paths(data, ('a', 'b.d.e')) == {'a': 1, 'b': {'d': [{'e': 3}]}}
+    # A whole selection wins over a narrower one, and missing paths are skipped
+    assert select_paths(data, ('b', 'b.c', 'missing.x')) == {'b': data['b']}
+
+
+@pytest.fixture
+def listing(register, create_project, publish):
+    owner = register('alice')
+    project = create_project(owner['headers'], 'Clinic scheduler', selected_agents=['ideation', 'legal'])
+    item = publish(owner['headers'], project['id'], title='Scheduler', category='SaaS Tools')
+    return owner, project, item
+
+
+def test_project_fields(client, listing):
+    owner, project, _ = listing
+    headers = owner['headers']
+
+    projects = client.get('/api/projects', query_string={'fields': 'name,agents_status'},
+                          headers=headers).get_json()['projects']
+    assert projects == [{'name': 'Clinic scheduler', 'agents_status': {'ideation': 'idle', 'legal': 'idle'}}]
+    projects = client.get('/api/projects', query_string={'fields': 'id'}, headers=headers).get_json()['projects']
+    assert projects == [{'id': project['id']}]
+
+    detail = client.get(f"/api/projects/{project['id']}", query_string={'fields': 'name,agents.agent.type'},
+                        headers=headers).get_json()['project']
+    assert detail == {'name': 'Clinic scheduler', 'agents': [{'agent': {'type': 'ideation'}}, {'agent': {'type': 'legal'}}]}
+
+    agents = client.get(f"/api/projects/{project['id']}/agents", headers=headers).get_json()['agents']
+    assert len(agents) == 2
+
+    for path in ('nope', 'agents.nope', 'name.first'):
+        response = client.get(f"/api/projects/{project['id']}", query_string={'fields': path}, headers=headers)
+        assert response.status_code == 400
+    assert client.get('/api/projects', query_string={'fields': 'nope'}, headers=headers).status_code == 400
+
+
+def test_marketplace_fields(client, listing):
+    _, project, item = listing
+
+    items = client.get('/api/marketplace/items', query_string={'fields': 'title,project.name'}).get_json()
+    assert items['items'] == [{'title': 'Scheduler', 'project': {'name': 'Clinic scheduler'}}]
+    # The sort keys are selected for the cursor but not returned
+    items = client.get('/api/marketplace/items', query_string={'fields': 'title', 'sort': 'votes', 'limit': 1}).get_json()
+    assert items['items'] == [{'title': 'Scheduler'}]
+
+    detail = client.get(f"/api/marketplace/items/{item['id']}", query_string={'fields': 'views,project.id'}).get_json()
+    assert detail['item'] == {'views': 1, 'project': {'id': project['id']}}
+
+    hits = client.get('/api/marketplace/search', query_string={'q': 'clinic', 'fields': 'id,score'}).get_json()['items']
+    assert [set(hit) for hit in hits] == [{'id', 'score'}]
+
+    for url in ('/api/marketplace/items', f"/api/marketplace/items/{item['id']}"):
+        assert client.get(url, query_string={'fields': 'creator.password_hash'}).status_code == 400
+
+
+def test_agent_result_fields(client, register, monkeypatch):
+    headers = register('bob')['headers']
+    monkeypatch.setitem(agent_manager.agent_results, 'ideation', {'market_size': '1B', 'ideas': [{'name': 'A', 'score': 9}]})
+
+    result = client.get('/api/agents/ideation/results', query_string={'fields': 'results.ideas.name'},
+                        headers=headers).get_json()
+    assert result == {'success': True, 'results': {'ideas': [{'name': 'A'}]}}
+
+    results = client.get('/api/agents/results', query_string={'fields': 'status,results.market_size'},
+                         headers=headers).get_json()['results']
+    assert results['ideation'] == {'status': agent_manager.agent_status['ideation'].value,
+                                   'results': {'market_size': '1B'}}
+    assert client.get('/api/agents/results', query_string={'fields': 'a..b'}, headers=headers).status_code == 400
@@ -0,0 +1,95 @@
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from src.models.user import MarketplaceItem, Project, User, db
+from src.services.json_provider import orjson
+
+ENCODERS = ['json', 'orjson'] if orjson is not None else ['json']
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+@pytest.mark.parametrize('encoder', ENCODERS)
+def test_encoders_agree_on_extended_types(make_app, encoder):
+    app = make_app(JSON_ENCODER=encoder)
+    assert app.json.encoder == encoder
+    payload = {
+        'when': datetime(2024, 5, 1, 12, 30, 15, 250000),
+        'day': date(2024, 5, 1),
+        'price': decimal.Decimal('19.99'),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'point': Point(1, 2),
+        'tags': {'saas'},
+        'name': 'Café'
+    }
+
+    body = app.json.dumps_bytes(payload)
+    assert json.loads(body) == {
+        'when': '2024-05-01T12:30:15.250000',
+        'day': '2024-05-01',
+        'price': 19.99,
+        'id': '12345678-1234-5678-1234-567812345678',
+        'point': {'x': 1, 'y': 2},
+        'tags': ['saas'],
+        'name': 'Café'
+    }
+    # Compact, insertion-ordered and not ASCII-escaped
+    assert body.startswith(b'{"when":')
+    assert 'Café'.encode('utf-8') in body
+    assert app.json.loads(body) == json.loads(body)
+
+    with pytest.raises(TypeError):
+        app.json.dumps_bytes({'bad': object()})
+
+
+@pytest.mark.parametrize('encoder', ENCODERS)
+def test_debug_output_is_indented(make_app, encoder):
+    app = make_app(JSON_ENCODER=encoder)
+    app.debug = True
+    assert app.json.dumps_bytes({'a': 1}) == b'{\n  "a": 1\n}'
+
+
+def test_unknown_encoder_falls_back_to_json(make_app):
+    assert make_app(JSON_ENCODER='simplejson').json.encoder == 'json'
+
+
+def test_jsonify_uses_the_provider(app):
+    with app.test_request_context():
+        response = app.json.response({'at': datetime(2024, 1, 2, 3, 4, 5)})
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {'at': '2024-01-02T03:04:05'}
+
+
+def test_list_rows_match_model_to_dict(app, client, register, create_project, publish):
+    owner = register('alice')
+    project = create_project(owner['headers'], 'Clinic scheduler', description='Cuts no-shows', budget_range='10k-25k')
+    item = publish(owner['headers'], project['id'], category='SaaS Tools', price=49.5)
+
+    listed = client.get('/api/projects', headers=owner['headers']).get_json()['projects'][0]
+    detail = client.get(f"/api/projects/{project['id']}", headers=owner['headers']).get_json()['project']
+    items = client.get('/api/marketplace/items').get_json()['items']
+
+    with app.app_context():
+        stored = db.session.get(Project, project['id'])
+        user = db.session.get(User, owner['id'])
+        expected_project = stored.to_dict()
+        # The legacy listing built these from to_dict() plus a lookup per item
+        expected_item = {
+            **db.session.get(MarketplaceItem, item['id']).to_dict(),
+            'project': {'name': stored.name, 'description': stored.description, 'status': stored.status},
+            'creator': {'username': user.username, 'first_name': user.first_name, 'last_name': user.last_name}
+        }
+
+    assert {key: value for key, value in listed.items() if key != 'agents_status'} == expected_project
+    assert {key: value for key, value in detail.items() if key != 'agents'} == expected_project
+    assert items == [expected_item]
+    assert items[0]['price'] == 49.5
@@ -0,0 +1,178 @@
+import random
+import threading
+import time
+
+import pytest
+from sqlalchemy import update
+
+from src.models.user import CompetitionEntry, db
+from src.services.leaderboard import CompetitionLeaderboard, leaderboard
+
+
+def expected_order(votes):
+    """Entry ids by votes descending, ties by id"""
+    return sorted(votes, key=lambda entry_id: (-votes[entry_id], entry_id))
+
+
+def test_board_matches_a_full_sort():
+    rng = random.Random(7)
+    votes = {entry_id: rng.randint(0, 5) for entry_id in range(1, 201)}
+    board = CompetitionLeaderboard(votes.items())
+
+    for _ in range(500):
+        entry_id = rng.choice(list(votes))
+        votes[entry_id] += 1
+        board.set_votes(entry_id, votes[entry_id])
+
+    order = expected_order(votes)
+    assert [entry_id for _, entry_id, _ in board.page(0, len(order))] == order
+    assert all(board.rank(entry_id) == index + 1 for index, entry_id in enumerate(order))
+    assert board.page(195, 10) == [(index + 1, entry_id, votes[entry_id])
+                                   for index, entry_id in enumerate(order) if index >= 195]
+    assert board.rank(999) is None
+
+
+@pytest.fixture
+def arena(client, register, create_project):
+    """Six entries in the active competition and a voter"""
+    owner = register('owner')
+    competition_id = client.get('/api/battle-arena/competitions').get_json()['competitions'][0]['id']
+    entry_ids = []
+    for i in range(6):
+        project = create_project(owner['headers'], f'Entry {i}')
+        response = client.post('/api/battle-arena/enter', json={
+            'competition_id': competition_id,
+            'project_id': project['id']
+        }, headers=owner['headers'])
+        assert response.get_json()['entry']['ranking'] == i + 1
+        entry_ids.append(response.get_json()['entry']['id'])
+    return {'competition_id': competition_id, 'entry_ids': entry_ids, 'voter': register('voter')}
+
+
+def stored_rankings(app, entry_ids):
+    with app.app_context():
+        return {entry_id: db.session.get(CompetitionEntry, entry_id).ranking for entry_id in entry_ids}
+
+
+def test_votes_and_ranks_stay_consistent(client, arena):
+    rng = random.Random(3)
+    votes = {entry_id: 0 for entry_id in arena['entry_ids']}
+    for _ in range(30):
+        entry_id = rng.choice(arena['entry_ids'])
+        response = client.post('/api/battle-arena/vote', json={'entry_id': entry_id},
+                               headers=arena['voter']['headers'])
+        votes[entry_id] += 1
+        order = expected_order(votes)
+        assert response.get_json()['votes'] == votes[entry_id]
+        assert response.get_json()['ranking'] == order.index(entry_id) + 1
+
+        rank = client.get(f'/api/battle-arena/entries/{entry_id}/rank').get_json()
+        assert (rank['ranking'], rank['votes']) == (order.index(entry_id) + 1, votes[entry_id])
+
+    board = client.get(f"/api/battle-arena/leaderboard/{arena['competition_id']}").get_json()
+    assert [(entry['id'], entry['ranking'], entry['votes']) for entry in board['leaderboard']] == [
+        (entry_id, index + 1, votes[entry_id]) for index, entry_id in enumerate(expected_order(votes))
+    ]
+    page = client.get(f"/api/battle-arena/leaderboard/{arena['competition_id']}?offset=2&limit=2").get_json()
+    assert [entry['ranking'] for entry in page['leaderboard']] == [3, 4]
+    assert page['total_entries'] == 6
+
+
+def test_a_vote_writes_only_the_voted_entry(app, client, arena):
+    before = stored_rankings(app, arena['entry_ids'])
+    last = arena['entry_ids'][-1]
+    response = client.post('/api/battle-arena/vote', json={'entry_id': last}, headers=arena['voter']['headers'])
+    assert response.get_json()['ranking'] == 1
+
+    # Stored rankings catch up in the persistence job, not in the request
+    assert stored_rankings(app, arena['entry_ids']) == before
+    with app.app_context():
+        assert leaderboard.persist_rankings() == 6
+        assert leaderboard.persist_rankings() == 0
+    assert stored_rankings(app, arena['entry_ids']) == {
+        entry_id: rank for rank, entry_id in enumerate([last] + arena['entry_ids'][:-1], start=1)
+    }
+
+
+def test_reads_never_repair_stored_rankings(app, client, arena):
+    first = arena['entry_ids'][0]
+    with app.app_context():
+        db.session.execute(update(CompetitionEntry).where(CompetitionEntry.id == first).values(ranking=99))
+        db.session.commit()
+    leaderboard.invalidate()
+
+    assert client.get(f"/api/battle-arena/leaderboard/{arena['competition_id']}").status_code == 200
+    assert client.get(f'/api/battle-arena/entries/{first}/rank').get_json()['ranking'] == 1
+    assert stored_rankings(app, [first]) == {first: 99}
+
+    with app.app_context():
+        assert leaderboard.persist_rankings() == 1
+    assert stored_rankings(app, [first]) == {first: 1}
+
+
+def test_votes_from_another_worker_reload_the_board(app, client, arena):
+    first, second = arena['entry_ids'][:2]
+    client.get(f'/api/battle-arena/entries/{first}/rank')  # load the board
+
+    # Another worker gives the second entry three votes
+    with app.app_context():
+        db.session.execute(update(CompetitionEntry).where(CompetitionEntry.id == second).values(votes=3))
+        db.session.commit()
+
+    response = client.post('/api/battle-arena/vote', json={'entry_id': second}, headers=arena['voter']['headers'])
+    assert response.get_json()['votes'] == 4
+    assert response.get_json()['ranking'] == 1
+    assert client.get(f'/api/battle-arena/entries/{first}/rank').get_json()['ranking'] == 2
+
+
+def test_concurrent_votes_are_all_counted(app, arena):
+    entry_id = arena['entry_ids'][0]
+    headers = arena['voter']['headers']
+    statuses = []
+
+    def vote_five_times():
+        client = app.test_client()
+        for _ in range(5):
+            statuses.append(client.post('/api/battle-arena/vote', json={'entry_id': entry_id}, headers=headers).status_code)
+
+    threads = [threading.Thread(target=vote_five_times) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 30
+    with app.app_context():
+        assert db.session.get(CompetitionEntry, entry_id).votes == 30
+    assert leaderboard.get(arena['competition_id']).votes(entry_id) == 30
+
+
+def test_a_slow_board_load_does_not_block_other_competitions(app, arena, monkeypatch):
+    slow_id, other_id = arena['competition_id'], arena['competition_id'] + 1
+    leaderboard.invalidate()
+    release = threading.Event()
+    read_board = leaderboard._read_board
+
+    def slow_read_board(competition_id):
+        if competition_id == slow_id:
+            release.wait(5)
+        return read_board(competition_id)
+
+    monkeypatch.setattr(leaderboard, '_read_board', slow_read_board)
+
+    def load_slow_board():
+        with app.app_context():
+            leaderboard.get(slow_id)
+
+    thread = threading.Thread(target=load_slow_board)
+    thread.start()
+    try:
+        started = time.monotonic()
+        with app.app_context():
+            leaderboard.get(other_id)
+        assert time.monotonic() - started < 1
+        assert thread.is_alive()
+    finally:
+        release.set()
+        thread.join()
+    assert len(leaderboard.get(slow_id)) == 6
@@ -0,0 +1,91 @@
+import pytest
+
+from src.services.metrics import CONTENT_TYPE, Counter, Gauge, Histogram, Metric, metrics_registry
+
+TOKEN = 'scrape-token'
+
+
+def sample(text, line_prefix):
+    """The value of the sample line starting with line_prefix, or 0 when absent"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric('m', 'doc')
+
+    class Incomplete(Metric):
+        kind = 'gauge'
+
+    with pytest.raises(TypeError):
+        Incomplete('m', 'doc')
+
+
+def test_exposition_format():
+    counter = Counter('jobs_total', 'Jobs', ['queue'])
+    counter.inc('a "quoted"\nname')
+    counter.inc('a "quoted"\nname', amount=2)
+    assert counter.render() == [
+        '# HELP jobs_total Jobs',
+        '# TYPE jobs_total counter',
+        'jobs_total{queue="a \\"quoted\\"\\nname"} 3'
+    ]
+
+    gauge = Gauge('depth', 'Depth', function=lambda: {(): 4})
+    assert gauge.samples() == ['depth 4']
+
+    histogram = Histogram('latency', 'Latency', ['route'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value, '/x')
+    assert histogram.samples() == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 5.65',
+        'latency_count{route="/x"} 4'
+    ]
+
+
+def test_metrics_endpoint_is_hidden_without_a_token(client):
+    assert client.get('/api/metrics').status_code == 404
+
+
+def test_metrics_endpoint_requires_the_token(make_app):
+    client = make_app(METRICS_TOKEN=TOKEN).test_client()
+    for headers in ({}, {'Authorization': 'Bearer wrong'}, {'Authorization': TOKEN}):
+        response = client.get('/api/metrics', headers=headers)
+        assert response.status_code == 401
+        assert response.headers['WWW-Authenticate'] == 'Bearer'
+    response = client.get('/api/metrics', headers={'Authorization': f'Bearer {TOKEN}'})
+    assert response.status_code == 200
+    assert response.content_type == CONTENT_TYPE
+
+
+def test_requests_are_recorded_by_route(make_app):
+    client = make_app(METRICS_TOKEN=TOKEN).test_client()
+    headers = {'Authorization': f'Bearer {TOKEN}'}
+    route = 'method="GET",route="/api/marketplace/items/<int:item_id>"'
+    before = client.get('/api/metrics', headers=headers).get_data(as_text=True)
+
+    client.get('/api/marketplace/items/999')
+    client.get('/api/marketplace/items/998')
+    client.get('/no/such/page/anywhere')
+    after = client.get('/api/metrics', headers=headers).get_data(as_text=True)
+
+    requests = f'autofounder_http_requests_total{{{route},status="404"}}'
+    assert sample(after, requests) - sample(before, requests) == 2
+    count = f'autofounder_http_request_duration_seconds_count{{{route}}}'
+    assert sample(after, count) - sample(before, count) == 2
+    # Ids never become labels
+    assert '/api/marketplace/items/999' not in after
+    # Only the scrape itself is in flight
+    assert sample(after, 'autofounder_http_requests_in_flight') == 1
+    assert 'autofounder_agent_runs_in_progress{agent_type="ideation",state="running"}' in after
+
+
+def test_registry_returns_existing_families():
+    assert metrics_registry.counter('autofounder_http_requests_total', 'x') is \
+        metrics_registry.counter('autofounder_http_requests_total', 'y')
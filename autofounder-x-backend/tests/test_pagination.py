@@ -0,0 +1,173 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import MetaData, create_engine, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from conftest import create_test_app, dispose_test_app
+from src.models.user import MarketplaceItem, Project, db
+from src.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def forge(sort, values):
+    raw = json.dumps({'s': sort, 'v': values}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor('recent', [created_at, 42])
+    assert decode_cursor(cursor, 'recent', [Project.created_at, Project.id]) == [created_at, 42]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    forge('votes', [1, 2]),  # another sort order
+    forge('recent', [1]),  # too few values
+    forge('recent', ['2025-01-01T00:00:00', {'id': 1}]),  # wrong types
+    forge('recent', [12, 1]),
+    forge('recent', ['yesterday', 1]),
+    base64.urlsafe_b64encode(b'[1, 2]').decode('ascii')
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 'recent', [Project.created_at, Project.id])
+
+
+@pytest.fixture
+def items(app, register, create_project, publish):
+    """Seven public items; votes and views tie in pairs so the id tie-breaker matters"""
+    owner = register('owner')
+    created = []
+    for i in range(7):
+        project = create_project(owner['headers'], f'Project {i}')
+        created.append(publish(owner['headers'], project['id']))
+    with app.app_context():
+        for i, item in enumerate(created):
+            db.session.get(MarketplaceItem, item['id']).votes = i // 2
+            db.session.get(MarketplaceItem, item['id']).views = 10 - i // 2
+        db.session.commit()
+    return created
+
+
+def all_pages(client, url, **params):
+    pages, cursor = [], None
+    while True:
+        query = {**params, **({'cursor': cursor} if cursor else {})}
+        response = client.get(url, query_string=query)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        pages.append([item['id'] for item in body['items']])
+        assert len(pages) <= 100, 'pagination does not end'
+        cursor = body['next_cursor']
+        assert body['has_more'] is (cursor is not None)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('sort', ['recent', 'votes', 'views'])
+def test_marketplace_pages_cover_every_item_once(client, items, sort):
+    pages = all_pages(client, '/api/marketplace/items', sort=sort, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [item_id for page in pages for item_id in page]
+    single = all_pages(client, '/api/marketplace/items', sort=sort, limit=100)
+    assert single == [ids]
+    assert sorted(ids) == sorted(item['id'] for item in items)
+
+
+def test_cursor_from_another_sort_is_a_bad_request(client, items):
+    cursor = client.get('/api/marketplace/items', query_string={'limit': 2}).get_json()['next_cursor']
+    response = client.get('/api/marketplace/items', query_string={'sort': 'votes', 'cursor': cursor})
+    assert response.status_code == 400
+    response = client.get('/api/marketplace/items', query_string={'cursor': forge('recent', [[], 1])})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('limit, expected', [(0, 1), (-5, 1), (1000, 7)])
+def test_marketplace_limit_is_clamped(client, items, limit, expected):
+    response = client.get('/api/marketplace/items', query_string={'limit': limit})
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == expected
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_project_limit_is_clamped(client, register, create_project, limit):
+    user = register('user')
+    create_project(user['headers'], 'One')
+    create_project(user['headers'], 'Two')
+    response = client.get('/api/projects', query_string={'limit': limit, 'include_total': 'true'},
+                          headers=user['headers'])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [project['name'] for project in body['projects']] == ['Two']
+    assert body['total'] == 2
+    assert body['has_more'] is True
+
+
+def test_project_bad_cursor_is_a_bad_request(client, register):
+    user = register('user')
+    response = client.get('/api/projects', query_string={'cursor': 'garbage'}, headers=user['headers'])
+    assert response.status_code == 400
+
+
+# Sort keys that older databases created as nullable columns
+SORT_KEYS = [('projects', 'created_at'), ('marketplace_items', 'votes'), ('marketplace_items', 'views'),
+             ('marketplace_items', 'created_at')]
+
+
+def legacy_database(path):
+    """A database from before the sort keys were NOT NULL, with NULLs in them"""
+    metadata = MetaData()
+    for table in db.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    for table_name, column_name in SORT_KEYS:
+        column = metadata.tables[table_name].c[column_name]
+        column.nullable = True
+        column.server_default = None
+
+    engine = create_engine(f'sqlite:///{path}')
+    try:
+        metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(insert(metadata.tables['users']).values(
+                id=1, username='legacy', email='legacy@example.com', password_hash='x'))
+            for i in range(1, 6):
+                connection.execute(insert(metadata.tables['projects']).values(
+                    id=i, user_id=1, name=f'Legacy {i}', is_public=True, is_active=True,
+                    created_at=None if i % 2 else datetime(2025, 1, i)))
+                connection.execute(insert(metadata.tables['marketplace_items']).values(
+                    id=i, project_id=i, title=f'Legacy item {i}',
+                    votes=None if i % 2 else i, views=None if i < 4 else i,
+                    created_at=None if i % 2 else datetime(2025, 1, i)))
+    finally:
+        engine.dispose()
+
+
+def test_sort_keys_reject_null(app, items):
+    with app.app_context():
+        for table_name, column_name in SORT_KEYS:
+            assert db.metadata.tables[table_name].c[column_name].nullable is False
+        with pytest.raises(IntegrityError):
+            db.session.execute(update(MarketplaceItem).values(votes=None))
+        db.session.rollback()
+
+
+@pytest.mark.parametrize('sort', ['recent', 'votes', 'views'])
+def test_null_sort_keys_are_filled_at_startup(tmp_path, sort):
+    path = tmp_path / 'legacy.db'
+    legacy_database(path)
+    app = create_test_app(f'sqlite:///{path}')
+    try:
+        with app.app_context():
+            for table_name, column_name in SORT_KEYS:
+                column = db.metadata.tables[table_name].c[column_name]
+                assert db.session.execute(select(func.count()).where(column.is_(None))).scalar() == 0
+            assert db.session.get(MarketplaceItem, 1).votes == 0
+
+        # Every item is reached page by page, none dropped at a former NULL
+        pages = all_pages(app.test_client(), '/api/marketplace/items', sort=sort, limit=2)
+        assert sorted(item_id for page in pages for item_id in page) == [1, 2, 3, 4, 5]
+    finally:
+        dispose_test_app(app)
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from conftest import PASSWORD
+from src.models.user import User, db
+from src.services.passwords import PasswordHasher, PasswordHasherBusy, normalize_method, password_hasher
+
+
+def stored_hash(app, user_id):
+    with app.app_context():
+        return db.session.get(User, user_id).password_hash
+
+
+def test_normalize_method():
+    assert normalize_method('scrypt') == 'scrypt:32768:8:1'
+    assert normalize_method('pbkdf2:sha256:1000') == 'pbkdf2:sha256:1000'
+    assert normalize_method('pbkdf2').startswith('pbkdf2:sha256:')
+    with pytest.raises(ValueError):
+        normalize_method('md5')
+
+
+def test_hash_and_verify_inline():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=0)
+    pwhash = hasher.hash(PASSWORD)
+    assert pwhash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.verify(pwhash, PASSWORD)
+    assert not hasher.verify(pwhash, 'Wrong1234')
+    assert not hasher.needs_rehash(pwhash)
+    assert PasswordHasher('pbkdf2:sha256:2000', workers=0).needs_rehash(pwhash)
+
+
+def test_hash_on_process_pool():
+    hasher = PasswordHasher('pbkdf2:sha256:1000', workers=1)
+    try:
+        assert hasher.verify(hasher.hash(PASSWORD), PASSWORD)
+    finally:
+        hasher.shutdown()
+
+
+def test_login_upgrades_old_hashes(app, client, register, monkeypatch):
+    user = register('alice')
+    assert stored_hash(app, user['id']).startswith('pbkdf2:sha256:1000$')
+
+    monkeypatch.setattr(password_hasher, 'method', 'pbkdf2:sha256:2000')
+    assert client.post('/api/auth/login', json={'email': 'alice@example.com', 'password': 'Wrong1234'}).status_code == 401
+    assert stored_hash(app, user['id']).startswith('pbkdf2:sha256:1000$')
+
+    assert client.post('/api/auth/login', json={'email': 'alice@example.com', 'password': PASSWORD}).status_code == 200
+    upgraded = stored_hash(app, user['id'])
+    assert upgraded.startswith('pbkdf2:sha256:2000$')
+
+    # Already current hashes are left alone
+    assert client.post('/api/auth/login', json={'email': 'alice@example.com', 'password': PASSWORD}).status_code == 200
+    assert stored_hash(app, user['id']) == upgraded
+
+
+def test_busy_hasher_answers_503(client, register, monkeypatch):
+    register('bob')
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, '_slots', slots)
+    monkeypatch.setattr(password_hasher, 'queue_timeout', 0.01)
+
+    with pytest.raises(PasswordHasherBusy):
+        password_hasher.hash(PASSWORD)
+    for url, body in (('/api/auth/login', {'email': 'bob@example.com', 'password': PASSWORD}),
+                      ('/api/auth/register', {'username': 'carol', 'email': 'carol@example.com', 'password': PASSWORD})):
+        response = client.post(url, json=body)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+    slots.release()
+    assert client.post('/api/auth/login', json={'email': 'bob@example.com', 'password': PASSWORD}).status_code == 200
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from flask_jwt_extended import decode_token
+
+from src.models.user import User, db
+from src.services.principal import user_cache
+from src.services.query_stats import record_queries
+
+
+def set_user(app, user_id, **values):
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        for name, value in values.items():
+            setattr(user, name, value)
+        db.session.commit()
+
+
+def test_tokens_expire(make_app):
+    app = make_app(JWT_ACCESS_TOKEN_EXPIRES=timedelta(seconds=-1))
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'alice', 'email': 'alice@example.com', 'password': 'Password1'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+    response = client.get('/api/auth/profile', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['msg'] == 'Token has expired'
+
+
+def test_token_carries_no_stale_claims(app, register):
+    user = register('bob')
+    with app.app_context():
+        claims = decode_token(user['token'])
+    assert 'exp' in claims
+    assert 'tier' not in claims and 'active' not in claims
+
+
+def test_profile_is_served_from_cache(app, client, register):
+    user = register('carol')
+    client.get('/api/auth/profile', headers=user['headers'])
+
+    with app.app_context(), record_queries() as recorder:
+        profile = client.get('/api/auth/profile', headers=user['headers']).get_json()['user']
+    assert profile['username'] == 'carol'
+    assert not any('FROM users' in sql for sql, _ in recorder.statements)
+
+    # A write to the row drops the cached copy
+    client.put('/api/auth/profile', json={'first_name': 'Carol'}, headers=user['headers'])
+    assert client.get('/api/auth/profile', headers=user['headers']).get_json()['user']['first_name'] == 'Carol'
+    set_user(app, user['id'], subscription_tier='pro')
+    assert client.get('/api/auth/profile', headers=user['headers']).get_json()['user']['subscription_tier'] == 'pro'
+
+
+def test_deactivated_users_are_rejected(app, client, register, create_project):
+    user = register('dave')
+    assert client.get('/api/projects', headers=user['headers']).status_code == 200
+
+    set_user(app, user['id'], is_active=False)
+    for method, url in (('GET', '/api/projects'), ('GET', '/api/auth/profile'), ('POST', '/api/projects')):
+        response = client.open(url, method=method, json={'name': 'x'}, headers=user['headers'])
+        assert response.status_code == 401
+        assert response.get_json()['msg'] == 'Account is inactive or no longer exists'
+
+    response = client.post('/api/auth/login', json={'email': 'dave@example.com', 'password': 'Password1'})
+    assert response.status_code == 401
+
+    set_user(app, user['id'], is_active=True)
+    assert client.get('/api/projects', headers=user['headers']).status_code == 200
+
+
+def test_deactivation_reaches_other_workers_within_the_ttl(app, client, register, monkeypatch):
+    user = register('erin')
+    client.get('/api/auth/profile', headers=user['headers'])
+
+    # Another worker's write does not touch this worker's cache; its copy serves until it expires
+    monkeypatch.setattr(user_cache, 'invalidate', lambda *user_ids: None)
+    set_user(app, user['id'], is_active=False)
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 200
+    user_cache.clear()
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 401
+
+
+def test_deleted_users_are_rejected(app, client, register):
+    user = register('frank')
+    with app.app_context():
+        db.session.delete(db.session.get(User, user['id']))
+        db.session.commit()
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 401
@@ -0,0 +1,136 @@
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+from flask import jsonify
+
+from src.services.cache import VERSIONED_TTL, MemoryCacheBackend, response_cache
+
+
+class SharedBackend:
+    """Dict-backed stand-in for a shared backend, recording each entry's TTL"""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.ttls: Dict[str, Optional[float]] = {}
+
+    def get(self, key: str) -> Any:
+        return self.values.get(key)
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        return [self.values.get(key, 0) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if key in self.values:
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def delete(self, key: str):
+        self.values.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def clear(self):
+        self.values.clear()
+
+
+def projects(client, user):
+    response = client.get('/api/projects', headers=user['headers'])
+    assert response.status_code == 200
+    return response.headers['X-Cache'], [project['name'] for project in response.get_json()['projects']]
+
+
+def test_project_views_follow_the_owners_writes(client, register, create_project):
+    user = register('owner')
+    project = create_project(user['headers'], 'First')
+    assert projects(client, user) == ('MISS', ['First'])
+    assert projects(client, user) == ('HIT', ['First'])
+
+    create_project(user['headers'], 'Second')
+    assert projects(client, user) == ('MISS', ['Second', 'First'])
+
+    # Project agent rows bump the owner's generation too
+    detail = f"/api/projects/{project['id']}"
+    assert client.get(detail, headers=user['headers']).headers['X-Cache'] == 'MISS'
+    client.post(f'{detail}/agents', json={'agent_type': 'design'}, headers=user['headers'])
+    response = client.get(detail, headers=user['headers'])
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [agent['agent']['type'] for agent in response.get_json()['project']['agents']] == ['design']
+
+    # Bulk imports write through Core and bump it explicitly
+    client.post('/api/projects/import', data=json.dumps([{'name': 'Imported'}]),
+                content_type='application/json', headers=user['headers']).get_data()
+    assert projects(client, user) == ('MISS', ['Imported', 'Second', 'First'])
+
+
+def test_project_views_are_per_user(client, register, create_project):
+    alice, bob = register('alice'), register('bob')
+    create_project(alice['headers'], 'Alice project')
+    assert projects(client, alice) == ('MISS', ['Alice project'])
+    assert projects(client, bob) == ('MISS', [])
+    create_project(bob['headers'], 'Bob project')
+    assert projects(client, alice) == ('HIT', ['Alice project'])
+
+
+def test_memory_backend_keeps_private_views_briefly(make_app, register):
+    # Another worker's write never reaches this worker's generations, so only the TTL bounds staleness
+    app = make_app(RESPONSE_CACHE_PRIVATE_TTL=0.05)
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'owner', 'email': 'owner@example.com', 'password': 'Password1'
+    })
+    user = {'headers': {'Authorization': f"Bearer {response.get_json()['token']}"}}
+    assert projects(client, user)[0] == 'MISS'
+    assert projects(client, user)[0] == 'HIT'
+    time.sleep(0.1)
+    assert projects(client, user)[0] == 'MISS'
+
+
+def test_shared_backend_keeps_private_views_until_the_next_write(client, register, monkeypatch):
+    backend = SharedBackend()
+    monkeypatch.setattr(response_cache, 'backend', backend)
+    user = register('owner')
+    client.get('/api/projects', headers=user['headers'])
+    client.get('/api/marketplace/categories')
+    ttls = {value['body'].startswith(b'{"success":true,"projects"'): backend.ttls[key]
+            for key, value in backend.values.items() if key.startswith('resp:')}
+    assert ttls == {True: VERSIONED_TTL, False: response_cache.default_ttl}
+
+
+def test_generations_survive_lru_eviction():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.incr('gen:user:1:projects')
+    for i in range(10):
+        backend.set(f'resp:{i}', i)
+    assert backend.get_counters(['gen:user:1:projects', 'gen:other']) == [1, 0]
+    assert backend.get('resp:0') is None
+    backend.clear()
+    assert backend.get_counters(['gen:user:1:projects']) == [0]
+
+
+def test_hits_replay_the_view_headers(app, client):
+    @response_cache.cached(lambda: ['test:headers'])
+    def with_headers():
+        response = jsonify({'ok': True})
+        response.headers['Cache-Control'] = 'public, max-age=30'
+        response.headers['Vary'] = 'Accept-Language'
+        response.headers['X-Custom'] = 'kept'
+        response.set_cookie('session', 'per-response')
+        return response
+
+    app.add_url_rule('/test/headers', view_func=with_headers)
+    miss = client.get('/test/headers')
+    hit = client.get('/test/headers')
+    assert (miss.headers['X-Cache'], hit.headers['X-Cache']) == ('MISS', 'HIT')
+    for name in ('Content-Type', 'Cache-Control', 'Vary', 'X-Custom'):
+        assert hit.headers[name] == miss.headers[name]
+    assert 'Set-Cookie' in miss.headers and 'Set-Cookie' not in hit.headers
+    assert hit.get_json() == {'ok': True}
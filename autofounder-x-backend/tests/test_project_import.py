@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from src.models.user import Project, ProjectAgent, db
+from src.services import project_import
+
+
+@pytest.fixture
+def user(register):
+    return register('importer')
+
+
+def run_import(client, user, body, content_type='application/json', **params):
+    response = client.post('/api/projects/import', data=body, content_type=content_type,
+                           headers=user['headers'], query_string=params)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return lines[:-1], lines[-1]['summary']
+
+
+def project_names(app, user):
+    with app.app_context():
+        return [name for (name,) in db.session.query(Project.name).filter_by(user_id=user['id']).order_by(Project.id)]
+
+
+def test_json_array_reports_each_row(app, client, user):
+    rows = [
+        {'name': 'One', 'selected_agents': ['ideation', 'legal', 'legal']},
+        {'name': ''},
+        {'name': 'Two', 'business_model': 'x' * 51},
+        {'name': 'Three', 'selected_agents': ['wizard']},
+        'not an object',
+        {'name': '  Four  ', 'description': None}
+    ]
+    results, summary = run_import(client, user, json.dumps(rows))
+    assert [result['success'] for result in results] == [True, False, False, False, False, True]
+    assert [result['index'] for result in results] == list(range(6))
+    assert results[0]['agents'] == 2
+    assert results[3]['message'] == 'Unknown agent type: wizard'
+    assert summary == {'imported': 2, 'failed': 4}
+    assert project_names(app, user) == ['One', 'Four']
+    with app.app_context():
+        assert ProjectAgent.query.filter_by(project_id=results[0]['id']).count() == 2
+
+
+def test_ndjson_with_a_bad_line(app, client, user):
+    body = '{"name": "A"}\n\n{"name": \n{"name": "B"}\n'
+    results, summary = run_import(client, user, body, content_type='application/x-ndjson')
+    assert [result['success'] for result in results] == [True, False, True]
+    assert 'Invalid JSON on line 3' in results[1]['message']
+    assert summary == {'imported': 2, 'failed': 1}
+
+
+def test_failed_chunk_rolls_back_alone(app, client, user, monkeypatch):
+    real_insert = project_import.insert
+    agent_inserts = []
+
+    def failing_insert(table):
+        if table is ProjectAgent:
+            agent_inserts.append(table)
+            if len(agent_inserts) == 2:
+                raise RuntimeError('disk full')
+        return real_insert(table)
+
+    monkeypatch.setattr(project_import, 'insert', failing_insert)
+    rows = [{'name': f'P{i}', 'selected_agents': ['design']} for i in range(6)]
+    results, summary = run_import(client, user, json.dumps(rows), chunk_size=2)
+
+    # The second chunk's projects were inserted before its agents failed, and rolled back with them
+    assert [result['success'] for result in results] == [True, True, False, False, True, True]
+    assert 'disk full' in results[2]['message']
+    assert summary == {'imported': 4, 'failed': 2}
+    assert project_names(app, user) == ['P0', 'P1', 'P4', 'P5']
+    with app.app_context():
+        assert ProjectAgent.query.count() == 4
+
+
+def test_rejected_payloads(client, user):
+    response = client.post('/api/projects/import', data='name=x', content_type='text/plain', headers=user['headers'])
+    assert response.status_code == 415
+    response = client.post('/api/projects/import', json={'name': 'x'}, headers=user['headers'])
+    assert response.status_code == 400
+    assert client.post('/api/projects/import', json=[]).status_code == 401
+
+
+def test_imported_projects_are_listed(client, user):
+    run_import(client, user, json.dumps({'projects': [{'name': 'Listed'}]}))
+    projects = client.get('/api/projects', headers=user['headers']).get_json()['projects']
+    assert [project['name'] for project in projects] == ['Listed']
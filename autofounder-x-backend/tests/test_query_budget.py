@@ -0,0 +1,101 @@
+from collections import OrderedDict
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import DBAPIError
+
+from src.models.user import Agent, db
+from src.services.principal import user_cache
+from src.services.query_stats import (EXPLAIN_PREFIXES, QueryBudgetExceeded, check_query_budget,
+                                      declared_query_budget, query_profiler, record_queries)
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def app(request):
+    if request.param == 'postgresql':
+        return request.getfixturevalue('postgres_app')
+    return request.getfixturevalue('make_app')()
+
+
+@pytest.fixture
+def listing(register, create_project, publish):
+    owner = register('alice')
+    project = create_project(owner['headers'], 'Clinic scheduler', selected_agents=['ideation', 'legal'])
+    item = publish(owner['headers'], project['id'], category='SaaS Tools')
+    return owner, project, item
+
+
+def test_budgeted_routes(app, client, listing):
+    owner, project, item = listing
+    budgets = [
+        ('/api/projects', 4, True),
+        (f"/api/projects/{project['id']}", 3, True),
+        (f"/api/projects/{project['id']}/agents", 3, True),
+        ('/api/marketplace/items', 2, False),
+        ('/api/marketplace/search?q=clinic', 4, False),
+        (f"/api/marketplace/items/{item['id']}", 1, False),
+        ('/api/marketplace/categories', 1, False),
+        ('/api/marketplace/my-items', 2, True)
+    ]
+    for path, budget, authenticated in budgets:
+        assert declared_query_budget(app, 'GET', path) == budget, path
+        # Worst case: a cold user cache and a response cache miss
+        user_cache.clear()
+        response = check_query_budget(client, 'GET', path, max_queries=budget,
+                                      headers=owner['headers'] if authenticated else None)
+        assert response.status_code == 200, path
+        assert response.headers.get('X-Cache') != 'HIT', path
+
+
+def test_budget_overrun_lists_the_queries(client, listing):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        check_query_budget(client, 'GET', '/api/marketplace/search?q=clinic', max_queries=1)
+    assert 'ran 4 queries, budget is 1' in str(excinfo.value)
+    assert 'marketplace_items' in str(excinfo.value)
+
+    with pytest.raises(ValueError):
+        check_query_budget(client, 'GET', '/api/auth/profile')
+
+
+def test_slow_queries_are_explained(app, capsys, monkeypatch):
+    monkeypatch.setattr(query_profiler, 'slow_query_threshold', 0)
+    monkeypatch.setattr(query_profiler, '_explained', OrderedDict())
+    with app.app_context():
+        db.session.execute(select(Agent.id).where(Agent.type == 'legal')).all()
+    output = capsys.readouterr().out
+    assert '[QueryProfiler] WARNING: Slow query' in output
+    assert '[QueryProfiler] INFO: Query plan:' in output
+
+
+def test_failed_explain_leaves_the_transaction_intact(app, capsys, monkeypatch):
+    monkeypatch.setattr(query_profiler, 'slow_query_threshold', 0)
+    monkeypatch.setattr(query_profiler, '_explained', OrderedDict())
+
+    with app.app_context():
+        # On PostgreSQL a failed statement aborts the transaction unless it ran in a savepoint
+        monkeypatch.setitem(EXPLAIN_PREFIXES, db.engine.dialect.name, 'EXPLAIN NONSENSE ')
+        before = db.session.execute(select(func.count(Agent.id))).scalar()
+        with db.engine.begin() as connection:
+            connection.execute(insert(Agent).values(name='Extra', type='extra', description=''))
+            assert connection.execute(select(func.count(Agent.id))).scalar() == before + 1
+        assert db.session.execute(select(func.count(Agent.id))).scalar() == before + 1
+    assert 'EXPLAIN failed' in capsys.readouterr().out
+
+    # The profiler's own statements never reach the recorders
+    with app.app_context(), record_queries() as recorder:
+        db.session.execute(select(Agent.id).where(Agent.type == 'extra')).all()
+    assert recorder.count == 1
+    assert 'EXPLAIN failed' in capsys.readouterr().out
+
+
+def test_failed_statements_leave_no_start_time_behind(app):
+    with app.app_context(), db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                connection.execute(text('SELECT * FROM no_such_table'))
+            connection.rollback()
+        with record_queries() as recorder:
+            connection.execute(select(Agent.id)).all()
+        assert recorder.count == 1
+        # The pooled connection outlives the request; nothing may pile up on it
+        assert not connection.info.get('query_started')
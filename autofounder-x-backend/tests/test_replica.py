@@ -0,0 +1,127 @@
+import sqlite3
+import time
+
+import pytest
+
+from conftest import PASSWORD
+from src.models.user import db
+from src.services.replica import ReplicaRouter, replica_router
+
+
+@pytest.fixture
+def replica_path(tmp_path):
+    return tmp_path / 'replica.db'
+
+
+@pytest.fixture
+def app(make_app, replica_path):
+    return make_app(SQLALCHEMY_BINDS={'replica': {'url': f'sqlite:///{replica_path}'}},
+                    RESPONSE_CACHE_ENABLED=False, REPLICA_LAG_CHECK_INTERVAL=0)
+
+
+def replicate(app, replica_path):
+    """Copy the primary's current state to the replica file"""
+    with app.app_context():
+        source = db.engines[None].raw_connection()
+        target = sqlite3.connect(replica_path)
+        try:
+            source.driver_connection.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+
+def listed_titles(client, headers=None):
+    response = client.get('/api/marketplace/items', headers=headers or {})
+    return [item['title'] for item in response.get_json()['items']]
+
+
+@pytest.fixture
+def lagging_replica(app, client, replica_path, register, create_project, publish):
+    """One item on both databases, a second only on the primary; returns the second item's owner"""
+    first = register('first')
+    publish(first['headers'], create_project(first['headers'])['id'], title='Replicated')
+    replicate(app, replica_path)
+    second = register('second')
+    publish(second['headers'], create_project(second['headers'])['id'], title='Primary only')
+    return second
+
+
+def test_anonymous_reads_use_the_replica(client, lagging_replica):
+    assert listed_titles(client) == ['Replicated']
+
+
+def test_writers_read_their_writes_from_the_primary(client, lagging_replica, register):
+    assert listed_titles(client, lagging_replica['headers']) == ['Primary only', 'Replicated']
+    # Users who have not written still read the replica
+    reader = register('reader')
+    assert listed_titles(client, reader['headers']) == ['Replicated']
+
+
+def test_lagging_replica_is_bypassed(client, lagging_replica, monkeypatch):
+    monkeypatch.setattr(replica_router, '_measure_lag', lambda: 60.0)
+    assert listed_titles(client) == ['Primary only', 'Replicated']
+
+
+def test_failed_lag_check_falls_back_to_primary(client, lagging_replica, monkeypatch):
+    def unreachable():
+        raise ConnectionError('replica down')
+
+    monkeypatch.setattr(replica_router, '_measure_lag', unreachable)
+    assert listed_titles(client) == ['Primary only', 'Replicated']
+
+
+def test_router_is_off_without_a_replica(make_app):
+    make_app()
+    assert replica_router.enabled is False
+
+
+def test_sticky_window_is_shared_through_the_backend(app, client, register, create_project):
+    # Two workers: this app's router and another process's, both on the same shared backend
+    other_worker = ReplicaRouter(sticky_seconds=10.0)
+    other_worker.backend = replica_router.backend
+    lone_worker = ReplicaRouter(sticky_seconds=10.0)
+
+    user = register('writer')
+    assert not other_worker.is_sticky(user['id'])
+    create_project(user['headers'])
+    assert other_worker.is_sticky(user['id'])
+    # A worker on its own memory backend never heard of the write
+    assert not lone_worker.is_sticky(user['id'])
+
+
+def test_sticky_window_expires():
+    router = ReplicaRouter(sticky_seconds=0.05)
+    router.mark_write(7)
+    assert router.is_sticky(7)
+    time.sleep(0.1)
+    assert not router.is_sticky(7)
+
+
+def test_replica_reads_are_not_cached(make_app, replica_path, monkeypatch):
+    app = make_app(SQLALCHEMY_BINDS={'replica': {'url': f'sqlite:///{replica_path}'}},
+                   REPLICA_LAG_CHECK_INTERVAL=0)
+    client = app.test_client()
+    owner = client.post('/api/auth/register', json={
+        'username': 'owner', 'email': 'owner@example.com', 'password': PASSWORD}).get_json()['token']
+    headers = {'Authorization': f'Bearer {owner}'}
+    replicate(app, replica_path)
+
+    # The publish bumps the marketplace generation; an anonymous read then refills from the lagging replica
+    project = client.post('/api/projects', json={'name': 'Fresh'}, headers=headers).get_json()['project']
+    assert client.post('/api/marketplace/publish', json={'project_id': project['id'], 'title': 'Fresh'},
+                       headers=headers).status_code == 201
+    assert listed_titles(client) == []
+    assert client.get('/api/marketplace/items').headers['X-Cache'] == 'MISS'
+
+    # The writer reads the primary and is not handed the replica's answer from the cache
+    response = client.get('/api/marketplace/items', headers=headers)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [item['title'] for item in response.get_json()['items']] == ['Fresh']
+
+    # Responses built on the primary are cached as before
+    monkeypatch.setattr(replica_router, '_measure_lag', lambda: 60.0)
+    assert listed_titles(client) == ['Fresh']
+    response = client.get('/api/marketplace/items')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert [item['title'] for item in response.get_json()['items']] == ['Fresh']
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def owner(register):
+    return register('owner')
+
+
+@pytest.fixture
+def item(owner, create_project, publish):
+    project = create_project(owner['headers'], 'Cached')
+    return publish(owner['headers'], project['id'], category='SaaS Tools')
+
+
+def get(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    assert response.status_code == 200, response.get_json()
+    return response
+
+
+def test_marketplace_listing_is_cached_until_a_vote(client, item, register):
+    assert get(client, '/api/marketplace/items').headers['X-Cache'] == 'MISS'
+    cached = get(client, '/api/marketplace/items')
+    assert cached.headers['X-Cache'] == 'HIT'
+    assert cached.get_json()['items'][0]['votes'] == 0
+
+    # Query strings are part of the key
+    assert get(client, '/api/marketplace/items?sort=votes').headers['X-Cache'] == 'MISS'
+
+    voter = register('voter')
+    client.post('/api/marketplace/vote', json={'item_id': item['id']}, headers=voter['headers'])
+    fresh = get(client, '/api/marketplace/items')
+    assert fresh.headers['X-Cache'] == 'MISS'
+    assert fresh.get_json()['items'][0]['votes'] == 1
+
+
+def test_categories_follow_publishing(client, owner, item, create_project, publish):
+    assert get(client, '/api/marketplace/categories').get_json()['categories'] == ['SaaS Tools']
+    assert get(client, '/api/marketplace/categories').headers['X-Cache'] == 'HIT'
+
+    project = create_project(owner['headers'], 'Second')
+    publish(owner['headers'], project['id'], category='Finance')
+    response = get(client, '/api/marketplace/categories')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert sorted(response.get_json()['categories']) == ['Finance', 'SaaS Tools']
+
+
+def test_deleting_a_project_drops_it_from_the_cached_listing(client, owner, item):
+    assert len(get(client, '/api/marketplace/items').get_json()['items']) == 1
+    client.delete(f"/api/projects/{item['project_id']}", headers=owner['headers'])
+    assert get(client, '/api/marketplace/items').get_json()['items'] == []
+
+
+def test_competitions_and_leaderboards_follow_writes(client, owner, create_project, register):
+    competitions = get(client, '/api/battle-arena/competitions').get_json()['competitions']
+    competition_id = competitions[0]['id']
+    assert competitions[0]['entry_count'] == 0
+    assert get(client, f'/api/battle-arena/leaderboard/{competition_id}').get_json()['leaderboard'] == []
+
+    project = create_project(owner['headers'], 'Contender')
+    entry = client.post('/api/battle-arena/enter', json={'competition_id': competition_id, 'project_id': project['id']},
+                        headers=owner['headers']).get_json()['entry']
+    assert get(client, '/api/battle-arena/competitions').get_json()['competitions'][0]['entry_count'] == 1
+    assert len(get(client, f'/api/battle-arena/leaderboard/{competition_id}').get_json()['leaderboard']) == 1
+
+    voter = register('voter')
+    client.post('/api/battle-arena/vote', json={'entry_id': entry['id']}, headers=voter['headers'])
+    board = get(client, f'/api/battle-arena/leaderboard/{competition_id}')
+    assert board.headers['X-Cache'] == 'MISS'
+    assert board.get_json()['leaderboard'][0]['votes'] == 1
+
+    # Renaming the creator changes every leaderboard
+    client.put('/api/auth/profile', json={'username': 'renamed'}, headers=owner['headers'])
+    board = get(client, f'/api/battle-arena/leaderboard/{competition_id}').get_json()
+    assert board['leaderboard'][0]['creator']['username'] == 'renamed'
+
+
+def test_errors_are_not_cached(client):
+    assert client.get('/api/battle-arena/leaderboard/999').status_code == 404
+    response = client.get('/api/battle-arena/leaderboard/999')
+    assert response.status_code == 404
+    assert response.headers['X-Cache'] == 'MISS'
+
+
+def test_entries_expire_after_the_ttl(make_app):
+    client = make_app(RESPONSE_CACHE_TTL=0.05).test_client()
+    get(client, '/api/marketplace/categories')
+    assert get(client, '/api/marketplace/categories').headers['X-Cache'] == 'HIT'
+    time.sleep(0.1)
+    assert get(client, '/api/marketplace/categories').headers['X-Cache'] == 'MISS'
+
+
+def test_cache_can_be_disabled(make_app):
+    client = make_app(RESPONSE_CACHE_ENABLED=False).test_client()
+    get(client, '/api/marketplace/categories')
+    assert 'X-Cache' not in get(client, '/api/marketplace/categories').headers
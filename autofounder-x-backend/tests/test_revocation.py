@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import decode_token
+
+from src.models.token import RevokedToken
+from src.models.user import db
+from src.services.revocation import BloomFilter, TokenRevocationStore, token_revocation
+
+
+def jti_of(app, user):
+    with app.app_context():
+        return decode_token(user['token'])['jti']
+
+
+def revoke_elsewhere(app, jti, **fields):
+    """Write a revocation the way another worker does, without touching this worker's memory"""
+    with app.app_context():
+        db.session.add(RevokedToken(jti=jti, **fields))
+        db.session.commit()
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(100)
+    keys = [f'jti-{i}' for i in range(100)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert sum(f'other-{i}' in bloom for i in range(10000)) < 50
+
+
+def test_logout_is_immediate_on_this_worker(client, register):
+    user = register('alice')
+    assert client.post('/api/auth/logout', headers=user['headers']).status_code == 200
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 401
+    # A second logout with the same token is refused rather than failing
+    assert client.post('/api/auth/logout', headers=user['headers']).status_code == 401
+
+
+def test_revocation_reaches_other_workers_on_sync(app, client, register):
+    user = register('bob')
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 200
+
+    revoke_elsewhere(app, jti_of(app, user), user_id=user['id'])
+    # Checks stay in memory until the next sync
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 200
+    with app.app_context():
+        token_revocation.sync()
+    assert client.get('/api/auth/profile', headers=user['headers']).status_code == 401
+
+
+def test_late_commits_inside_the_overlap_are_picked_up(app, client, register):
+    first, second = register('carol'), register('dave')
+    client.get('/api/auth/profile', headers=first['headers'])
+
+    with app.app_context():
+        revoke_elsewhere(app, jti_of(app, second), id=2)
+        token_revocation.sync()
+        # A revocation with a lower id and an earlier timestamp commits after that sync
+        revoke_elsewhere(app, jti_of(app, first), id=1, revoked_at=datetime.utcnow() - timedelta(seconds=5))
+        token_revocation.sync()
+
+    assert client.get('/api/auth/profile', headers=first['headers']).status_code == 401
+    assert client.get('/api/auth/profile', headers=second['headers']).status_code == 401
+
+
+def test_expired_revocations_are_not_loaded(app, register):
+    user = register('erin')
+    jti = jti_of(app, user)
+    revoke_elsewhere(app, jti, expires_at=datetime.utcnow() - timedelta(minutes=1))
+    with app.app_context():
+        token_revocation.sync()
+    assert not token_revocation.is_revoked(jti)
+
+
+
+def test_expired_revocations_are_forgotten_on_sync(app, register):
+    live, expired = jti_of(app, register('gina')), jti_of(app, register('hank'))
+    with app.app_context():
+        token_revocation.revoke(live, expires_at=datetime.utcnow() + timedelta(hours=1))
+        # Revoked while valid, expired since
+        token_revocation.revoke(expired, expires_at=datetime.utcnow() - timedelta(seconds=1))
+        revoke_elsewhere(app, 'expired-elsewhere', expires_at=datetime.utcnow() - timedelta(minutes=1))
+        assert token_revocation.is_revoked(expired)
+
+        token_revocation.sync()
+        assert set(token_revocation._revoked) == {live}
+        assert token_revocation._bloom.count == 1
+        assert expired not in token_revocation._bloom
+        assert token_revocation.is_revoked(live)
+        assert db.session.execute(db.select(RevokedToken.jti)).scalars().all() == [live]
+def test_background_sync(app, client, register):
+    user = register('frank')
+    app.config['TOKEN_REVOCATION_SYNC_INTERVAL'] = 0.02
+    store = TokenRevocationStore()
+    store.init_app(app)
+    try:
+        assert client.get('/api/auth/profile', headers=user['headers']).status_code == 200
+        revoke_elsewhere(app, jti_of(app, user))
+
+        deadline = time.monotonic() + 5
+        while client.get('/api/auth/profile', headers=user['headers']).status_code != 401:
+            assert time.monotonic() < deadline, 'revocation was never synced'
+            time.sleep(0.02)
+    finally:
+        store.shutdown()
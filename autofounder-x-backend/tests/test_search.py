@@ -0,0 +1,64 @@
+import pytest
+
+from src.services.search import build_match_query, highlight_snippet
+
+
+@pytest.fixture
+def owner(register):
+    return register('owner')
+
+
+def search(client, **params):
+    response = client.get('/api/marketplace/search', query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['items']
+
+
+def test_snippets_escape_indexed_html(client, owner, create_project, publish):
+    project = create_project(owner['headers'], 'Widget')
+    publish(owner['headers'], project['id'], title='Widget',
+            description='<img src=x onerror=alert(1)> scheduling for <b>clinics</b>')
+
+    [hit] = search(client, q='clinics')
+    assert '<img' not in hit['snippet'] and '<b>' not in hit['snippet']
+    assert '&lt;img src=x onerror=alert(1)&gt;' in hit['snippet']
+    assert '&lt;b&gt;<mark>clinics</mark>&lt;/b&gt;' in hit['snippet']
+
+
+def test_highlight_snippet():
+    assert highlight_snippet('a \x02<x>\x03 & b') == 'a <mark>&lt;x&gt;</mark> &amp; b'
+    assert highlight_snippet(None) is None
+
+
+def test_ranking_prefixes_and_filters(client, owner, register, create_project, publish):
+    in_title = create_project(owner['headers'], 'Scheduler')
+    publish(owner['headers'], in_title['id'], title='Clinic scheduler', category='SaaS Tools')
+    in_description = create_project(owner['headers'], 'Booking')
+    publish(owner['headers'], in_description['id'], title='Booking tool',
+            description='Helps a clinic fill empty slots', category='Productivity')
+    hidden = create_project(owner['headers'], 'Hidden clinic')
+    publish(owner['headers'], hidden['id'], title='Clinic archive')
+    client.delete(f"/api/projects/{hidden['id']}", headers=owner['headers'])
+
+    # Title matches outrank description matches; deleted projects never show
+    assert [hit['title'] for hit in search(client, q='clinic')] == ['Clinic scheduler', 'Booking tool']
+    assert [hit['title'] for hit in search(client, q='clin')] == ['Clinic scheduler', 'Booking tool']
+    assert [hit['title'] for hit in search(client, q='clinic', category='Productivity')] == ['Booking tool']
+    assert [hit['title'] for hit in search(client, q='clinic', limit=1, offset=1)] == ['Booking tool']
+
+    # Renaming the project re-indexes its item
+    client.put(f"/api/projects/{in_description['id']}", json={'name': 'Telehealth'}, headers=owner['headers'])
+    assert [hit['title'] for hit in search(client, q='telehealth')] == ['Booking tool']
+
+
+def test_query_syntax_is_never_interpreted(client, owner, create_project, publish):
+    project = create_project(owner['headers'], 'Widget')
+    publish(owner['headers'], project['id'], title='Widget')
+    for query in ('"unbalanced', 'widget OR', 'NEAR(widget)', 'title:widget', '*'):
+        search(client, q=query)
+    assert client.get('/api/marketplace/search?q=').status_code == 400
+
+
+def test_match_query_quotes_terms():
+    assert build_match_query('Clinic AND "x"') == '"clinic"* "and"* "x"'
+    assert build_match_query('!!!') is None
@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import func, inspect, select, text
+
+from src.models.user import (AgentTask, BattleArenaCompetition, CompetitionEntry, MarketplaceItem, Project,
+                             ProjectAgent, User, db)
+from src.seed_data import SEEDED_MODELS, seed_all_data
+from src.services.search import SEARCH_TABLE
+
+SCALE = 300
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def app(request):
+    if request.param == 'postgresql':
+        return request.getfixturevalue('postgres_app')
+    return request.getfixturevalue('make_app')()
+
+
+def seed(app, **options):
+    with app.app_context():
+        return seed_all_data(SCALE, users=30, batch_size=100, transaction_rows=250, **options)
+
+
+def row_counts(app):
+    with app.app_context():
+        return {model.__tablename__: db.session.execute(select(func.count(model.id))).scalar()
+                for model in SEEDED_MODELS}
+
+
+def test_counts_match_the_tables(app):
+    before = row_counts(app)
+    counts = seed(app)
+    after = row_counts(app)
+    assert counts == {table: after[table] - before[table] for table in after}
+    assert counts['projects'] == SCALE
+    assert counts['users'] == 30
+    for table in ('project_agents', 'agent_tasks', 'marketplace_items', 'competition_entries'):
+        assert counts[table] > 0, table
+
+
+def test_same_seed_gives_the_same_rows(make_app):
+    first, second, other = make_app(), make_app(), make_app()
+    seed(first)
+    seed(second)
+    seed(other, seed=7)
+
+    def rows(app):
+        with app.app_context():
+            return db.session.execute(select(Project.name, Project.status, Project.user_id).order_by(Project.id)).all()
+    assert rows(first) == rows(second)
+    assert rows(first) != rows(other)
+
+
+def test_rows_reference_existing_parents(app):
+    seed(app)
+    with app.app_context():
+        orphans = [
+            select(Project.id).outerjoin(User, User.id == Project.user_id).where(User.id.is_(None)),
+            select(ProjectAgent.id).outerjoin(Project, Project.id == ProjectAgent.project_id).where(Project.id.is_(None)),
+            select(AgentTask.id).outerjoin(ProjectAgent, ProjectAgent.id == AgentTask.project_agent_id)
+            .where(ProjectAgent.id.is_(None)),
+            select(MarketplaceItem.id).outerjoin(Project, Project.id == MarketplaceItem.project_id).where(Project.id.is_(None)),
+            select(CompetitionEntry.id)
+            .outerjoin(BattleArenaCompetition, BattleArenaCompetition.id == CompetitionEntry.competition_id)
+            .where(BattleArenaCompetition.id.is_(None))
+        ]
+        for query in orphans:
+            assert db.session.execute(query).first() is None, str(query)
+
+
+def test_entries_are_ranked_by_votes(app):
+    seed(app)
+    with app.app_context():
+        entries = db.session.execute(
+            select(CompetitionEntry.competition_id, CompetitionEntry.id, CompetitionEntry.votes, CompetitionEntry.ranking)
+            .order_by(CompetitionEntry.competition_id, CompetitionEntry.votes.desc(), CompetitionEntry.id)
+        ).all()
+    previous, expected = None, 0
+    for competition_id, entry_id, votes, ranking in entries:
+        expected = expected + 1 if competition_id == previous else 1
+        previous = competition_id
+        assert ranking == expected, (competition_id, entry_id, votes)
+
+
+def test_indexes_and_search_are_restored(app, client, register, create_project, publish):
+    with app.app_context():
+        expected = {table: {index['name'] for index in inspect(db.engine).get_indexes(table)}
+                    for table in ('projects', 'marketplace_items', 'competition_entries')}
+    seed(app)
+
+    with app.app_context():
+        for table, names in expected.items():
+            assert {index['name'] for index in inspect(db.engine).get_indexes(table)} == names, table
+        if db.engine.dialect.name == 'sqlite':
+            items = db.session.execute(select(func.count(MarketplaceItem.id))).scalar()
+            assert db.session.execute(text(f'SELECT count(*) FROM {SEARCH_TABLE}')).scalar() == items
+
+    # The insert trigger dropped for the load is back: an item published afterwards is found
+    user = register('alice')
+    publish(user['headers'], create_project(user['headers'], 'Quokkadesk')['id'])
+    titles = [item['title'] for item in client.get('/api/marketplace/search?q=quokkadesk').get_json()['items']]
+    assert titles == ['Quokkadesk']
+
+
+def test_app_inserts_after_seeding(app, client, register, create_project):
+    existing = register('alice')
+    seed(app)
+    with app.app_context():
+        max_ids = {model.__tablename__: db.session.execute(select(func.max(model.id))).scalar()
+                   for model in (User, Project)}
+
+    # Seeded ids are explicit; the database must still hand out ids after them
+    user = register('bob')
+    assert user['id'] > max_ids['users']
+    project = create_project(user['headers'], 'After the seed')
+    assert project['id'] > max_ids['projects']
+    assert client.get('/api/auth/profile', headers=existing['headers']).status_code == 200
@@ -0,0 +1,102 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from src.services.static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, StaticAssets
+
+INDEX = b'<!doctype html><div id="root"></div>'
+BUNDLE = b'console.log("app");' * 200
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    root = tmp_path / 'static'
+    (root / 'assets').mkdir(parents=True)
+    (root / 'index.html').write_bytes(INDEX)
+    (root / 'favicon.ico').write_bytes(b'\x00' * 64)
+    (root / 'assets' / 'index-3f2a.js').write_bytes(BUNDLE)
+    (root / 'assets' / 'index-3f2a.js.gz').write_bytes(gzip.compress(BUNDLE))
+    return root
+
+
+def make_client(static_folder, **config):
+    """An app serving the frontend the way src/app.py does"""
+    app = Flask(__name__, static_folder=str(static_folder), static_url_path='/_static')
+    app.config.update(config)
+    assets = StaticAssets()
+    assets.init_app(app)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        return assets.serve(path)
+
+    return app.test_client(), assets
+
+
+def test_manifest(static_folder):
+    _, assets = make_client(static_folder)
+    assert sorted(assets.manifest.assets) == ['assets/index-3f2a.js', 'favicon.ico', 'index.html']
+    bundle = assets.manifest.get('assets/index-3f2a.js')
+    assert bundle.immutable
+    assert bundle.mimetype in ('application/javascript', 'text/javascript')
+    assert set(bundle.variants) == {'gzip'}
+    assert not assets.manifest.get('index.html').immutable
+
+
+def test_index_and_client_side_routes(static_folder):
+    client, _ = make_client(static_folder)
+    for url in ('/', '/dashboard/projects/3'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data == INDEX
+        assert response.headers['Cache-Control'] == REVALIDATE_CACHE_CONTROL
+
+    etag = client.get('/').headers['ETag']
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_precompressed_variants(static_folder):
+    client, _ = make_client(static_folder)
+    plain = client.get('/assets/index-3f2a.js')
+    assert plain.data == BUNDLE
+    assert plain.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert 'Accept-Encoding' in plain.vary
+    assert 'Content-Encoding' not in plain.headers
+
+    packed = client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'gzip'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == BUNDLE
+    assert packed.get_etag() == (plain.get_etag()[0], True)
+    # The .gz file is a variant, not an asset of its own
+    assert client.get('/assets/index-3f2a.js.gz').data == INDEX
+
+
+def test_large_files_stream_from_disk(static_folder):
+    client, assets = make_client(static_folder, STATIC_MEMORY_MAX_SIZE=1024)
+    bundle = assets.manifest.get('assets/index-3f2a.js')
+    assert bundle.bodies is None
+    assert assets.manifest.get('index.html').bodies is not None
+
+    response = client.get('/assets/index-3f2a.js', headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.data == BUNDLE[:10]
+    assert client.get('/assets/index-3f2a.js', headers={'If-None-Match': f'"{bundle.etag}"'}).status_code == 304
+
+    packed = client.get('/assets/index-3f2a.js', headers={'Accept-Encoding': 'gzip'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == BUNDLE
+
+
+def test_reload_picks_up_new_build(static_folder):
+    client, assets = make_client(static_folder)
+    assert client.get('/robots.txt').data == INDEX
+    (static_folder / 'robots.txt').write_bytes(b'User-agent: *')
+    assets.reload()
+    assert client.get('/robots.txt').data == b'User-agent: *'
+
+
+def test_missing_build(tmp_path):
+    client, _ = make_client(tmp_path / 'missing')
+    assert client.get('/').status_code == 404
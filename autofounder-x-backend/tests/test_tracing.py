@@ -0,0 +1,163 @@
+import threading
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+
+from src.agents.agent_manager import AgentManager, AgentStatus
+from src.agents.base_agent import BaseAgent
+from src.models.user import Agent, db
+from src.routes import agents as agents_routes
+from src.services.tracing import Tracer, tracer
+
+
+class QuickAgent(BaseAgent):
+    """An agent whose work takes milliseconds rather than seconds"""
+
+    def __init__(self):
+        super().__init__("quick", "Quick Agent", "Finishes fast")
+
+    def execute(self, project_data):
+        self.simulate_work(["Plan", "Build"], duration_per_step=0.001)
+        return self.summarize(project_data)
+
+    def summarize(self, project_data):
+        return {"name": project_data.get("name")}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = AgentManager()
+    manager.agents = {"quick": QuickAgent()}
+    manager.agent_status = {"quick": AgentStatus.IDLE}
+    monkeypatch.setattr(agents_routes, 'agent_manager', manager)
+    return manager
+
+
+def wait_for_agents(manager):
+    for thread in manager.agent_threads.values():
+        thread.join(timeout=5)
+
+
+def spans(trace, category=None):
+    return [event for event in trace['traceEvents'] if event['ph'] == 'X' and category in (None, event['cat'])]
+
+
+def test_spans_outside_a_run_are_dropped():
+    local = Tracer()
+    with local.span('ignored'):
+        pass
+    assert list(local._spans) == []
+
+    with local.run('outer', owner=1) as run_id:
+        # A nested run joins the outer one instead of starting its own
+        with local.run('inner') as inner_id:
+            assert inner_id == run_id
+    names = [span['name'] for span in spans(local.chrome_trace(run_id))]
+    assert names == ['outer', 'inner']
+    assert local.current_run_id() is None
+
+
+def test_disabled_tracer_records_nothing():
+    local = Tracer()
+    local.enabled = False
+    with local.run('off') as run_id:
+        assert run_id is None
+    assert local.recent_runs() == []
+
+
+def test_old_runs_are_evicted():
+    local = Tracer(max_runs=2)
+    run_ids = []
+    for index in range(3):
+        with local.run(f'run-{index}', owner=7) as run_id:
+            run_ids.append(run_id)
+    assert local.get_run(run_ids[0]) is None
+    assert local.chrome_trace(run_ids[0]) is None
+    assert [run['name'] for run in local.recent_runs(owner=7)] == ['run-2', 'run-1']
+    assert local.recent_runs(owner=8) == []
+
+
+def test_attached_threads_get_their_own_track():
+    local = Tracer()
+    with local.run('fan-out') as run_id:
+        def work():
+            with local.attach(run_id), local.span('work'):
+                pass
+        thread = threading.Thread(target=work, name='worker-1')
+        thread.start()
+        thread.join()
+
+    trace = local.chrome_trace(run_id)
+    thread_names = {event['tid']: event['args']['name'] for event in trace['traceEvents'] if event['name'] == 'thread_name'}
+    work = next(span for span in spans(trace) if span['name'] == 'work')
+    assert thread_names[work['tid']] == 'worker-1'
+    assert trace['otherData']['name'] == 'fan-out'
+
+
+def test_sql_inside_a_run_becomes_a_span(app):
+    with app.app_context():
+        with tracer.run('query') as run_id:
+            db.session.execute(select(Agent.id).where(Agent.type == 'legal')).all()
+        # Outside a run nothing is recorded
+        db.session.execute(select(Agent.id)).all()
+
+    sql = spans(tracer.chrome_trace(run_id), 'sql')
+    assert len(sql) == 1
+    assert sql[0]['name'] == 'SELECT'
+    assert 'FROM agents' in sql[0]['args']['statement']
+
+
+
+def test_failed_sql_leaves_no_start_time_behind(app):
+    with app.app_context(), db.engine.connect() as connection:
+        with tracer.run('failing') as run_id:
+            with pytest.raises(DBAPIError):
+                connection.execute(text('SELECT * FROM no_such_table'))
+            connection.rollback()
+            connection.execute(select(Agent.id)).all()
+        assert not connection.info.get('trace_started')
+
+    # Only the statement that completed is a span
+    assert [span['name'] for span in spans(tracer.chrome_trace(run_id), 'sql')] == ['SELECT']
+def test_agent_run_covers_queue_steps_and_methods(manager):
+    result = manager.start_all_agents({'name': 'Clinic scheduler', 'user_id': 1})
+    wait_for_agents(manager)
+    assert manager.agent_status['quick'] == AgentStatus.COMPLETED
+
+    trace = tracer.chrome_trace(result['run_id'])
+    by_name = {span['name']: span for span in spans(trace)}
+    assert {'start_all_agents', 'start_agent:quick', 'queued', 'AgentManager._execute_agent',
+            'QuickAgent.execute', 'QuickAgent.summarize', 'Plan', 'Build'} <= set(by_name)
+    assert by_name['Plan']['cat'] == 'step'
+    assert by_name['queued']['args'] == {'agent': 'quick'}
+    # The agent's spans sit on the agent thread's track
+    assert by_name['QuickAgent.execute']['tid'] == manager.agent_threads['quick'].ident
+    assert by_name['QuickAgent.execute']['tid'] != by_name['start_all_agents']['tid']
+
+
+def test_trace_endpoints(client, register, create_project, manager):
+    owner, other = register('alice'), register('bob')
+    project = create_project(owner['headers'], 'Clinic scheduler')
+
+    response = client.post('/api/agents/start-all', json={'project_id': project['id']}, headers=owner['headers'])
+    run_id = response.get_json()['run_id']
+    wait_for_agents(manager)
+
+    runs = client.get('/api/agents/runs', headers=owner['headers']).get_json()['runs']
+    assert runs[0]['run_id'] == run_id
+    assert runs[0]['name'] == 'POST /api/agents/start-all'
+    assert all(run['run_id'] != run_id for run in client.get('/api/agents/runs', headers=other['headers']).get_json()['runs'])
+
+    response = client.get(f'/api/agents/runs/{run_id}/trace', headers=owner['headers'])
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'] == f'attachment; filename="trace-{run_id}.json"'
+    trace = response.get_json()
+    assert trace['displayTimeUnit'] == 'ms'
+    # The project status update is on the same timeline as the agent work
+    assert any(span['name'] == 'UPDATE' for span in spans(trace, 'sql'))
+    assert any(span['name'] == 'QuickAgent.execute' for span in spans(trace))
+
+    for headers, path in ((other['headers'], run_id), (owner['headers'], 'no-such-run')):
+        response = client.get(f'/api/agents/runs/{path}/trace', headers=headers)
+        assert response.status_code == 404
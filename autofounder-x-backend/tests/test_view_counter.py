@@ -0,0 +1,56 @@
+import pytest
+
+from src.models.user import MarketplaceItem, db
+from src.services.view_counter import view_counter
+
+
+@pytest.fixture
+def item(register, create_project, publish):
+    owner = register('owner')
+    project = create_project(owner['headers'])
+    return publish(owner['headers'], project['id'])
+
+
+def stored_views(app, item_id):
+    with app.app_context():
+        return db.session.get(MarketplaceItem, item_id).views
+
+
+def test_views_are_buffered_until_flush(app, client, item):
+    for expected in range(1, 4):
+        response = client.get(f"/api/marketplace/items/{item['id']}")
+        assert response.get_json()['item']['views'] == expected
+
+    assert stored_views(app, item['id']) == 0
+    assert view_counter.pending(item['id']) == 3
+
+    assert view_counter.flush() == 1
+    assert view_counter.pending(item['id']) == 0
+    assert stored_views(app, item['id']) == 3
+
+    # Flushed views are not counted twice
+    response = client.get(f"/api/marketplace/items/{item['id']}")
+    assert response.get_json()['item']['views'] == 4
+
+
+def test_failed_flush_requeues_views(app, client, item, monkeypatch):
+    client.get(f"/api/marketplace/items/{item['id']}")
+    client.get(f"/api/marketplace/items/{item['id']}")
+
+    def broken_begin(*args, **kwargs):
+        raise RuntimeError('database is gone')
+
+    with app.app_context():
+        monkeypatch.setattr(type(db.engine), 'begin', broken_begin)
+    with pytest.raises(RuntimeError):
+        view_counter.flush()
+    monkeypatch.undo()
+
+    assert view_counter.pending(item['id']) == 2
+    view_counter.flush()
+    assert stored_views(app, item['id']) == 2
+
+
+def test_unknown_item_records_no_view(client):
+    assert client.get('/api/marketplace/items/999').status_code == 404
+    assert view_counter.pending(999) == 0